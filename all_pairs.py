@@ -0,0 +1,167 @@
+"""This script stores the all-pairs table class that precomputes the shortest route between every pair of stations."""
+import time
+from array import array
+from compiled_graph import trace_path
+
+# The value stored inside the table when a station can't be reached.
+UNREACHABLE = -1
+
+
+class AllPairsTable:
+    """
+    The AllPairsTable class stores the shortest distance and the predecessor station between every pair of
+    stations. It's built by running the dijkstra algorithm once from every station, so that finding
+    a route later on is just a lookup and a walk back through the predecessor stations.
+
+    Both tables are flat arrays with n * n entries, where the row of a starting station s starts at s * n.
+
+    Attributes:
+        station_count (int): The number of stations in the table.
+        distances (array): The minimum weight from every station to every other station.
+        predecessors (array): The station that comes before every station on the shortest path from every station.
+        build_seconds (float): How long the table took to build.
+    """
+
+    def __init__(self, compiled_graph):
+        started = time.perf_counter()
+        self.station_count = len(compiled_graph)
+        self.distances = array('q', [UNREACHABLE]) * (self.station_count * self.station_count)
+        self.predecessors = array('q', [UNREACHABLE]) * (self.station_count * self.station_count)
+        for start_id in range(self.station_count):
+            self.fill_row(compiled_graph, start_id)
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return self.station_count
+
+    def copy(self):
+        """
+        This method makes a copy of the table, so that the copy can be repaired without changing this table.
+
+        Returns:
+            All-Pairs Table (AllPairsTable): The copy of the table.
+        """
+        table = AllPairsTable.__new__(AllPairsTable)
+        table.station_count = self.station_count
+        table.distances = array('q', self.distances)
+        table.predecessors = array('q', self.predecessors)
+        table.build_seconds = self.build_seconds
+        return table
+
+    def fill_row(self, compiled_graph, start_id):
+        """
+        This method (re)computes the shortest routes from a starting station to every other station.
+
+        Args:
+            compiled_graph (CompiledGraph): The graph to find the routes in.
+            start_id (int): The id of the starting station.
+        """
+        row = start_id * self.station_count
+        shortest_distance, predecessor = compiled_graph.shortest_paths(start_id)
+        for station_id in range(self.station_count):
+            self.distances[row + station_id] = shortest_distance.get(station_id, UNREACHABLE)
+            self.predecessors[row + station_id] = predecessor.get(station_id, UNREACHABLE)
+
+    def link_added(self, first_id, second_id, forward_weight, backward_weight):
+        """
+        This method repairs the table after two stations are linked.
+        A new link can only make routes shorter, so for every pair of stations (s, t) we only need to check
+        whether going s -> ... -> first -> second -> ... -> t (or the other way around) is shorter.
+
+        Args:
+            first_id (int): The id of one station of the new link.
+            second_id (int): The id of the other station of the new link.
+            forward_weight (int): The weight of going from the first station to the second station.
+            backward_weight (int): The weight of going from the second station to the first station.
+        """
+        self._relax_link(first_id, second_id, forward_weight)
+        self._relax_link(second_id, first_id, backward_weight)
+
+    def _relax_link(self, from_id, to_id, weight):
+        """
+        This method repairs the table after a one-way link was added.
+
+        Args:
+            from_id (int): The id of the station the link goes from.
+            to_id (int): The id of the station the link goes to.
+            weight (int): The weight of the link.
+        """
+        count = self.station_count
+        distances = self.distances
+        predecessors = self.predecessors
+        to_row = to_id * count
+        for start_id in range(count):
+            row = start_id * count
+            distance_to_link = distances[row + from_id]
+            if distance_to_link == UNREACHABLE:
+                continue
+            for target_id in range(count):
+                distance_from_link = distances[to_row + target_id]
+                if distance_from_link == UNREACHABLE:
+                    continue
+                new_distance = distance_to_link + weight + distance_from_link
+                old_distance = distances[row + target_id]
+                if old_distance == UNREACHABLE or new_distance < old_distance:
+                    distances[row + target_id] = new_distance
+                    # The station before the target is the same as on the route from the link to the target,
+                    # unless the target is the end of the link itself.
+                    predecessors[row + target_id] = from_id if target_id == to_id else predecessors[to_row + target_id]
+
+    def link_removed(self, compiled_graph, first_id, second_id):
+        """
+        This method repairs the table after two stations are de-linked.
+        Only the starting stations whose shortest routes went through the removed link are searched again,
+        every other starting station keeps its routes.
+
+        Args:
+            compiled_graph (CompiledGraph): The graph after the link was removed.
+            first_id (int): The id of one station of the removed link.
+            second_id (int): The id of the other station of the removed link.
+        """
+        count = self.station_count
+        for start_id in range(count):
+            row = start_id * count
+            if self.predecessors[row + second_id] == first_id or self.predecessors[row + first_id] == second_id:
+                self.fill_row(compiled_graph, start_id)
+
+    def distance(self, start_id, target_id):
+        """
+        This method looks up the minimum weight from a starting station to a target station.
+
+        Args:
+            start_id (int): The id of the starting station.
+            target_id (int): The id of the target station.
+
+        Returns:
+            Distance (int): The minimum weight, or None if the target station can't be reached.
+        """
+        distance = self.distances[start_id * self.station_count + target_id]
+        return None if distance == UNREACHABLE else distance
+
+    def route(self, start_id, target_id):
+        """
+        This method looks up the shortest route from a starting station to a target station.
+
+        Args:
+            start_id (int): The id of the starting station.
+            target_id (int): The id of the target station.
+
+        Returns:
+            Station Ids and Weight (tuple): The ids of the stations on the route (in order) and the
+            weight of the route, or None if the target station can't be reached.
+        """
+        distance = self.distance(start_id, target_id)
+        if distance is None:
+            return None
+        row = start_id * self.station_count
+        predecessors = self.predecessors[row:row + self.station_count]
+        return trace_path(predecessors, start_id, target_id), distance
+
+    def memory_usage(self):
+        """
+        This method shows how much memory (in bytes) the table uses.
+
+        Returns:
+            Memory Usage (int): The size of the distance and predecessor tables in bytes.
+        """
+        return sum(len(table) * table.itemsize for table in (self.distances, self.predecessors))
@@ -0,0 +1,186 @@
+"""This script times the TrainLogic functions on generated networks of different sizes, to see how the program scales."""
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from logic import TrainLogic
+from network_generator import generate_network
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+
+
+def percentiles(latencies):
+    """
+    This function summarises a list of latencies.
+
+    Args:
+        latencies (list): The latencies in seconds.
+
+    Returns:
+        Summary (dict): The number of calls, and the p50, p90, p99 and maximum latencies in milliseconds.
+    """
+    latencies = sorted(latencies)
+
+    def percentile(ratio):
+        return latencies[min(len(latencies) - 1, int(ratio * len(latencies)))] * 1000
+
+    return {
+        "calls": len(latencies),
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def time_calls(function, arguments):
+    """
+    This function calls a function once for every set of arguments, and times every call.
+
+    Args:
+        function (function): The function to time.
+        arguments (list): The arguments (as tuples) of every call.
+
+    Returns:
+        Latencies (list): The latency of every call in seconds.
+    """
+    latencies = []
+    for call_arguments in arguments:
+        started = time.perf_counter()
+        function(*call_arguments)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def peak_memory(function, arguments):
+    """
+    This function finds the peak memory that a function allocates (this is done separately from the timing,
+    as tracing the memory makes every call a lot slower).
+
+    Args:
+        function (function): The function to measure.
+        arguments (list): The arguments (as tuples) of every call.
+
+    Returns:
+        Peak Memory (int): The highest number of bytes allocated during a single call.
+    """
+    highest_peak = 0
+    tracemalloc.start()
+    for call_arguments in arguments:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        function(*call_arguments)
+        highest_peak = max(highest_peak, tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return highest_peak
+
+
+def benchmark_network(station_count, queries, seed):
+    """
+    This function benchmarks dijkstra_algorithm, dfs_algorithm, link_stations and delink_stations (of new links,
+    and of links of the network that aren't bridges) on a generated network.
+
+    Args:
+        station_count (int): The number of stations of the generated network.
+        queries (int): The number of calls to time for every function.
+        seed (int): The seed used to generate the network and pick the stations.
+
+    Returns:
+        Results (dict): The latency percentiles and peak memory of every function.
+    """
+    randomizer = random.Random(seed)
+    started = time.perf_counter()
+    graph = generate_network(station_count, seed=seed)
+    generate_seconds = time.perf_counter() - started
+    # The route cache is turned off so that every dijkstra call is actually timed.
+    trains = TrainLogic(graph, route_cache_size=0)
+    started = time.perf_counter()
+    trains.compiled_graph
+    compile_seconds = time.perf_counter() - started
+    stations = list(graph)
+
+    route_pairs = [tuple(randomizer.sample(stations, 2)) for _ in range(queries)]
+    # A traversal visits the whole network, so fewer traversals are timed.
+    traversal_starts = [(randomizer.choice(stations),) for _ in range(max(1, queries // 10))]
+    link_pairs = []
+    while len(link_pairs) < queries:
+        station_input, station_target = randomizer.sample(stations, 2)
+        if station_target not in graph[station_input]:
+            link_pairs.append((station_input, station_target))
+
+    results = {
+        "stations": station_count,
+        "links": sum(len(neighbours) for neighbours in graph.values()) // 2,
+        "generate_seconds": generate_seconds,
+        "compile_seconds": compile_seconds,
+        "operations": {},
+    }
+
+    def record(name, function, arguments):
+        results["operations"][name] = percentiles(time_calls(function, arguments))
+        results["operations"][name]["peak_memory_bytes"] = peak_memory(function, arguments[:5])
+
+    record("dijkstra_algorithm", trains.dijkstra_algorithm, route_pairs)
+    record("dfs_algorithm", trains.dfs_algorithm, traversal_starts)
+    # Build the bridge index before timing, so that the first de-link doesn't include building it.
+    trains.bridge_index
+    # Every link is de-linked straight away, so the network stays the same between the calls.
+    link_latencies = []
+    delink_latencies = []
+    for station_input, station_target in link_pairs:
+        link_latencies.extend(time_calls(trains.link_stations, [(station_input, station_target)]))
+        delink_latencies.extend(time_calls(trains.delink_stations, [(station_input, station_target)]))
+    results["operations"]["link_stations"] = percentiles(link_latencies)
+    results["operations"]["delink_stations"] = percentiles(delink_latencies)
+    results["operations"]["link_stations"]["peak_memory_bytes"] = peak_memory(trains.link_stations, link_pairs[:5])
+    results["operations"]["delink_stations"]["peak_memory_bytes"] = peak_memory(trains.delink_stations,
+                                                                                link_pairs[:5])
+    # De-linking a link of the network that isn't a bridge, and linking it back with its old weight. Unlike the
+    # links above (which often join two parts that are only linked by bridges), most of these links are inside
+    # a large part of the network that stays connected by two separate ways.
+    bridge_index = trains.bridge_index
+    network_links = [(station_input, station_target) for station_input in stations
+                     for station_target in graph[station_input] if station_input < station_target
+                     and not bridge_index.is_bridge(station_input, station_target)]
+    non_bridge_latencies = []
+    for station_input, station_target in randomizer.sample(network_links, min(queries, len(network_links))):
+        weight = trains.graph[station_input][station_target]
+        non_bridge_latencies.extend(time_calls(trains.delink_stations, [(station_input, station_target)]))
+        trains.apply_edits([("link", station_input, station_target, weight)])
+    results["operations"]["delink_stations_non_bridge"] = percentiles(non_bridge_latencies)
+    return results
+
+
+def main():
+    """This function runs the benchmark suite and saves the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark TrainLogic on generated networks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="the number of stations of every generated network")
+    parser.add_argument("--queries", type=int, default=100, help="the number of calls to time for every function")
+    parser.add_argument("--seed", type=int, default=0, help="the seed used to generate the networks")
+    parser.add_argument("--output", default="benchmark_results.json", help="the file to save the results to")
+    arguments = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seed": arguments.seed,
+        "queries": arguments.queries,
+        "networks": [],
+    }
+    for station_count in arguments.sizes:
+        print(f"Benchmarking a network of {station_count} stations...")
+        results = benchmark_network(station_count, arguments.queries, arguments.seed)
+        for name, operation in results["operations"].items():
+            print(f"    {name}: p50 {operation['p50_ms']:.3f} ms, p99 {operation['p99_ms']:.3f} ms")
+        report["networks"].append(results)
+    with open(arguments.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
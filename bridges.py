@@ -0,0 +1,339 @@
+"""This script stores the bridge index class that knows which links can't be removed without splitting the network."""
+from collections import deque
+
+
+class BridgeIndex:
+    """
+    The BridgeIndex class keeps track of every bridge in the train graph. A bridge is a link that,
+    if removed, would split the network into two parts (e.g. Outram Park <-> HarbourFront, as HarbourFront
+    can only be reached through Outram Park). The bridges are found using Tarjan's bridge-finding algorithm.
+
+    The stations that are still connected after removing every bridge form a "2-edge-connected component".
+    Every component is given a number, and the components are linked together by the bridges (which makes
+    a tree of components, called the bridge tree). This is what lets the index be updated when a link is added
+    or removed without having to look at the whole graph again.
+
+    Attributes:
+        graph (dict): The weighted train graph that the index is built on.
+        bridges (set): Every bridge, stored as a frozenset of the two linked stations.
+        component_of (dict): The component number of every station.
+        members (dict): The stations inside every component.
+        bridge_tree (dict): For every component, the neighbouring components and the bridge that links them.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.bridges = set()
+        self.component_of = {}
+        self.members = {}
+        self.bridge_tree = {}
+        self._next_component = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """This method builds the whole index from scratch."""
+        self.bridges = self._find_bridges(self.graph)
+        self.component_of = {}
+        self.members = {}
+        self.bridge_tree = {}
+        self._label_components(self.graph)
+        for bridge in self.bridges:
+            self._add_tree_edge(bridge)
+
+    def is_bridge(self, station_input, station_target):
+        """
+        This method checks whether removing a link would split the network.
+
+        Args:
+            station_input (str): One station of the link.
+            station_target (str): The other station of the link.
+
+        Returns:
+            Is Bridge (bool): True if removing the link would leave some stations unreachable.
+        """
+        return frozenset((station_input, station_target)) in self.bridges
+
+    def link_added(self, station_input, station_target):
+        """
+        This method updates the index after a link was added to the graph.
+
+        Adding a link can only turn bridges into normal links. If both stations are in the same component,
+        nothing changes. If they are connected through the bridge tree, every bridge on the way between them is
+        now part of a cycle, so those components are merged. Otherwise the new link is itself a bridge.
+
+        Args:
+            station_input (str): One station of the new link.
+            station_target (str): The other station of the new link.
+        """
+        input_component = self.component_of[station_input]
+        target_component = self.component_of[station_target]
+        if input_component == target_component:
+            return
+        tree_path = self._tree_path(input_component, target_component)
+        if tree_path is None:
+            self.bridges.add(frozenset((station_input, station_target)))
+            self._add_tree_edge(frozenset((station_input, station_target)))
+            return
+        # Every bridge on the way between the two components is not a bridge anymore.
+        for first_component, second_component in zip(tree_path, tree_path[1:]):
+            self.bridges.discard(self.bridge_tree[first_component].pop(second_component))
+            del self.bridge_tree[second_component][first_component]
+        # Merge every component on the way into the biggest one, so that the least stations are relabelled.
+        merged_component = max(tree_path, key=lambda component: len(self.members[component]))
+        for component in tree_path:
+            if component == merged_component:
+                continue
+            for station in self.members[component]:
+                self.component_of[station] = merged_component
+            self.members[merged_component] |= self.members.pop(component)
+            for neighbour_component, bridge in self.bridge_tree.pop(component).items():
+                self.bridge_tree[merged_component][neighbour_component] = bridge
+                del self.bridge_tree[neighbour_component][component]
+                self.bridge_tree[neighbour_component][merged_component] = bridge
+
+    def link_removed(self, station_input, station_target):
+        """
+        This method updates the index after a link was removed from the graph.
+
+        If the link was a bridge, it's simply removed from the bridge tree. Otherwise, the two stations are still
+        connected inside their component, and new bridges appear only if every way between them now has to go
+        over the same link. So instead of searching the whole component again, a way between the two stations is
+        found, and then a second way that doesn't use any link of the first way in the same direction (like
+        finding a flow of 2 between them). If there is one, nothing changed. If there isn't, the search that
+        ran out of stations first has found the stations on one end, which are split off as a new component
+        (the link of the first way that leaves them is a new bridge), and the same is done for the rest.
+        This way only the stations near the two stations, and the stations that are split off, are looked at.
+
+        Args:
+            station_input (str): One station of the removed link.
+            station_target (str): The other station of the removed link.
+        """
+        removed_link = frozenset((station_input, station_target))
+        if removed_link in self.bridges:
+            self.bridges.remove(removed_link)
+            input_component = self.component_of[station_input]
+            target_component = self.component_of[station_target]
+            del self.bridge_tree[input_component][target_component]
+            del self.bridge_tree[target_component][input_component]
+            return
+        old_component = self.component_of[station_input]
+        path = self._component_path(station_input, station_target, old_component)
+        path_links = set(zip(path, path[1:]))
+        # The part of the path that is still inside the old component.
+        first_index, last_index = 0, len(path) - 1
+        new_bridges = []
+        new_components = []
+        while first_index < last_index:
+            split_side, split_stations = self._split_off_end(path[first_index], path[last_index], old_component,
+                                                             path_links)
+            if split_stations is None:
+                break
+            component = self._next_component
+            self._next_component += 1
+            self.members[old_component] -= split_stations
+            self.members[component] = split_stations
+            self.bridge_tree[component] = {}
+            for station in split_stations:
+                self.component_of[station] = component
+            new_components.append(component)
+            # The path leaves the split off stations through exactly one link, which is the new bridge.
+            if split_side == 0:
+                while path[first_index] in split_stations:
+                    first_index += 1
+                new_bridges.append(frozenset((path[first_index - 1], path[first_index])))
+            else:
+                while path[last_index] in split_stations:
+                    last_index -= 1
+                new_bridges.append(frozenset((path[last_index], path[last_index + 1])))
+        if not new_bridges:
+            return
+        # The bridges that were linked to the old component might now be linked to one of the new components.
+        for neighbour_component, bridge in list(self.bridge_tree[old_component].items()):
+            del self.bridge_tree[neighbour_component][old_component]
+            del self.bridge_tree[old_component][neighbour_component]
+            self._add_tree_edge(bridge)
+        self.bridges.update(new_bridges)
+        for bridge in new_bridges:
+            self._add_tree_edge(bridge)
+
+    def _component_path(self, start_station, target_station, component):
+        """
+        This method finds a way between two stations of a component, searching from both stations at the same
+        time (so that only the stations near them are looked at).
+
+        Args:
+            start_station (str): The station to start from.
+            target_station (str): The station to go to.
+            component (int): The component that the way has to stay in.
+
+        Returns:
+            Path (list): The stations on the way (in order).
+        """
+        previous_station = [{start_station: None}, {target_station: None}]
+        queues = [deque([start_station]), deque([target_station])]
+        while True:
+            for side in (0, 1):
+                station = queues[side].popleft()
+                for neighbour in self.graph[station]:
+                    if neighbour in previous_station[side] or self.component_of[neighbour] != component:
+                        continue
+                    previous_station[side][neighbour] = station
+                    if neighbour in previous_station[1 - side]:
+                        # The two searches met, so join the two halves of the way.
+                        path = [neighbour]
+                        while previous_station[0][path[-1]] is not None:
+                            path.append(previous_station[0][path[-1]])
+                        path.reverse()
+                        while previous_station[1][path[-1]] is not None:
+                            path.append(previous_station[1][path[-1]])
+                        return path
+                    queues[side].append(neighbour)
+
+    def _split_off_end(self, start_station, target_station, component, path_links):
+        """
+        This method checks whether there is a second way between two stations of a component that doesn't use
+        any link of the first way (path_links) in the same direction. It searches forwards from the starting
+        station and backwards from the target station, one station at a time.
+
+        Args:
+            start_station (str): The station at the start of the first way.
+            target_station (str): The station at the end of the first way.
+            component (int): The component that the searches have to stay in.
+            path_links (set): The (station, next station) links of the first way.
+
+        Returns:
+            Split Side and Stations (tuple): (None, None) if the searches met, i.e. the two stations are still
+            connected by two separate ways. Otherwise the side whose search ran out of stations (0 for the
+            starting station, 1 for the target station) and the stations it found, which are only connected
+            to the rest of the component by one link.
+        """
+        visited_stations = [{start_station}, {target_station}]
+        queues = [deque([start_station]), deque([target_station])]
+        while True:
+            for side in (0, 1):
+                if not queues[side]:
+                    return side, visited_stations[side]
+                station = queues[side].popleft()
+                for neighbour in self.graph[station]:
+                    # Forwards, a link of the first way can only be used backwards, and the other way around.
+                    link = (station, neighbour) if side == 0 else (neighbour, station)
+                    if link in path_links or self.component_of[neighbour] != component:
+                        continue
+                    if neighbour in visited_stations[1 - side]:
+                        return None, None
+                    if neighbour not in visited_stations[side]:
+                        visited_stations[side].add(neighbour)
+                        queues[side].append(neighbour)
+
+    def _add_tree_edge(self, bridge):
+        """
+        This method adds a bridge to the bridge tree.
+
+        Args:
+            bridge (frozenset): The two stations linked by the bridge.
+        """
+        first_station, second_station = bridge
+        first_component = self.component_of[first_station]
+        second_component = self.component_of[second_station]
+        self.bridge_tree[first_component][second_component] = bridge
+        self.bridge_tree[second_component][first_component] = bridge
+
+    def _tree_path(self, start_component, target_component):
+        """
+        This method finds the way between two components inside the bridge tree using BFS.
+
+        Args:
+            start_component (int): The component to start from.
+            target_component (int): The component to go to.
+
+        Returns:
+            Path (list): The components on the way (in order), or None if the components aren't connected.
+        """
+        previous_component = {start_component: None}
+        queue = deque([start_component])
+        while queue:
+            component = queue.popleft()
+            if component == target_component:
+                path = [component]
+                while previous_component[path[-1]] is not None:
+                    path.append(previous_component[path[-1]])
+                path.reverse()
+                return path
+            for neighbour_component in self.bridge_tree[component]:
+                if neighbour_component not in previous_component:
+                    previous_component[neighbour_component] = component
+                    queue.append(neighbour_component)
+        return None
+
+    def _label_components(self, subgraph):
+        """
+        This method gives a new component number to every group of stations that are
+        still connected to each other without crossing a bridge.
+
+        Args:
+            subgraph (dict): The stations to label and their neighbours.
+        """
+        labelled_stations = set()
+        for start_station in subgraph:
+            if start_station in labelled_stations:
+                continue
+            component = self._next_component
+            self._next_component += 1
+            self.members[component] = set()
+            self.bridge_tree[component] = {}
+            labelled_stations.add(start_station)
+            stack = [start_station]
+            while stack:
+                station = stack.pop()
+                self.component_of[station] = component
+                self.members[component].add(station)
+                for neighbour in subgraph[station]:
+                    if neighbour not in labelled_stations and frozenset((station, neighbour)) not in self.bridges:
+                        labelled_stations.add(neighbour)
+                        stack.append(neighbour)
+
+    @staticmethod
+    def _find_bridges(subgraph):
+        """
+        This method finds every bridge of a graph using Tarjan's algorithm.
+
+        Every station is given the order in which it was first visited by a DFS (discovery), and the lowest
+        discovery number it can get back to using the links below it (lowlink). A link from a station to its
+        child in the DFS is a bridge if the child can't get back to the station (or above it) any other way,
+        i.e. lowlink[child] > discovery[station].
+        The DFS uses its own stack instead of recursion, so that big networks don't hit the recursion limit.
+
+        Args:
+            subgraph (dict): The stations and their neighbours.
+
+        Returns:
+            Bridges (set): Every bridge, stored as a frozenset of the two linked stations.
+        """
+        discovery = {}
+        lowlink = {}
+        bridges = set()
+        for root_station in subgraph:
+            if root_station in discovery:
+                continue
+            discovery[root_station] = lowlink[root_station] = len(discovery)
+            # Every stack entry is (station, the station it was reached from, its remaining neighbours).
+            stack = [(root_station, None, iter(subgraph[root_station]))]
+            while stack:
+                station, parent_station, neighbours = stack[-1]
+                for neighbour in neighbours:
+                    if neighbour == parent_station:
+                        continue
+                    if neighbour in discovery:
+                        lowlink[station] = min(lowlink[station], discovery[neighbour])
+                    else:
+                        discovery[neighbour] = lowlink[neighbour] = len(discovery)
+                        stack.append((neighbour, station, iter(subgraph[neighbour])))
+                        break
+                else:
+                    # Every neighbour of the station has been visited, so go back up to its parent.
+                    stack.pop()
+                    if parent_station is not None:
+                        lowlink[parent_station] = min(lowlink[parent_station], lowlink[station])
+                        if lowlink[station] > discovery[parent_station]:
+                            bridges.add(frozenset((parent_station, station)))
+        return bridges
@@ -0,0 +1,304 @@
+"""This script stores the compiled graph class that the train logic runs its algorithms on."""
+import heapq
+import time
+from array import array
+
+
+class CompiledGraph:
+    """
+    The CompiledGraph class is a compact version of the weighted train graph.
+    Instead of a dictionary of dictionaries (where every lookup has to hash a station name),
+    every station is given an integer id, and the neighbours of every station are stored
+    inside flat arrays (this is also known as the CSR, or Compressed Sparse Row, format).
+
+    EXAMPLE: If station 0 has the neighbours 1 and 2, and station 1 has the neighbour 0,
+    offsets = [0, 2, 3], neighbours = [1, 2, 0]. The neighbours of station i are stored
+    from neighbours[offsets[i]] up to (but not including) neighbours[offsets[i + 1]].
+
+    Attributes:
+        station_names (list): The name of every station, where the index is the id of the station.
+        station_ids (dict): The id of every station, where the key is the name of the station.
+        offsets (array): Where the neighbours of every station start inside the neighbours array.
+        neighbours (array): The ids of the neighbouring stations of every station.
+        weights (array): The weight to get to every neighbour inside the neighbours array.
+    """
+
+    def __init__(self, graph):
+        # The ids are given based on the position of the station in the graph, so the id
+        # of a station can also be used to break ties the same way the graph is ordered.
+        self.station_names = list(graph)
+        self.station_ids = {station: station_id for station_id, station in enumerate(self.station_names)}
+        self.offsets = array('q', [0])
+        self.neighbours = array('q')
+        self.weights = array('q')
+        for station in self.station_names:
+            for neighbour, weight in graph[station].items():
+                self.neighbours.append(self.station_ids[neighbour])
+                self.weights.append(weight)
+            self.offsets.append(len(self.neighbours))
+
+    @classmethod
+    def from_buffers(cls, station_names, offsets, neighbours, weights):
+        """
+        This method makes a compiled graph from adjacency arrays that already exist (e.g. the arrays of a
+        snapshot file), without copying them.
+
+        Args:
+            station_names (list): The name of every station, where the index is the id of the station.
+            offsets (array or memoryview): Where the neighbours of every station start inside the neighbours array.
+            neighbours (array or memoryview): The ids of the neighbouring stations of every station.
+            weights (array or memoryview): The weight to get to every neighbour inside the neighbours array.
+
+        Returns:
+            Compiled Graph (CompiledGraph): The compiled graph that uses the given arrays.
+        """
+        compiled_graph = cls.__new__(cls)
+        compiled_graph.station_names = station_names
+        compiled_graph.station_ids = {station: station_id for station_id, station in enumerate(station_names)}
+        compiled_graph.offsets = offsets
+        compiled_graph.neighbours = neighbours
+        compiled_graph.weights = weights
+        return compiled_graph
+
+    def to_graph(self):
+        """
+        This method turns the compiled graph back into a weighted graph (a dictionary of dictionaries).
+
+        Returns:
+            graph (dict): The weighted graph, in the same format as mrt_train_graph.
+        """
+        return {station: {self.station_names[neighbour]: weight for neighbour, weight in self.neighbours_of(station_id)}
+                for station_id, station in enumerate(self.station_names)}
+
+    def __len__(self):
+        return len(self.station_names)
+
+    def __contains__(self, station):
+        return station in self.station_ids
+
+    def neighbours_of(self, station_id):
+        """
+        This method returns the neighbouring stations of a station (and the weight to get there).
+
+        Args:
+            station_id (int): The id of the station.
+
+        Returns:
+            Neighbours and Weights (zip): The ids of the neighbouring stations, paired with their weights.
+        """
+        start, end = self.offsets[station_id], self.offsets[station_id + 1]
+        return zip(self.neighbours[start:end], self.weights[start:end])
+
+    def memory_usage(self):
+        """
+        This method shows how much memory (in bytes) the adjacency arrays use.
+
+        Returns:
+            Memory Usage (int): The size of the offsets, neighbours and weights arrays in bytes.
+        """
+        return sum(len(buffer) * buffer.itemsize for buffer in (self.offsets, self.neighbours, self.weights))
+
+    def reversed(self):
+        """
+        This method makes a copy of the graph where every link goes the other way around.
+        As some links have a different weight depending on the direction (e.g. Bukit Batok <-> Bukit Gombak),
+        searching backwards from a target station needs to use this graph.
+
+        Returns:
+            Reversed Graph (CompiledGraph): The graph with every link reversed (the station ids stay the same).
+        """
+        reverse_graph = {station: {} for station in self.station_names}
+        for station_id, station in enumerate(self.station_names):
+            for neighbour, weight in self.neighbours_of(station_id):
+                reverse_graph[self.station_names[neighbour]][station] = weight
+        return CompiledGraph(reverse_graph)
+
+    def shortest_paths(self, start_id, target_id=None, settled_stations=None, search_stats=None):
+        """
+        This method runs the dijkstra algorithm from a starting station.
+
+        Args:
+            start_id (int): The id of the station to start from.
+            target_id (int): The id of the station to stop at. If this is None, the
+            shortest path to every reachable station is found.
+            settled_stations (set): An empty set to fill with the settled stations, so that the
+            caller can see how many stations the search had to look at.
+            search_stats (SearchStats): Filled in with the work done by the search, if it's given.
+
+        Returns:
+            Shortest Distance and Predecessor (tuple): The minimum weight to reach every settled station,
+            and the station that comes before every station on its shortest path.
+        """
+        infinity = float('inf')
+        # Store the minimum weight to reach a target station.
+        shortest_distance = {start_id: 0}
+        # Keep track of the path that leads us to a certain node/station.
+        predecessor = {}
+        # Keep track of the stations whose shortest distance is already final (settled).
+        if settled_stations is None:
+            settled_stations = set()
+        # Instead of scanning every unseen station to find the minimum one (which is O(V^2)),
+        # we use a binary heap as a priority queue. Each entry is (weight, station id).
+        # The station id is the position of the station in the graph, so that when two stations
+        # have the same weight, the station that comes first in the graph is picked first.
+        priority_queue = [(0, start_id)]
+        # Only the pushes are counted while searching, everything else is worked out at the end.
+        heap_pushes = 1
+
+        while priority_queue:
+            # Pop the station with the lowest tentative weight.
+            current_weight, minimum_node = heapq.heappop(priority_queue)
+            # Instead of removing outdated entries from the heap (which is slow), we just skip them
+            # when they are popped (lazy deletion). An entry is outdated if the station has already
+            # been settled with a lower weight.
+            if minimum_node in settled_stations:
+                continue
+            settled_stations.add(minimum_node)
+            # Once the target station is settled, its weight and path can't change anymore,
+            # so there is no need to look at the rest of the graph.
+            if minimum_node == target_id:
+                break
+            # For every neighbouring station and their weight from the minimum station,
+            for child_nodes, weight in self.neighbours_of(minimum_node):
+                # Calculate the distance of each neighbouring station from the starting station.
+                # If the sum is lower than the tentative weight of the neighbouring child nodes,
+                if child_nodes not in settled_stations and \
+                        current_weight + weight < shortest_distance.get(child_nodes, infinity):
+                    # Update the weight between each neighbouring stations, and
+                    shortest_distance[child_nodes] = current_weight + weight
+                    # Update the predecessor/the path it took to the neighbouring stations.
+                    predecessor[child_nodes] = minimum_node
+                    # Push the neighbouring station into the heap with its new tentative weight.
+                    heapq.heappush(priority_queue, (current_weight + weight, child_nodes))
+                    heap_pushes += 1
+        if search_stats is not None:
+            offsets = self.offsets
+            # Every settled station had its links looked at, except the target station (where the search stopped).
+            scanned = sum(offsets[station_id + 1] - offsets[station_id] for station_id in settled_stations
+                          if station_id != target_id)
+            search_stats.add(len(settled_stations), scanned, heap_pushes - 1, heap_pushes,
+                             heap_pushes - len(priority_queue))
+        return shortest_distance, predecessor
+
+    def route(self, start_id, target_id, search_stats=None):
+        """
+        This method finds the shortest route of a starting station to a target station.
+
+        Args:
+            start_id (int): The id of the station to start from.
+            target_id (int): The id of the station to go to.
+            search_stats (SearchStats): Filled in with the work done by the search, if it's given.
+
+        Returns:
+            Station Ids and Weight (tuple): The ids of the stations on the route (in order) and the
+            weight of the route, or None if the target station can't be reached.
+        """
+        shortest_distance, predecessor = self.shortest_paths(start_id, target_id, search_stats=search_stats)
+        if target_id not in shortest_distance:
+            return None
+        if search_stats is None:
+            return trace_path(predecessor, start_id, target_id), shortest_distance[target_id]
+        started = time.perf_counter()
+        path = trace_path(predecessor, start_id, target_id)
+        search_stats.reconstruction_seconds += time.perf_counter() - started
+        return path, shortest_distance[target_id]
+
+    def multi_source_paths(self, start_ids, target_ids=None, stop_at_first=False, search_stats=None):
+        """
+        This method runs the dijkstra algorithm from many starting stations at once, as if there was an extra
+        station with a link of weight 0 to every starting station. Every station is settled from its nearest
+        starting station, so one search gives the same result as one search per starting station.
+
+        Args:
+            start_ids (iterable): The ids of the stations to start from.
+            target_ids (set): The ids of the stations to stop at. The search stops once all of them are settled.
+            If this is None, the shortest path to every reachable station is found.
+            stop_at_first (bool): Stop as soon as any of the target stations is settled (which is the target
+            station that is nearest to any starting station).
+            search_stats (SearchStats): Filled in with the work done by the search, if it's given.
+
+        Returns:
+            Shortest Distance, Predecessor and Origin (tuple): The minimum weight to reach every settled station,
+            the station that comes before every station on its shortest path, and the starting station that every
+            station was reached from.
+        """
+        infinity = float('inf')
+        shortest_distance = {}
+        predecessor = {}
+        origin = {}
+        settled_stations = set()
+        for start_id in start_ids:
+            shortest_distance[start_id] = 0
+            origin[start_id] = start_id
+        # Every starting station is in the heap with a weight of 0. When two starting stations are the same
+        # weight away from a station, the one that comes first in the graph reaches it first.
+        priority_queue = [(0, start_id) for start_id in shortest_distance]
+        heapq.heapify(priority_queue)
+        seed_count = heap_pushes = len(priority_queue)
+        remaining_targets = None if target_ids is None else set(target_ids)
+        stopped_at = None
+
+        while priority_queue:
+            current_weight, minimum_node = heapq.heappop(priority_queue)
+            if minimum_node in settled_stations:
+                continue
+            settled_stations.add(minimum_node)
+            if remaining_targets is not None and minimum_node in remaining_targets:
+                remaining_targets.discard(minimum_node)
+                if stop_at_first or not remaining_targets:
+                    stopped_at = minimum_node
+                    break
+            current_origin = origin[minimum_node]
+            for child_nodes, weight in self.neighbours_of(minimum_node):
+                if child_nodes not in settled_stations and \
+                        current_weight + weight < shortest_distance.get(child_nodes, infinity):
+                    shortest_distance[child_nodes] = current_weight + weight
+                    predecessor[child_nodes] = minimum_node
+                    # A station is reached from the same starting station as the station before it.
+                    origin[child_nodes] = current_origin
+                    heapq.heappush(priority_queue, (current_weight + weight, child_nodes))
+                    heap_pushes += 1
+        if search_stats is not None:
+            offsets = self.offsets
+            scanned = sum(offsets[station_id + 1] - offsets[station_id] for station_id in settled_stations
+                          if station_id != stopped_at)
+            search_stats.add(len(settled_stations), scanned, heap_pushes - seed_count, heap_pushes,
+                             heap_pushes - len(priority_queue))
+        return shortest_distance, predecessor, origin
+
+
+def trace_path(predecessor, start_id, target_id):
+    """
+    This function traces back the path that leads from a starting station to a target station.
+
+    Args:
+        predecessor (dict or array): The station that comes before every station on its shortest path.
+        start_id (int): The id of the station the path starts from.
+        target_id (int): The id of the station the path ends at.
+
+    Returns:
+        Path (list): The ids of the stations on the path, in order.
+    """
+    # Walk back from the target station to the starting station, and then reverse the path
+    # so that it's in the correct order (this is faster than inserting every station at index 0).
+    path = [target_id]
+    while path[-1] != start_id:
+        path.append(predecessor[path[-1]])
+    path.reverse()
+    return path
+
+
+def uses_link(path, first_id, second_id):
+    """
+    This function checks whether a path goes through the link between two stations (in either direction).
+
+    Args:
+        path (list): The ids of the stations on the path, in order.
+        first_id (int): The id of one station of the link.
+        second_id (int): The id of the other station of the link.
+
+    Returns:
+        Uses Link (bool): True if the two stations come right after each other on the path.
+    """
+    return any({station_id, next_station_id} == {first_id, second_id}
+               for station_id, next_station_id in zip(path, path[1:]))
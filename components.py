@@ -0,0 +1,299 @@
+"""This script stores the classes that are used to check which stations are connected to each other."""
+from collections import deque
+
+
+class UnionFind:
+    """
+    The UnionFind (or disjoint-set) class keeps track of groups of connected stations. Linking two stations
+    merges their groups, and finding the group of a station is almost instant thanks to path halving
+    and union by size.
+
+    Attributes:
+        parent (dict): The station that every station points to. A station that points to itself is the
+        representative of its group.
+        size (dict): The number of stations in the group of every representative.
+        group_count (int): The number of groups.
+    """
+
+    def __init__(self, stations=()):
+        self.parent = {}
+        self.size = {}
+        self.group_count = 0
+        for station in stations:
+            self.add(station)
+
+    def add(self, station):
+        """
+        This method adds a station as a group of its own.
+
+        Args:
+            station (str): The station to add.
+        """
+        if station not in self.parent:
+            self.parent[station] = station
+            self.size[station] = 1
+            self.group_count += 1
+
+    def find(self, station):
+        """
+        This method finds the representative of the group of a station.
+
+        Args:
+            station (str): The station.
+
+        Returns:
+            Representative (str): The representative station of the group.
+        """
+        parent = self.parent
+        while parent[station] != station:
+            # Path halving: make every other station on the way point to its grandparent.
+            parent[station] = parent[parent[station]]
+            station = parent[station]
+        return station
+
+    def union(self, first_station, second_station):
+        """
+        This method merges the groups of two stations.
+
+        Args:
+            first_station (str): One station.
+            second_station (str): The other station.
+
+        Returns:
+            Merged (bool): True if the stations were in different groups.
+        """
+        first_root = self.find(first_station)
+        second_root = self.find(second_station)
+        if first_root == second_root:
+            return False
+        # The smaller group is put under the bigger group, so that the groups stay shallow.
+        if self.size[first_root] < self.size[second_root]:
+            first_root, second_root = second_root, first_root
+        self.parent[second_root] = first_root
+        self.size[first_root] += self.size.pop(second_root)
+        self.group_count -= 1
+        return True
+
+    def connected(self, first_station, second_station):
+        """
+        This method checks whether two stations are in the same group.
+
+        Args:
+            first_station (str): One station.
+            second_station (str): The other station.
+
+        Returns:
+            Connected (bool): True if the stations are connected.
+        """
+        return self.find(first_station) == self.find(second_station)
+
+
+def connected_groups(graph):
+    """
+    This function finds the groups of connected stations of a graph.
+
+    Args:
+        graph (dict): The weighted graph.
+
+    Returns:
+        Union Find (UnionFind): The groups of connected stations.
+    """
+    groups = UnionFind(graph)
+    for station, neighbours in graph.items():
+        for neighbour in neighbours:
+            groups.union(station, neighbour)
+    return groups
+
+
+class ComponentIndex:
+    """
+    The ComponentIndex class keeps track of which stations can reach each other (their connected component),
+    so that "are these two stations connected?" is a single lookup, and "which stations can be reached from
+    this station?" only takes as long as the number of stations it gives back.
+
+    Every component is given a number. Linking two stations of different components merges the smaller
+    component into the bigger one (so a station is relabelled at most log2(stations) times). De-linking two
+    stations can only split a component if the link was a bridge, in which case only the stations on one side
+    of the link are relabelled.
+
+    The index can be shared with snapshots of the graph (see shared_table), so that they can answer questions
+    without a lock. The shared dictionaries are only copied the next time a component is merged or split
+    (copy-on-write), so links inside a component and de-links of links that aren't bridges never copy anything.
+
+    Attributes:
+        graph (dict): The weighted train graph that the index is built on.
+        component_of (dict): The component number of every station.
+        members (dict): The stations inside every component.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.component_of = {}
+        self.members = {}
+        self._next_component = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """This method builds the whole index from scratch."""
+        self.component_of = {}
+        self.members = {}
+        # Whether component_of and members are shared with a snapshot, and the components whose set of stations
+        # was made by the index since then (so it can be changed in place).
+        self._shared = False
+        self._own_components = set()
+        for station in self.graph:
+            if station not in self.component_of:
+                self._label_component(station)
+
+    @property
+    def component_count(self):
+        """The number of connected components, i.e. the number of separate parts of the network."""
+        return len(self.members)
+
+    def are_connected(self, station_input, station_target):
+        """
+        This method checks whether a station can be reached from another station.
+
+        Args:
+            station_input (str): One station.
+            station_target (str): The other station.
+
+        Returns:
+            Connected (bool): True if the stations are in the same part of the network.
+        """
+        return self.component_of[station_input] == self.component_of[station_target]
+
+    def reachable_stations(self, station):
+        """
+        This method finds every station that can be reached from a station (including the station itself).
+
+        Args:
+            station (str): The station.
+
+        Returns:
+            Stations (frozenset): The stations in the same part of the network.
+        """
+        return frozenset(self.members[self.component_of[station]])
+
+    def component_size(self, station):
+        """
+        This method counts the stations that can be reached from a station (including the station itself).
+
+        Args:
+            station (str): The station.
+
+        Returns:
+            Size (int): The number of stations in the same part of the network.
+        """
+        return len(self.members[self.component_of[station]])
+
+    def shared_table(self):
+        """
+        This method gives the current components to a snapshot of the graph, which can keep reading them
+        (without a lock) while the index itself goes on being repaired. Nothing is copied here, the index
+        copies them before it changes them next.
+
+        Returns:
+            Component Table (tuple): The component number of every station, and the stations inside every
+            component. These must not be changed.
+        """
+        self._shared = True
+        self._own_components = set()
+        return self.component_of, self.members
+
+    def _before_change(self, *components):
+        """
+        This method makes sure that the index doesn't change anything that a snapshot is still reading.
+
+        Args:
+            *components (int): The components whose set of stations is about to be changed in place.
+        """
+        if self._shared:
+            self.component_of = dict(self.component_of)
+            self.members = dict(self.members)
+            self._shared = False
+        for component in components:
+            if component not in self._own_components:
+                self.members[component] = set(self.members[component])
+                self._own_components.add(component)
+
+    def link_added(self, station_input, station_target):
+        """
+        This method updates the index after a link was added to the graph.
+
+        Args:
+            station_input (str): One station of the new link.
+            station_target (str): The other station of the new link.
+        """
+        input_component = self.component_of[station_input]
+        target_component = self.component_of[station_target]
+        if input_component == target_component:
+            return
+        # Merge the smaller component into the bigger one, so that the least stations are relabelled.
+        if len(self.members[input_component]) < len(self.members[target_component]):
+            input_component, target_component = target_component, input_component
+        self._before_change(input_component)
+        for station in self.members[target_component]:
+            self.component_of[station] = input_component
+        self.members[input_component] |= self.members.pop(target_component)
+
+    def link_removed(self, station_input, station_target, was_bridge=None):
+        """
+        This method updates the index after a link was removed from the graph.
+
+        Args:
+            station_input (str): One station of the removed link.
+            station_target (str): The other station of the removed link.
+            was_bridge (bool): Whether the link was a bridge (e.g. from the bridge index). If this is False,
+            the components can't have changed, so nothing needs to be searched. If this is None, the graph is
+            searched to find out.
+        """
+        if was_bridge is False:
+            return
+        old_component = self.component_of[station_input]
+        # Search from both stations at the same time, one station per turn, and stop as soon as one of the
+        # searches meets the other search or runs out of stations. This way the search only ever looks at
+        # about twice the stations of the smaller side.
+        searches = [({station_input}, deque([station_input])), ({station_target}, deque([station_target]))]
+        while True:
+            for (visited_stations, queue), (other_visited_stations, _) in zip(searches, reversed(searches)):
+                if not queue:
+                    # This side is cut off from the other side, so it becomes a new component.
+                    self._before_change(old_component)
+                    self.members[old_component] -= visited_stations
+                    component = self._next_component
+                    self._next_component += 1
+                    self.members[component] = visited_stations
+                    self._own_components.add(component)
+                    for station in visited_stations:
+                        self.component_of[station] = component
+                    return
+                station = queue.popleft()
+                for neighbour in self.graph[station]:
+                    if neighbour in other_visited_stations:
+                        # The two searches met, so the stations are still connected.
+                        return
+                    if neighbour not in visited_stations:
+                        visited_stations.add(neighbour)
+                        queue.append(neighbour)
+
+    def _label_component(self, start_station):
+        """
+        This method gives a new component number to every station that can be reached from a station.
+
+        Args:
+            start_station (str): The station to start from.
+        """
+        component = self._next_component
+        self._next_component += 1
+        members = {start_station}
+        stack = [start_station]
+        while stack:
+            station = stack.pop()
+            self.component_of[station] = component
+            for neighbour in self.graph[station]:
+                if neighbour not in members:
+                    members.add(neighbour)
+                    stack.append(neighbour)
+        self.members[component] = members
+        self._own_components.add(component)
@@ -0,0 +1,254 @@
+"""This script stores the contraction hierarchy class that makes route queries on big networks fast."""
+import heapq
+import time
+
+# The maximum number of stations a witness search is allowed to settle. If no witness is found within
+# this limit, a shortcut is added anyway (which is always correct, it just adds a shortcut that wasn't needed).
+WITNESS_SETTLE_LIMIT = 64
+
+
+class ContractionHierarchy:
+    """
+    The ContractionHierarchy class preprocesses the graph so that the shortest route between two stations
+    can be found by looking at only a small part of the graph.
+
+    Every station is "contracted" (removed from the graph) one at a time, from the least important station
+    to the most important one. When a station v is contracted, for every pair of neighbours u -> v -> w,
+    if u -> v -> w is the only shortest way from u to w, a shortcut u -> w is added (which remembers that it
+    goes through v). The order in which the stations are contracted is their rank.
+
+    A query then runs a bidirectional dijkstra search that only ever goes "upwards" (to stations with a higher
+    rank), forwards from the starting station and backwards from the target station. The shortest route goes
+    through the station where the two searches meet, and the shortcuts on it are unpacked into the original links.
+
+    Attributes:
+        rank (list): The rank (contraction order) of every station id.
+        links (dict): Every original link and shortcut, keyed by (from id, to id), with the value
+        (weight, middle station id), where the middle station id is None for an original link.
+        upward_links (list): For every station, the links that go to a station with a higher rank.
+        downward_links (list): For every station, the links that come from a station with a higher rank
+        (stored the other way around, so that the backward search can go upwards).
+        shortcut_count (int): The number of shortcuts that were added.
+        build_seconds (float): How long the preprocessing took.
+    """
+
+    def __init__(self, compiled_graph):
+        started = time.perf_counter()
+        station_count = len(compiled_graph)
+        self.links = {}
+        out_links = [{} for _ in range(station_count)]
+        in_links = [{} for _ in range(station_count)]
+        for station_id in range(station_count):
+            for neighbour, weight in compiled_graph.neighbours_of(station_id):
+                self._add_link(out_links, in_links, station_id, neighbour, weight, None)
+        self.shortcut_count = 0
+        self.rank = [0] * station_count
+        self._contract_all(out_links, in_links)
+        self.upward_links = [[] for _ in range(station_count)]
+        self.downward_links = [[] for _ in range(station_count)]
+        for (from_id, to_id), (weight, _) in self.links.items():
+            if self.rank[to_id] > self.rank[from_id]:
+                self.upward_links[from_id].append((to_id, weight))
+            else:
+                self.downward_links[to_id].append((from_id, weight))
+        self.build_seconds = time.perf_counter() - started
+
+    def _add_link(self, out_links, in_links, from_id, to_id, weight, middle_id):
+        """
+        This method adds a link (or shortcut) if there isn't already a link between the stations with a lower weight.
+
+        Args:
+            out_links (list): The links that go out of every station that hasn't been contracted yet.
+            in_links (list): The links that come into every station that hasn't been contracted yet.
+            from_id (int): The id of the station the link goes from.
+            to_id (int): The id of the station the link goes to.
+            weight (int): The weight of the link.
+            middle_id (int): The id of the station the shortcut goes through, or None for an original link.
+
+        Returns:
+            Added (bool): True if the link was added.
+        """
+        if weight >= out_links[from_id].get(to_id, float('inf')):
+            return False
+        out_links[from_id][to_id] = weight
+        in_links[to_id][from_id] = weight
+        self.links[(from_id, to_id)] = (weight, middle_id)
+        return True
+
+    def _contract_all(self, out_links, in_links):
+        """
+        This method contracts every station, choosing the next station with a lazily updated priority queue.
+        The priority of a station is its edge difference (the number of shortcuts contracting it would add,
+        minus the number of links it would remove), plus the number of its neighbours that are already
+        contracted (so that the contracted stations are spread evenly around the graph).
+
+        Args:
+            out_links (list): The links that go out of every station.
+            in_links (list): The links that come into every station.
+        """
+        contracted_neighbours = [0] * len(out_links)
+
+        def priority(station_id):
+            shortcuts = self._find_shortcuts(out_links, in_links, station_id)
+            return len(shortcuts) - len(out_links[station_id]) - len(in_links[station_id]) + \
+                contracted_neighbours[station_id]
+
+        priority_queue = [(priority(station_id), station_id) for station_id in range(len(out_links))]
+        heapq.heapify(priority_queue)
+        next_rank = 0
+        while priority_queue:
+            _, station_id = heapq.heappop(priority_queue)
+            # The priority might be outdated, so it's calculated again. If the station is no longer the
+            # lowest priority station, it's pushed back into the queue (this is called a lazy update).
+            current_priority = priority(station_id)
+            if priority_queue and current_priority > priority_queue[0][0]:
+                heapq.heappush(priority_queue, (current_priority, station_id))
+                continue
+            for from_id, to_id, weight in self._find_shortcuts(out_links, in_links, station_id):
+                if self._add_link(out_links, in_links, from_id, to_id, weight, station_id):
+                    self.shortcut_count += 1
+            # Remove the station from the graph.
+            for neighbour in out_links[station_id]:
+                del in_links[neighbour][station_id]
+                contracted_neighbours[neighbour] += 1
+            for neighbour in in_links[station_id]:
+                del out_links[neighbour][station_id]
+                contracted_neighbours[neighbour] += 1
+            out_links[station_id] = {}
+            in_links[station_id] = {}
+            self.rank[station_id] = next_rank
+            next_rank += 1
+
+    @staticmethod
+    def _find_shortcuts(out_links, in_links, station_id):
+        """
+        This method finds the shortcuts that are needed if a station is contracted. For every pair of neighbours
+        u -> station -> w, a witness search (a limited dijkstra search from u that doesn't go through the station)
+        checks if there is another way from u to w that isn't longer. If there isn't, a shortcut is needed.
+
+        Args:
+            out_links (list): The links that go out of every station that hasn't been contracted yet.
+            in_links (list): The links that come into every station that hasn't been contracted yet.
+            station_id (int): The id of the station to contract.
+
+        Returns:
+            Shortcuts (list): (from id, to id, weight) for every shortcut that is needed.
+        """
+        shortcuts = []
+        for from_id, in_weight in in_links[station_id].items():
+            targets = {to_id: in_weight + out_weight for to_id, out_weight in out_links[station_id].items()
+                       if to_id != from_id}
+            if not targets:
+                continue
+            max_weight = max(targets.values())
+            shortest_distance = {from_id: 0}
+            settled_stations = set()
+            priority_queue = [(0, from_id)]
+            while priority_queue and len(settled_stations) < WITNESS_SETTLE_LIMIT:
+                current_weight, minimum_node = heapq.heappop(priority_queue)
+                if minimum_node in settled_stations:
+                    continue
+                if current_weight > max_weight:
+                    break
+                settled_stations.add(minimum_node)
+                for child_nodes, weight in out_links[minimum_node].items():
+                    if child_nodes != station_id and \
+                            current_weight + weight < shortest_distance.get(child_nodes, float('inf')):
+                        shortest_distance[child_nodes] = current_weight + weight
+                        heapq.heappush(priority_queue, (current_weight + weight, child_nodes))
+            for to_id, weight in targets.items():
+                if shortest_distance.get(to_id, float('inf')) > weight:
+                    shortcuts.append((from_id, to_id, weight))
+        return shortcuts
+
+    def route(self, start_id, target_id, search_stats=None):
+        """
+        This method finds the shortest route of a starting station to a target station.
+
+        Args:
+            start_id (int): The id of the starting station.
+            target_id (int): The id of the target station.
+            search_stats (SearchStats): Filled in with the work done by the search, if it's given.
+
+        Returns:
+            Route and Settled Count (tuple): The station ids and weight of the route (or None if the target station
+            can't be reached), and the number of stations that were settled by both searches.
+        """
+        infinity = float('inf')
+        # Index 0 is the forward search (on the upward links), and index 1 is the backward search
+        # (on the downward links, which are stored the other way around).
+        links = (self.upward_links, self.downward_links)
+        shortest_distance = ({start_id: 0}, {target_id: 0})
+        predecessor = ({}, {})
+        settled_stations = (set(), set())
+        priority_queues = ([(0, start_id)], [(0, target_id)])
+        best_weight = infinity
+        meeting_station = None
+        heap_pushes = 2
+
+        while priority_queues[0] or priority_queues[1]:
+            for side in (0, 1):
+                if not priority_queues[side]:
+                    continue
+                current_weight, minimum_node = heapq.heappop(priority_queues[side])
+                # A search can stop once its lowest weight is already higher than the best route found so far.
+                if current_weight >= best_weight:
+                    priority_queues[side].clear()
+                    continue
+                if minimum_node in settled_stations[side]:
+                    continue
+                settled_stations[side].add(minimum_node)
+                other_weight = shortest_distance[1 - side].get(minimum_node)
+                if other_weight is not None and current_weight + other_weight < best_weight:
+                    best_weight = current_weight + other_weight
+                    meeting_station = minimum_node
+                for child_nodes, weight in links[side][minimum_node]:
+                    if current_weight + weight < shortest_distance[side].get(child_nodes, infinity):
+                        shortest_distance[side][child_nodes] = current_weight + weight
+                        predecessor[side][child_nodes] = minimum_node
+                        heapq.heappush(priority_queues[side], (current_weight + weight, child_nodes))
+                        heap_pushes += 1
+
+        settled_count = len(settled_stations[0]) + len(settled_stations[1])
+        if search_stats is not None:
+            # A search that stops early clears its heap, so the pops can't be worked out from what is left
+            # in the heap. Every settled station was popped once, which is used as the pop count instead.
+            scanned = sum(len(links[side][station_id]) for side in (0, 1) for station_id in settled_stations[side])
+            search_stats.add(settled_count, scanned, heap_pushes - 2, heap_pushes, settled_count)
+        if meeting_station is None:
+            return None, settled_count
+        started = time.perf_counter()
+        # Trace the route through the hierarchy (which contains shortcuts) from both sides of the meeting station.
+        path = [meeting_station]
+        while path[-1] != start_id:
+            path.append(predecessor[0][path[-1]])
+        path.reverse()
+        while path[-1] != target_id:
+            path.append(predecessor[1][path[-1]])
+        # Unpack every shortcut back into the original links.
+        unpacked_path = [start_id]
+        for from_id, to_id in zip(path, path[1:]):
+            self._unpack(from_id, to_id, unpacked_path)
+        if search_stats is not None:
+            search_stats.reconstruction_seconds += time.perf_counter() - started
+        return (unpacked_path, best_weight), settled_count
+
+    def _unpack(self, from_id, to_id, path):
+        """
+        This method unpacks a link (or shortcut) into the original links, appending the stations to a path.
+
+        Args:
+            from_id (int): The id of the station the link goes from (which is already on the path).
+            to_id (int): The id of the station the link goes to.
+            path (list): The path to append the stations to.
+        """
+        # A stack is used instead of recursion, as a shortcut can contain many levels of other shortcuts.
+        stack = [(from_id, to_id)]
+        while stack:
+            first_id, second_id = stack.pop()
+            middle_id = self.links[(first_id, second_id)][1]
+            if middle_id is None:
+                path.append(second_id)
+            else:
+                stack.append((middle_id, second_id))
+                stack.append((first_id, middle_id))
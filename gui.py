@@ -1,14 +1,182 @@
 """This script stores the train logic class that contains all the program-related functions."""
 # All things taken from the internet are put in REFERENCE_LIST.txt
 # Initialize libraries needed for the program.
+import queue
+import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
-from variables import mrt_train_graph
 from logic import TrainLogic
 
 Trains = TrainLogic()
 
 
+class BackgroundWorker:
+    """
+    This class runs the TrainLogic operations on a pool of worker threads, so that the window doesn't freeze
+    while a big network is being searched. Tkinter can only be used from the main thread, so the workers
+    put their results into a queue, and the main loop picks them up every few milliseconds using after().
+
+    Every operation is sent on a channel (e.g. the results list of a page). Sending a new operation on a channel
+    makes the older operation of that channel stale: if it hasn't started yet it's cancelled, and if it's
+    still running, whatever it gives back is thrown away (a stream stops at its next chunk).
+
+    Attributes:
+        root (tk.Tk): The window whose main loop the results are given back on.
+        chunk_size (int): The number of items a stream gives back at a time.
+        poll_ms (int): How often (in milliseconds) the main loop checks for results.
+        frame_budget (float): The most time (in seconds) the main loop spends on results before it lets
+        tkinter handle other events (e.g. redrawing the window or a button click).
+    """
+
+    def __init__(self, root, workers=2, chunk_size=200, poll_ms=20, frame_budget=0.01):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.poll_ms = poll_ms
+        self.frame_budget = frame_budget
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="smrt-worker")
+        # Every item is (channel, generation, callback, value), and is only used if its generation is
+        # still the latest generation of its channel.
+        self._results = queue.SimpleQueue()
+        self._generations = {}
+        self._futures = {}
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def run(self, channel, function, *arguments, on_result, on_error=None):
+        """
+        This method runs a function on a worker thread, and gives its result back on the main loop.
+
+        Args:
+            channel (str): The channel to send the operation on, or None if the operation must never be
+            cancelled (e.g. linking or de-linking stations).
+            function (function): The function to run.
+            *arguments: The arguments to give to the function.
+            on_result (function): Called on the main loop with the result.
+            on_error (function): Called on the main loop with the exception, if the function raises one.
+        """
+        generation = self._start(channel)
+        on_error = on_error or self._show_error
+
+        def work():
+            try:
+                result = function(*arguments)
+            except Exception as error:
+                self._results.put((channel, generation, on_error, error))
+            else:
+                self._results.put((channel, generation, on_result, result))
+
+        future = self._executor.submit(work)
+        if channel is not None:
+            self._futures[channel] = future
+
+    def stream(self, channel, function, *arguments, on_chunk, on_done=None, on_error=None):
+        """
+        This method loops over a generator on a worker thread, and gives back its items in chunks on the main loop,
+        so that the first items can be shown while the rest are still being found.
+
+        Args:
+            channel (str): The channel to send the operation on.
+            function (function): The function that makes the generator.
+            *arguments: The arguments to give to the function.
+            on_chunk (function): Called on the main loop with every chunk (a list of items).
+            on_done (function): Called on the main loop (with None) once every item has been given back.
+            on_error (function): Called on the main loop with the exception, if the generator raises one.
+        """
+        generation = self._start(channel)
+        on_error = on_error or self._show_error
+
+        def work():
+            chunk = []
+            try:
+                for item in function(*arguments):
+                    chunk.append(item)
+                    if len(chunk) == self.chunk_size:
+                        # Stop straight away if a newer operation was sent on the channel.
+                        if self.is_stale(channel, generation):
+                            return
+                        self._results.put((channel, generation, on_chunk, chunk))
+                        chunk = []
+            except Exception as error:
+                self._results.put((channel, generation, on_error, error))
+                return
+            if chunk:
+                self._results.put((channel, generation, on_chunk, chunk))
+            if on_done is not None:
+                self._results.put((channel, generation, on_done, None))
+
+        self._futures[channel] = self._executor.submit(work)
+
+    def cancel(self, channel):
+        """
+        This method makes the operation of a channel stale, so that nothing more is given back from it.
+
+        Args:
+            channel (str): The channel.
+        """
+        self._start(channel)
+
+    def is_stale(self, channel, generation):
+        """
+        This method checks whether a newer operation was sent on a channel.
+
+        Args:
+            channel (str): The channel.
+            generation (int): The generation of the operation.
+
+        Returns:
+            Stale (bool): True if the result of the operation should be thrown away.
+        """
+        return channel is not None and (self._closed or self._generations.get(channel) != generation)
+
+    def close(self):
+        """This method stops giving back results, and stops the workers once they're done with what they're doing."""
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, channel):
+        """
+        This method starts a new generation of a channel, cancelling the older operation if it hasn't started yet.
+
+        Args:
+            channel (str): The channel, or None for an operation that can't be cancelled.
+
+        Returns:
+            Generation (int): The generation of the new operation.
+        """
+        if channel is None:
+            return None
+        generation = self._generations.get(channel, 0) + 1
+        self._generations[channel] = generation
+        future = self._futures.pop(channel, None)
+        if future is not None:
+            future.cancel()
+        return generation
+
+    def _poll(self):
+        """
+        This method gives the results of the workers back to their callbacks. It only spends frame_budget seconds
+        at a time doing this, so that a traversal of thousands of stations is added to the window in pieces
+        without freezing it.
+        """
+        if self._closed:
+            return
+        deadline = time.perf_counter() + self.frame_budget
+        while time.perf_counter() < deadline:
+            try:
+                channel, generation, callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if not self.is_stale(channel, generation):
+                callback(value)
+        # If there are results left, check again as soon as tkinter has handled its other events.
+        self.root.after(1 if not self._results.empty() else self.poll_ms, self._poll)
+
+    @staticmethod
+    def _show_error(error):
+        messagebox.showerror("Error", str(error))
+
+
 class MainController(tk.Tk):
     """
     This class is the main controller for the tkinter frames
@@ -19,6 +187,9 @@ class MainController(tk.Tk):
     def __init__(self, *args, **kwargs):
         # Initialize a class that inherits the Tk module.
         tk.Tk.__init__(self, *args, **kwargs)
+        # The searches and traversals run on worker threads, so that the window stays responsive.
+        self.worker = BackgroundWorker(self)
+        self.protocol("WM_DELETE_WINDOW", self.close)
         # Create a frame container that'll be used to show
         # Multiple frames (pages) that is going to be used for the program.
         frame_containers = tk.Frame(self)
@@ -26,15 +197,14 @@ class MainController(tk.Tk):
         frame_containers.grid_rowconfigure(0, weight=1)
         frame_containers.grid_columnconfigure(0, weight=1)
 
-        self.graph = mrt_train_graph
-        self.station_names = tk.StringVar(value=[*self.graph.keys()])
+        self.station_names = tk.StringVar(value=[*Trains.graph.keys()])
 
         self.button_style = ttk.Style(self)
         self.button_style.theme_use('clam')
         self.button_style.configure('flat.TButton', borderwidth=0, background='#038579', foreground="#ffffff")
         self.frames = {}
 
-        for pages in (StartPage, FindRouteLinkDelink, TraverseNeighbours):
+        for pages in (StartPage, FindRouteLinkDelink, TraverseNeighbours, PerformanceMetrics):
             frames = pages(frame_containers, self)
             self.frames[pages] = frames
             frames.grid(row=0, column=0, sticky="nsew")
@@ -44,6 +214,10 @@ class MainController(tk.Tk):
     def show_frame(self, page):
         self.frames[page].tkraise()
 
+    def close(self):
+        self.worker.close()
+        self.destroy()
+
 
 class StartPage(tk.Frame):
     """
@@ -66,6 +240,10 @@ class StartPage(tk.Frame):
                                             command=lambda: controller.show_frame(TraverseNeighbours),
                                             style='flat.TButton')
         traverse_neighbour_btn.pack(pady=10)
+        performance_metrics_btn = ttk.Button(self, text="Performance Metrics",
+                                             command=lambda: controller.show_frame(PerformanceMetrics),
+                                             style='flat.TButton')
+        performance_metrics_btn.pack()
 
 
 class FindRouteLinkDelink(tk.Frame):
@@ -84,6 +262,14 @@ class FindRouteLinkDelink(tk.Frame):
                                      font="Roboto-Light")
         results_list = tk.Listbox(self, font="Roboto-Light")
 
+        def show_route(shortest_route):
+            if shortest_route is None:
+                results_list.insert('end', "Sorry, that station can't be reached.")
+                return
+            # The route is only turned into text here, when it's shown.
+            results_list.insert('end', *shortest_route.path_lines())
+            results_list.insert('end', shortest_route.weight_line())
+
         def find_shortest_route():
             # Clear the output listbox when the method is called
             # so that the previous output does not overlap with the current one.
@@ -92,10 +278,10 @@ class FindRouteLinkDelink(tk.Frame):
                 station_input = depart_stations.get(depart_stations.curselection())
                 station_target = arrive_stations.get(arrive_stations.curselection())
                 results_list.insert('end', f"Route to {station_target}:")
-                shortest_route = Trains.dijkstra_algorithm(station_input, station_target)
-                for routes in shortest_route[0]:
-                    results_list.insert('end', routes)
-                results_list.insert('end', shortest_route[1])
+                # The route is found on a worker thread. If another route is asked for before this one is found,
+                # this one is thrown away, so the results list only ever shows the latest route.
+                controller.worker.run("route_results", Trains.dijkstra_algorithm, station_input, station_target,
+                                      on_result=show_route)
             except tk.TclError:
                 # If the user did not pick any station, it'll raise a TclError exception.
                 # So, we can handle it by using the try and except clause and show a warning
@@ -106,8 +292,10 @@ class FindRouteLinkDelink(tk.Frame):
             try:
                 station_input = depart_stations.get(depart_stations.curselection())
                 station_target = arrive_stations.get(arrive_stations.curselection())
-                messagebox.showinfo("Station Linking Information ", Trains.link_stations(station_input,
-                                                                                         station_target))
+                # Linking is never cancelled, the message is shown once it's done.
+                controller.worker.run(None, Trains.link_stations, station_input, station_target,
+                                      on_result=lambda message: messagebox.showinfo("Station Linking Information ",
+                                                                                    message))
             except tk.TclError:
                 messagebox.showinfo("Warning", "You haven't picked a station yet!")
 
@@ -115,8 +303,9 @@ class FindRouteLinkDelink(tk.Frame):
             try:
                 station_input = depart_stations.get(depart_stations.curselection())
                 station_target = arrive_stations.get(arrive_stations.curselection())
-                messagebox.showinfo("Station De-linking Information", Trains.delink_stations(station_input,
-                                                                                             station_target))
+                controller.worker.run(None, Trains.delink_stations, station_input, station_target,
+                                      on_result=lambda message: messagebox.showinfo("Station De-linking Information",
+                                                                                    message))
             except tk.TclError:
                 messagebox.showinfo("Warning", "You haven't picked a station yet!")
 
@@ -167,17 +356,21 @@ class TraverseNeighbours(tk.Frame):
             results_list.delete('0', 'end')
             try:
                 station_input = stations.get(stations.curselection())
-                for all_stations in Trains.dfs_algorithm(station_input):
-                    results_list.insert('end', all_stations)
+                # The traversal runs on a worker thread, and the stations are added to the results list in chunks
+                # as soon as they're visited, instead of waiting for the whole traversal.
+                controller.worker.stream("traverse_results", Trains.traversal_path, station_input,
+                                         on_chunk=lambda chunk: results_list.insert('end', *chunk))
             except tk.TclError:
                 messagebox.showinfo("Warning", "You haven't picked a station yet!")
 
         def show_neighbours():
+            # Stop a traversal that is still running from adding more stations to the results list.
+            controller.worker.cancel("traverse_results")
             results_list.delete('0', 'end')
             try:
                 station_input = stations.get(stations.curselection())
                 results_list.insert('end', f"Neighbours of {station_input}:")
-                for all_stations in controller.graph[station_input]:
+                for all_stations in Trains.graph[station_input]:
                     results_list.insert('end', all_stations)
             except tk.TclError:
                 messagebox.showinfo("Warning", "You haven't picked a station yet!")
@@ -205,6 +398,63 @@ class TraverseNeighbours(tk.Frame):
         main_menu_btn.grid(row=3, column=0, columnspan=2, sticky=tk.N + tk.S + tk.W + tk.E)
 
 
+class PerformanceMetrics(tk.Frame):
+    """
+    This class lets the user turn the collection of performance metrics on or off,
+    and shows the metrics that were collected.
+    """
+
+    def __init__(self, parent, controller):
+        tk.Frame.__init__(self, parent)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        results_list = tk.Listbox(self, font="Roboto-Light")
+        toggle_text = tk.StringVar(value="Turn On Metrics")
+
+        def show_metrics():
+            results_list.delete('0', 'end')
+            if Trains.metrics is None:
+                results_list.insert('end', "Performance metrics aren't being collected.")
+                return
+            for line in Trains.metrics.format_report():
+                results_list.insert('end', line)
+
+        def toggle_metrics():
+            if Trains.metrics is None:
+                Trains.enable_metrics()
+                toggle_text.set("Turn Off Metrics")
+            else:
+                Trains.disable_metrics()
+                toggle_text.set("Turn On Metrics")
+            show_metrics()
+
+        def reset_metrics():
+            if Trains.metrics is not None:
+                Trains.metrics.reset()
+            show_metrics()
+
+        # Buttons
+        main_menu_btn = ttk.Button(self, text="Main Menu", command=lambda: controller.show_frame(StartPage),
+                                   style='flat.TButton')
+        toggle_btn = ttk.Button(self, textvariable=toggle_text, command=toggle_metrics, style='flat.TButton')
+        refresh_btn = ttk.Button(self, text="Show Metrics", command=show_metrics, style='flat.TButton')
+        reset_btn = ttk.Button(self, text="Reset Metrics", command=reset_metrics, style='flat.TButton')
+
+        # Headers
+        results_label = tk.Label(self, text="Performance Metrics", bg="#ab3750", font='Roboto-Medium',
+                                 foreground='white')
+
+        # ----------------------------
+        # RENDERING LABELS AND BUTTONS
+        # ----------------------------
+        results_label.grid(row=0, column=0, columnspan=3, sticky=tk.N + tk.S + tk.W + tk.E)
+        results_list.grid(row=1, column=0, columnspan=3, sticky=tk.N + tk.S + tk.W + tk.E)
+        toggle_btn.grid(row=2, column=0, sticky=tk.N + tk.S + tk.W + tk.E)
+        refresh_btn.grid(row=2, column=1, sticky=tk.N + tk.S + tk.W + tk.E)
+        reset_btn.grid(row=2, column=2, sticky=tk.N + tk.S + tk.W + tk.E)
+        main_menu_btn.grid(row=3, column=0, columnspan=3, sticky=tk.N + tk.S + tk.W + tk.E)
+
+
 def main():
     smrt_program = MainController()
     smrt_program.title("SMRT Smart Mapper")
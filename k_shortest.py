@@ -0,0 +1,142 @@
+"""This script stores the functions that find the k shortest routes between two stations (alternative routes)."""
+import heapq
+
+
+def k_shortest_routes(compiled_graph, reverse_graph, start_id, target_id, k, max_detour=None):
+    """
+    This function finds the k shortest loopless routes between two stations using Yen's algorithm.
+
+    Yen's algorithm finds the routes one at a time. For every station on the latest route (the spur station),
+    it keeps the part of the route up to that station (the root), and searches for the shortest way from the
+    spur station to the target station that doesn't use the stations of the root, and doesn't leave the spur
+    station the same way as any route found so far that has the same root. Every root + spur route is a
+    candidate, and the shortest candidate is the next route.
+
+    A few things make this a lot faster than removing links from the graph and running dijkstra again:
+    - Nothing is removed from the graph, the spur searches just skip the blocked stations and links.
+    - The minimum weight from every station to the target station is found once (on the reversed graph), and the
+      spur searches use it as the A* estimate. Blocking stations and links can only make routes longer, so the
+      estimate is always a lower bound, and most spur searches go almost straight to the target station.
+    - The links that leave a root are looked up in a dictionary of the roots of every route found so far,
+      instead of comparing the root with every route.
+    - A new route only needs spur searches from where it leaves the route it was found from (Lawler's change
+      to Yen's algorithm), as the stations before that were already searched with the same root.
+    - With max_detour, the searches stop as soon as a route can't be short enough.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to search in.
+        reverse_graph (CompiledGraph): The same graph with every link reversed.
+        start_id (int): The id of the starting station.
+        target_id (int): The id of the target station.
+        k (int): The maximum number of routes to find.
+        max_detour (float): The routes can be at most this many times the weight of the shortest route
+        (e.g. 1.5 for at most 50% longer). If this is None, there is no limit.
+
+    Returns:
+        Routes (list): The station ids and weight of every route, from the shortest to the longest.
+    """
+    distance_to_target, _ = reverse_graph.shortest_paths(target_id)
+    if start_id not in distance_to_target:
+        return []
+    infinity = float('inf')
+    weight_limit = infinity if max_detour is None else distance_to_target[start_id] * max_detour
+
+    first_route = _spur_search(compiled_graph, distance_to_target, start_id, target_id, set(), (), weight_limit)
+    # Every route is stored as (station ids, the weight from the starting station to every station on the route).
+    routes = [first_route]
+    # The index of the station where every route leaves the route it was found from.
+    deviation_indexes = [0]
+    # For every root of every route found so far, the stations that the routes go to after the root.
+    next_stations_of_root = {}
+    _add_roots(next_stations_of_root, first_route[0])
+    candidates = []
+    seen_candidates = set()
+
+    while len(routes) < k:
+        path, weights = routes[-1]
+        for spur_index in range(deviation_indexes[-1], len(path) - 1):
+            root = tuple(path[:spur_index + 1])
+            root_weight = weights[spur_index]
+            spur_route = _spur_search(compiled_graph, distance_to_target, path[spur_index], target_id,
+                                      set(root[:-1]), next_stations_of_root[root], weight_limit - root_weight)
+            if spur_route is None:
+                continue
+            spur_path, spur_weights = spur_route
+            candidate_path = root[:-1] + tuple(spur_path)
+            if candidate_path in seen_candidates:
+                continue
+            seen_candidates.add(candidate_path)
+            candidate_weights = weights[:spur_index] + [root_weight + weight for weight in spur_weights]
+            heapq.heappush(candidates, (candidate_weights[-1], candidate_path, candidate_weights, spur_index))
+        if not candidates:
+            break
+        _, candidate_path, candidate_weights, spur_index = heapq.heappop(candidates)
+        routes.append((list(candidate_path), candidate_weights))
+        deviation_indexes.append(spur_index)
+        _add_roots(next_stations_of_root, candidate_path)
+    return [(path, weights[-1]) for path, weights in routes]
+
+
+def _add_roots(next_stations_of_root, path):
+    """
+    This function remembers which station a route goes to after every one of its roots.
+
+    Args:
+        next_stations_of_root (dict): The stations that the routes go to after every root.
+        path (list): The station ids of the route.
+    """
+    for index in range(len(path) - 1):
+        next_stations_of_root.setdefault(tuple(path[:index + 1]), set()).add(path[index + 1])
+
+
+def _spur_search(compiled_graph, distance_to_target, spur_id, target_id, blocked_stations, blocked_next_stations,
+                 weight_limit):
+    """
+    This function finds the shortest way from a spur station to the target station using A* search, where the
+    estimate of the remaining weight is the minimum weight to the target station on the whole graph.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to search in.
+        distance_to_target (dict): The minimum weight from every station to the target station.
+        spur_id (int): The id of the station to start from.
+        target_id (int): The id of the target station.
+        blocked_stations (set): The stations that can't be used.
+        blocked_next_stations (set): The stations that can't be gone to straight from the spur station.
+        weight_limit (float): The maximum weight of the way to the target station.
+
+    Returns:
+        Route (tuple): The station ids of the way to the target station, and the weight from the spur station to
+        every station on it, or None if there is no way to the target station within the weight limit.
+    """
+    infinity = float('inf')
+    shortest_distance = {spur_id: 0}
+    predecessor = {}
+    settled_stations = set()
+    priority_queue = [(distance_to_target[spur_id], spur_id)]
+
+    while priority_queue:
+        estimated_weight, minimum_node = heapq.heappop(priority_queue)
+        if minimum_node in settled_stations:
+            continue
+        # The estimate never overestimates, so once it's over the limit, every other way is too.
+        if estimated_weight > weight_limit:
+            return None
+        settled_stations.add(minimum_node)
+        if minimum_node == target_id:
+            path = [target_id]
+            while path[-1] != spur_id:
+                path.append(predecessor[path[-1]])
+            path.reverse()
+            return path, [shortest_distance[station_id] for station_id in path]
+        current_weight = shortest_distance[minimum_node]
+        for child_nodes, weight in compiled_graph.neighbours_of(minimum_node):
+            if child_nodes in settled_stations or child_nodes in blocked_stations or \
+                    child_nodes not in distance_to_target or \
+                    minimum_node == spur_id and child_nodes in blocked_next_stations:
+                continue
+            if current_weight + weight < shortest_distance.get(child_nodes, infinity):
+                shortest_distance[child_nodes] = current_weight + weight
+                predecessor[child_nodes] = minimum_node
+                heapq.heappush(priority_queue, (current_weight + weight + distance_to_target[child_nodes],
+                                                child_nodes))
+    return None
@@ -1,6 +1,25 @@
 """This script stores the train logic class that contains all the program-related functions."""
 # All things taken from the internet are put in REFERENCE_LIST.txt
-import copy
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from bridges import BridgeIndex
+from compiled_graph import CompiledGraph, trace_path, uses_link
+from components import ComponentIndex, connected_groups
+from k_shortest import k_shortest_routes
+from metrics import MetricsRegistry, SearchStats, profile_call
+from network_io import is_snapshot, load_network, load_snapshot, save_snapshot
+from route import Route
+from route_cache import RouteCache
+from route_strategies import ROUTE_STRATEGIES, alt_search, bidirectional_search, dijkstra_search
+from shortest_path_tree import ShortestPathTree
+from snapshot import GraphSnapshot
+from traversal import TRAVERSAL_MODES, breadth_first, breadth_first_levels, depth_first
 from variables import mrt_train_graph
 
 
@@ -10,13 +29,383 @@ class TrainLogic:
     for the program.
 
     Attributes:
-        graph (dict): This dictionary is basically an "adjacency list" (well, it's a adjacency dictionary)
+        graph (FrozenGraph): This dictionary is basically an "adjacency list" (well, it's a adjacency dictionary)
         that represents a weighted graph of the SMRT Map. Every interchange has a weight of 2, and every normal
-        station has a weight of 1.
+        station has a weight of 1. It's a read-only view of the latest snapshot of the graph.
+        snapshot (GraphSnapshot): The latest version of the graph, together with everything built from it.
+        all_pairs (bool): Whether the shortest routes between every pair of stations are precomputed.
+        This makes finding a route a simple lookup, at the cost of memory (which grows with the square
+        of the number of stations).
+        compiled_graph (CompiledGraph): The integer-indexed version of the graph that the algorithms run on.
+        all_pairs_table (AllPairsTable): The precomputed shortest routes, used when all_pairs is enabled.
+        landmark_count (int): The number of landmarks used by the "alt" route strategy.
+        graph_version (int): A number that goes up every time the graph changes.
+        bridge_index (BridgeIndex): Every link that can't be removed without splitting the network.
+        component_index (ComponentIndex): Which stations can reach each other.
+        route_cache (RouteCache): The most recently found routes, keyed on (start station, target station,
+        graph version) so that a route found before the graph changed is never used again.
+        metrics (MetricsRegistry): Where the performance metrics of the algorithms are collected,
+        or None if they aren't being collected (which is the default).
     """
 
-    def __init__(self):
-        self.graph = mrt_train_graph
+    def __init__(self, graph=None, all_pairs=False, route_cache_size=128, landmark_count=4):
+        # If no graph is given, the SMRT Map is used. The graph that is given is never changed,
+        # linking and de-linking stations makes a new snapshot of the graph instead.
+        self._snapshot = GraphSnapshot(0, mrt_train_graph if graph is None else graph, landmark_count=landmark_count)
+        self.all_pairs = all_pairs
+        self.landmark_count = landmark_count
+        self.route_cache = RouteCache(route_cache_size)
+        # Only one link or de-link can happen at a time. Route queries never need this lock,
+        # as they run on the snapshot that was published when they started.
+        self._edit_lock = threading.Lock()
+        # The bridge index is built the first time it's needed, and is repaired when the graph changes.
+        # It's only used while linking or de-linking, so it's protected by the edit lock.
+        self._bridge_index = None
+        # The component index is built the first time it's needed too, and is also protected by the edit lock.
+        self._component_index = None
+        # Collecting metrics is turned off by default, in which case every algorithm only checks this once per call.
+        self.metrics = None
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """
+        This method makes a TrainLogic from a network file, which can either be an edge list
+        (.csv or .jsonl), a dictionary of dictionaries (.json), or a binary snapshot (see save_snapshot).
+
+        A snapshot is memory-mapped instead of being read, and the weighted graph (dictionary) is only built
+        from it when something needs it (e.g. linking or de-linking stations). Finding routes and traversing
+        the network work straight from the mapped file.
+
+        Args:
+            path (str): The path of the network file.
+            **options: The other arguments of TrainLogic (e.g. route_cache_size).
+
+        Returns:
+            Train Logic (TrainLogic): The TrainLogic of the loaded network.
+        """
+        if not is_snapshot(path):
+            return cls(load_network(path), **options)
+        trains = cls({}, **options)
+        trains._snapshot = GraphSnapshot(0, compiled_graph=load_snapshot(path), landmark_count=trains.landmark_count)
+        return trains
+
+    def save_snapshot(self, path):
+        """
+        This method saves the network as a binary snapshot, which can be loaded again almost instantly with from_file.
+
+        Args:
+            path (str): The path of the snapshot file.
+        """
+        save_snapshot(self.compiled_graph, path)
+
+    @property
+    def snapshot(self):
+        """
+        The latest published snapshot of the graph. Code that needs to look at the graph more than once
+        should keep the snapshot, so that it sees the same graph every time.
+
+        Returns:
+            Snapshot (GraphSnapshot): The latest snapshot of the graph.
+        """
+        return self._snapshot
+
+    @property
+    def graph(self):
+        """
+        A read-only view of the latest weighted graph of the network.
+
+        Returns:
+            graph (FrozenGraph): The weighted graph, which works just like mrt_train_graph.
+        """
+        return self._snapshot.graph
+
+    @property
+    def graph_version(self):
+        """The version of the latest graph, which goes up every time the graph changes."""
+        return self._snapshot.version
+
+    @property
+    def compiled_graph(self):
+        """The integer-indexed version of the latest graph that the algorithms run on."""
+        return self._snapshot.compiled_graph
+
+    @property
+    def reverse_compiled_graph(self):
+        """The compiled version of the latest graph with every link reversed."""
+        return self._snapshot.reverse_compiled_graph
+
+    @property
+    def landmarks(self):
+        """The landmarks of the latest graph, used by the "alt" route strategy."""
+        return self._snapshot.landmarks
+
+    @property
+    def contraction_hierarchy(self):
+        """The contraction hierarchy of the latest graph, used by the "ch" route strategy."""
+        return self._snapshot.contraction_hierarchy
+
+    @property
+    def all_pairs_table(self):
+        """The precomputed shortest routes between every pair of stations of the latest graph."""
+        return self._snapshot.all_pairs_table
+
+    @property
+    def bridge_index(self):
+        """
+        The index of every link that can't be removed without splitting the network.
+        It's built the first time it's needed, and kept up to date after that.
+
+        Returns:
+            Bridge Index (BridgeIndex): The bridge index of the graph.
+        """
+        if self._bridge_index is None:
+            self._bridge_index = BridgeIndex(self._snapshot.adjacency)
+        return self._bridge_index
+
+    @property
+    def component_index(self):
+        """
+        The index of which stations can reach each other.
+        It's built the first time it's needed, and kept up to date after that.
+
+        Returns:
+            Component Index (ComponentIndex): The component index of the graph.
+        """
+        if self._component_index is None:
+            snapshot = self._snapshot
+            self._component_index = ComponentIndex(snapshot.adjacency)
+            # Traversals and reachability questions read the components from the snapshot, so they never need the
+            # index (or the lock).
+            snapshot.component_table = self._component_index.shared_table()
+        return self._component_index
+
+    def are_connected(self, station_input, station_target):
+        """
+        This method checks whether a station can be reached from another station, without searching the graph.
+
+        Args:
+            station_input (str): One station.
+            station_target (str): The other station.
+
+        Returns:
+            Connected (bool): True if there is a route between the two stations.
+        """
+        return self._component_snapshot().are_connected(station_input, station_target)
+
+    def reachable_stations(self, start_station):
+        """
+        This method finds every station that can be reached from a station (including the station itself),
+        without searching the graph.
+
+        Args:
+            start_station (str): The station to start from.
+
+        Returns:
+            Stations (frozenset): The stations that can be reached.
+        """
+        return self._component_snapshot().reachable_stations(start_station)
+
+    def _component_snapshot(self):
+        """
+        This method gives back the latest snapshot, making sure that it knows the components of the graph.
+        Only the first call builds the component index (under the edit lock), after that every snapshot gets
+        the components when it's published, so reachability questions never wait for an edit.
+
+        Returns:
+            Snapshot (GraphSnapshot): The latest snapshot, with its component table.
+        """
+        snapshot = self._snapshot
+        if snapshot.component_table is None:
+            with self._edit_lock:
+                snapshot = self._snapshot
+                if snapshot.component_table is None:
+                    # The index is always up to date with the latest snapshot while the edit lock is held.
+                    snapshot.component_table = self.component_index.shared_table()
+        return snapshot
+
+    def all_pairs_report(self):
+        """
+        This method shows how long the all-pairs table took to build and how much memory it uses,
+        so that it's possible to decide whether the all-pairs mode is worth it for a network.
+
+        Returns:
+            Report (dict): The number of stations, the build time in seconds and the memory usage in bytes.
+        """
+        table = self.all_pairs_table
+        return {
+            "stations": len(table),
+            "build_seconds": table.build_seconds,
+            "memory_bytes": table.memory_usage(),
+        }
+
+    def enable_metrics(self, registry=None):
+        """
+        This method turns on the collection of performance metrics (wall time, settled stations, relaxed links,
+        heap operations and route reconstruction time of every call).
+
+        Args:
+            registry (MetricsRegistry): Where to collect the metrics. If this is None, the registry that is
+            already being used is kept, or a new one is made.
+
+        Returns:
+            Registry (MetricsRegistry): The registry the metrics are collected in.
+        """
+        if registry is None:
+            registry = self.metrics or MetricsRegistry()
+        self.metrics = registry
+        return registry
+
+    def disable_metrics(self):
+        """
+        This method turns off the collection of performance metrics.
+
+        Returns:
+            Registry (MetricsRegistry): The registry the metrics were collected in (or None), so it can still be read.
+        """
+        registry, self.metrics = self.metrics, None
+        return registry
+
+    def profile(self, method_name, *arguments, sort_by="cumulative", limit=20):
+        """
+        This method runs a single query (e.g. profile("dijkstra_algorithm", "Jurong East", "Punggol"))
+        under cProfile, to see which functions the time was spent in.
+
+        Args:
+            method_name (str): The name of the TrainLogic method to run.
+            *arguments: The arguments to give to the method.
+            sort_by (str): How to sort the profile (any pstats sort key, e.g. "cumulative" or "tottime").
+            limit (int): The number of functions to show.
+
+        Returns:
+            Result and Profile (tuple): What the method gave back (a generator is turned into a list),
+            and the profile as text.
+        """
+        return profile_call(getattr(self, method_name), *arguments, sort_by=sort_by, limit=limit)
+
+    def _measured_traversal(self, station_ids, operation):
+        """
+        This method measures a traversal while it's being looped over. Only the time spent inside the traversal
+        is measured, not the time the caller spends on every station (e.g. printing it).
+
+        Args:
+            station_ids (generator): The traversal.
+            operation (str): The name to record the metrics under.
+
+        Yields:
+            Station Id (int): The id of every visited station.
+        """
+        metrics = self.metrics
+        visited = 0
+        wall_seconds = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                station_id = next(station_ids, None)
+                wall_seconds += time.perf_counter() - started
+                if station_id is None:
+                    return
+                visited += 1
+                yield station_id
+        finally:
+            # This also runs if the caller stops looping before the traversal is done.
+            metrics.record_call(operation, wall_seconds)
+            metrics.record(f"{operation}.visited", visited)
+
+    def _publish(self, operations):
+        """
+        This method makes and publishes the next snapshot of the graph after stations are linked or de-linked.
+        The bridge index, the component index, the all-pairs table and the route cache are repaired for the new snapshot before
+        it's published, so queries that start after the publish see everything up to date.
+        This must be called while holding the edit lock.
+
+        Args:
+            operations (list): ("link", station input, station target, weight) or
+            ("delink", station input, station target, None) for every change, in order.
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            publish_started = time.perf_counter()
+        old_snapshot = self._snapshot
+        # The all-pairs table of the old snapshot might still be used by queries, so a copy is repaired.
+        table = old_snapshot.all_pairs_table.copy() if old_snapshot.has_all_pairs_table else None
+        removed_links = []
+
+        def repair(operation, adjacency):
+            kind, station_input, station_target, weight = operation
+            if table is not None:
+                # The station ids don't change when stations are linked or de-linked (and a snapshot with an
+                # all-pairs table is already compiled, so looking them up is free).
+                station_ids = old_snapshot.station_ids
+                link_ids = (station_ids[station_input], station_ids[station_target])
+            if self._bridge_index is not None:
+                self._bridge_index.graph = adjacency
+            if self._component_index is not None:
+                self._component_index.graph = adjacency
+            if kind == "link":
+                if self._bridge_index is not None:
+                    self._bridge_index.link_added(station_input, station_target)
+                if self._component_index is not None:
+                    self._component_index.link_added(station_input, station_target)
+                if table is not None:
+                    # A new link can only make routes shorter, so the table is repaired by checking
+                    # whether going through the new link is shorter for every pair of stations.
+                    table.link_added(*link_ids, weight, weight)
+            else:
+                # If the bridge index is built, it already knows whether the link was a bridge (which is the
+                # only way a de-link can split the network), so the component index doesn't need to search.
+                was_bridge = None
+                if self._bridge_index is not None:
+                    was_bridge = self._bridge_index.is_bridge(station_input, station_target)
+                    self._bridge_index.link_removed(station_input, station_target)
+                if self._component_index is not None:
+                    self._component_index.link_removed(station_input, station_target, was_bridge)
+                if table is not None:
+                    # Removing a link only affects the routes that went through it,
+                    # so only the starting stations that used it are searched again.
+                    table.link_removed(CompiledGraph(adjacency), *link_ids)
+                removed_links.append((station_input, station_target))
+
+        new_snapshot = old_snapshot.changed(operations, repair)
+        if table is not None:
+            new_snapshot.all_pairs_table = table
+        if self._component_index is not None:
+            new_snapshot.component_table = self._component_index.shared_table()
+        linked = any(operation[0] == "link" for operation in operations)
+        # Without an all-pairs table, the routes that a new link could change can't be checked one by one. But a
+        # new link can only change the routes that start in a part of the network that it links to, so if the
+        # old snapshot knows the parts, the routes that start in every other part are kept (if it doesn't, every
+        # route is thrown away).
+        touched_components = None
+        if linked and table is None and old_snapshot.component_table is not None:
+            component_of = old_snapshot.component_table[0]
+            touched_components = {component_of[station] for kind, station_input, station_target, _ in operations
+                                  if kind == "link" for station in (station_input, station_target)}
+
+        removed_link_ids = []
+
+        def still_shortest(cache_key, route):
+            # A cached route that didn't use a removed link is still a shortest route if no link was added.
+            # If a link was added, it's only still the shortest route if its weight didn't change.
+            if removed_links and not removed_link_ids:
+                # The ids are only looked up if there is a cached route to check. Routes are only cached after
+                # they're found on the compiled graph, so the ids are already known by then.
+                station_ids = old_snapshot.station_ids
+                removed_link_ids.extend((station_ids[station_input], station_ids[station_target])
+                                        for station_input, station_target in removed_links)
+            if route is not None and any(uses_link(route[0], *link_ids) for link_ids in removed_link_ids):
+                return False
+            if not linked:
+                return True
+            if table is not None:
+                return route_still_shortest(new_snapshot, cache_key, route)
+            return touched_components is not None and component_of[cache_key[0]] not in touched_components
+
+        self.route_cache.carry_over(old_snapshot.version, new_snapshot.version, still_shortest)
+        # Publishing the snapshot is a single assignment, so every query either sees the old graph or the new one.
+        self._snapshot = new_snapshot
+        if metrics is not None:
+            metrics.record_call("publish", time.perf_counter() - publish_started)
+            metrics.record("publish.operations", len(operations))
 
     def dfs_algorithm(self, start_station):
         """
@@ -28,28 +417,106 @@ class TrainLogic:
         Returns:
             path (list): The traversal path of the starting station.
         """
-        stations = []
-        visited_stations = []
-        path = []
-        # Start by inserting the starting station into the stack.
-        stations.append(start_station)
-        while stations:
-            # While the stations stack is not empty,
-            # Pop the last station that is in the stack (LIFO)
-            next_station = stations.pop()
-            if next_station not in visited_stations:
-                # If the popped station is not in the visited station list,
-                # we append the station to the visited station list.
-                path.append(f"--> {next_station}")
-                visited_stations.append(next_station)
-                # and then we visit the adjacent station and push that station
-                # into the stack.
-                for neighbours in self.graph[next_station]:
-                    stations.append(neighbours)
-        # After there are no more stations that can be visited
-        # from the starting station, we return the visited station list.
-        path[0] = f"Start: {start_station}"
-        return path
+        return list(self.traversal_path(start_station))
+
+    def traverse(self, start_station, mode="dfs", max_depth=None, max_count=None):
+        """
+        This method visits every station that can be reached from a starting station, giving back every station
+        as soon as it's visited (so that big traversals can be shown straight away).
+
+        The arguments are checked when this method is called (not when the first station is asked for),
+        so a mistake is raised where the traversal is made.
+
+        Args:
+            start_station (str): The station to start from.
+            mode (str): "dfs" for Depth First Search, "bfs" for Breadth First Search, or "bfs_levels" for
+            Breadth First Search that gives back one level (number of links away) at a time.
+            max_depth (int): The maximum number of links away from the starting station to visit (at least 0).
+            max_count (int): The maximum number of stations to visit (at least 1, not used by "bfs_levels").
+
+        Returns:
+            Stations (generator): The name of every visited station, or (depth, list of stations) for "bfs_levels".
+        """
+        if mode not in TRAVERSAL_MODES:
+            raise ValueError(f"Unknown traversal mode {mode!r}, choose one of {', '.join(TRAVERSAL_MODES)}.")
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth must be at least 0.")
+        if max_count is not None and max_count < 1:
+            raise ValueError("max_count must be at least 1.")
+        snapshot = self._snapshot
+        # An unknown station raises a KeyError here too.
+        start_id = snapshot.compiled_graph.station_ids[start_station]
+        return self._traverse(snapshot, start_station, start_id, mode, max_depth, max_count)
+
+    def _traverse(self, snapshot, start_station, start_id, mode, max_depth, max_count):
+        """
+        This method visits the stations of traverse, after its arguments were checked.
+
+        Args:
+            snapshot (GraphSnapshot): The snapshot to traverse.
+            start_station (str): The station to start from.
+            start_id (int): The id of the station to start from.
+            mode (str): "dfs", "bfs" or "bfs_levels".
+            max_depth (int): The maximum number of links away from the starting station to visit.
+            max_count (int): The maximum number of stations to visit.
+
+        Yields:
+            Station (str): The name of every visited station, or (depth, list of stations) for "bfs_levels".
+        """
+        compiled_graph = snapshot.compiled_graph
+        station_names = compiled_graph.station_names
+        # If the component index was built, the snapshot knows how many stations can be reached, so the traversal
+        # can stop as soon as it has visited all of them, instead of going through the stations that are left on
+        # its stack or queue. The index is never built (or locked) here, so traversals never wait for an edit.
+        reachable_count = snapshot.component_size(start_station)
+        if reachable_count is not None:
+            max_count = reachable_count if max_count is None else min(max_count, reachable_count)
+        if mode == "bfs_levels":
+            for depth, level in breadth_first_levels(compiled_graph, start_id, max_depth):
+                yield depth, [station_names[station_id] for station_id in level]
+            return
+        if mode == "dfs":
+            station_ids = depth_first(compiled_graph, start_id, max_depth, max_count)
+        else:
+            station_ids = breadth_first(compiled_graph, start_id, max_depth, max_count)
+        if self.metrics is not None:
+            station_ids = self._measured_traversal(station_ids, f"traverse.{mode}")
+        for station_id in station_ids:
+            yield station_names[station_id]
+
+    def traversal_path(self, start_station, mode="dfs", max_depth=None, max_count=None):
+        """
+        This method gives back the traversal path of a starting station one line at a time,
+        in the same format as dfs_algorithm.
+
+        Args:
+            start_station (str): The station that the program will show the traversal path of.
+            mode (str): "dfs" for Depth First Search, or "bfs" for Breadth First Search ("bfs_levels" can't be
+            used, as every line shows one station).
+            max_depth (int): The maximum number of links away from the starting station to visit.
+            max_count (int): The maximum number of stations to visit.
+
+        Returns:
+            Lines (generator): "Start: station" for the starting station, and "--> station" for every other station.
+        """
+        if mode == "bfs_levels":
+            raise ValueError("traversal_path shows one station per line, so it can't use the 'bfs_levels' mode.")
+        return self._traversal_lines(self.traverse(start_station, mode, max_depth, max_count))
+
+    @staticmethod
+    def _traversal_lines(stations):
+        """
+        This method turns the stations of a traversal into the lines of traversal_path.
+
+        Args:
+            stations (generator): The name of every visited station, starting with the starting station.
+
+        Yields:
+            Line (str): "Start: station" for the starting station, and "--> station" for every other station.
+        """
+        yield f"Start: {next(stations)}"
+        for station in stations:
+            yield f"--> {station}"
 
     def dijkstra_algorithm(self, start_station, target_station):
         """
@@ -61,79 +528,277 @@ class TrainLogic:
             target_station (str): The station that the user wants to go to.
 
         Returns:
-            2D List of Shortest Path and Weight (list): Returns the shortest path list (path) and the weight
-            to get there (shortest_distance[target_station]).
-        """
-        # Store the minimum weight to reach a target station.
-        shortest_distance = {}
-        # Keep track of the path that leads us to a certain node/station.
-        predecessor = {}
-        # Initialize a stack that's basically the graph so that we're able to use it for processing purposes.
-        # As assignment statements in Python do not copy objects,
-        # for mutable collections, a copy is needed so that the original collection is not modified.
-        # In this case, we're using a shallow copy i.e. creating a new object with the same exact content.
-        unseen_stations = copy.copy(self.graph)
-        infinity = float('inf')
-        # Similar to the predecessor, this list is used to
-        # trace back the path that leads to the target goal station.
-        path = []
-        # For every station in the weighted train graph,
-        for stations in unseen_stations:
-            # Append all the stations into the shortest_distance dictionary with the value of infinity.
-            shortest_distance[stations] = infinity
-            # print(shortest_distance[stations])
-        # Make sure that the weight from the starting station is 0.
-        shortest_distance[start_station] = 0
-
-        while unseen_stations:
-            # Declare a minimum node
-            minimum_node = None
-            # For every stations that is not yet visited,
-            for current_node in unseen_stations:
-                if minimum_node is None:
-                    # If the minimum node is empty, assign it to the starting node.
-                    minimum_node = current_node
-                # Check if the current tentative weight of the node is less than the
-                # tentative weight of the minimum node.
-                elif shortest_distance[current_node] < shortest_distance[minimum_node]:
-                    # If it is, then assign the current node to the minimum node.
-                    # This helps on determining the lowest/shortest path to the goal.
-                    minimum_node = current_node
-            # For every neighbouring station and their weight from the minimum station,
-            for child_nodes, weight in self.graph[minimum_node].items():
-                # Calculate the distance of each neighbouring station from the starting station.
-                # If the sum is lower than the tentative weight of the neighbouring child nodes,
-                if weight + shortest_distance[minimum_node] < shortest_distance[child_nodes]:
-                    # Update the weight between each neighbouring stations, and
-                    shortest_distance[child_nodes] = weight + shortest_distance[minimum_node]
-                    # Update the predecessor/the path it took to the neighbouring stations.
-                    predecessor[child_nodes] = minimum_node
-            # Pop the minimum node because we don't need to iterate over the same stations again
-            # and so that the loop will eventually end.
-            unseen_stations.pop(minimum_node)
-
-        # Declare a past station that'll be used to make a path.
-        past_stations = target_station
-        while past_stations != start_station:
-            try:
-                # Insert the past station to the path list, and it should be at
-                # index 0 so that the shortest path is showed in the correct order.
-                # EXAMPLE: START: Toa Payoh -> TARGET: Bishan
-                # Bishan has the predecessor station Braddel. After inserting this,
-                # The loop breaks and then the program inserts the starting station to the path.
-                path.insert(0, f"--> {past_stations}")
-                # Assign the predecessor of the current past station to the past station i.e. recursive assignment.
-                past_stations = predecessor[past_stations]
-            except KeyError:
-                # Return an empty list (need to do this as we're supposed to return a list).
-                # This is mainly used for the de-linking part, to "dynamically" figure out
-                # whether a train station can be de-linked.
-                return
-        # If the loop finishes, insert the starting station to the first index to complete the path.
-        path.insert(0, f"Start: {start_station}")
-        # After the operation is done, return a 2D list,
-        # containing the shortest path route and the weight of the route.
-        return [path, f"Weight of Path: {shortest_distance[target_station]}"]
+            Route (Route): The station ids, weight and number of hops of the shortest route, or None if the
+            target station can't be reached. The text that the program shows is only built when the route
+            is shown (e.g. with route.path_lines() and route.weight_line()).
+        """
+        metrics = self.metrics
+        search_stats = None
+        if metrics is not None:
+            started = time.perf_counter()
+            search_stats = SearchStats()
+        # The whole query runs on the same snapshot, even if the graph changes in the meantime.
+        snapshot = self._snapshot
+        compiled_graph = snapshot.compiled_graph
+        # Check if the same route was already found since the last time the graph changed.
+        cache_key = (start_station, target_station, snapshot.version)
+        found, route = self.route_cache.get(cache_key)
+        if not found:
+            # The algorithm works with the station ids of the compiled graph instead of the station names.
+            start_id = compiled_graph.station_ids[start_station]
+            target_id = compiled_graph.station_ids[target_station]
+            if self.all_pairs:
+                # In all-pairs mode the route is already precomputed, so we only need to look it up.
+                route = snapshot.all_pairs_table.route(start_id, target_id)
+            else:
+                route = compiled_graph.route(start_id, target_id, search_stats)
+            self.route_cache.put(cache_key, route)
+        if metrics is None:
+            return Route.from_search(compiled_graph, route)
+        shortest_path = Route.from_search(compiled_graph, route)
+        if found:
+            # A cached route didn't need a search, so only its time is recorded.
+            metrics.increment("dijkstra_algorithm.cache_hits")
+            metrics.record_call("dijkstra_algorithm", time.perf_counter() - started)
+        else:
+            metrics.record_call("dijkstra_algorithm", time.perf_counter() - started, search_stats)
+        return shortest_path
+
+    def find_route(self, start_station, target_station, strategy="dijkstra"):
+        """
+        This method finds the shortest path of a starting station to a target station using a chosen strategy,
+        and shows how many stations the strategy had to settle (so that the strategies can be compared).
+        Unlike dijkstra_algorithm, this method doesn't use the route cache or the all-pairs table.
+
+        Args:
+            start_station (str): The station that the user wants to go from.
+            target_station (str): The station that the user wants to go to.
+            strategy (str): "dijkstra" for the normal dijkstra algorithm, "bidirectional" to search from both
+            stations at the same time, "alt" for A* search with landmark lower bounds, or "ch" to search
+            the contraction hierarchy.
+
+        Returns:
+            Shortest Path and Settled Count (tuple): The same result as dijkstra_algorithm,
+            and the number of stations that were settled.
+        """
+        metrics = self.metrics
+        search_stats = None
+        if metrics is not None:
+            started = time.perf_counter()
+            search_stats = SearchStats()
+        snapshot = self._snapshot
+        compiled_graph = snapshot.compiled_graph
+        start_id = compiled_graph.station_ids[start_station]
+        target_id = compiled_graph.station_ids[target_station]
+        if strategy == "dijkstra":
+            route, settled_count = dijkstra_search(compiled_graph, start_id, target_id, search_stats)
+        elif strategy == "bidirectional":
+            route, settled_count = bidirectional_search(compiled_graph, snapshot.reverse_compiled_graph,
+                                                        start_id, target_id, search_stats)
+        elif strategy == "alt":
+            route, settled_count = alt_search(compiled_graph, snapshot.landmarks, start_id, target_id, search_stats)
+        elif strategy == "ch":
+            route, settled_count = snapshot.contraction_hierarchy.route(start_id, target_id, search_stats)
+        else:
+            raise ValueError(f"Unknown route strategy {strategy!r}, choose one of {', '.join(ROUTE_STRATEGIES)}.")
+        if metrics is None:
+            return Route.from_search(compiled_graph, route), settled_count
+        shortest_path = Route.from_search(compiled_graph, route)
+        metrics.record_call(f"find_route.{strategy}", time.perf_counter() - started, search_stats)
+        return shortest_path, settled_count
+
+    def alternative_routes(self, start_station, target_station, k=3, max_detour=None):
+        """
+        This method finds the k shortest routes of a starting station to a target station (that never visit
+        a station twice), e.g. to show riders a few alternatives during a disruption.
+
+        Args:
+            start_station (str): The station that the user wants to go from.
+            target_station (str): The station that the user wants to go to.
+            k (int): The maximum number of routes to find.
+            max_detour (float): The routes can be at most this many times the weight of the shortest route
+            (e.g. 1.5 for at most 50% longer). If this is None, there is no limit.
+
+        Returns:
+            Routes (list): The routes (Route), from the shortest to the longest. This has fewer than k routes if
+            there aren't enough routes within the detour limit, and is empty if the target can't be reached.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        # NaN is never smaller than 1 (and infinity isn't a limit), so they have to be checked on their own.
+        if max_detour is not None and (not math.isfinite(max_detour) or max_detour < 1):
+            raise ValueError("max_detour must be at least 1 (the weight of the shortest route).")
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter()
+        snapshot = self._snapshot
+        compiled_graph = snapshot.compiled_graph
+        routes = k_shortest_routes(compiled_graph, snapshot.reverse_compiled_graph,
+                                   compiled_graph.station_ids[start_station], compiled_graph.station_ids[target_station],
+                                   k, max_detour)
+        if metrics is not None:
+            metrics.record_call("alternative_routes", time.perf_counter() - started)
+            metrics.record("alternative_routes.routes", len(routes))
+        return [Route.from_search(compiled_graph, route) for route in routes]
+
+    def shortest_path_tree(self, start_station):
+        """
+        This method finds the shortest paths from a starting station to every station at once.
+        The path to any station can then be traced back from the tree without running the dijkstra algorithm again,
+        which is useful for questions like "which stations can be reached within a weight of 5?".
+
+        Args:
+            start_station (str): The station to start from.
+
+        Returns:
+            Shortest Path Tree (ShortestPathTree): The minimum weight to reach every station, and the station
+            that comes before every station on its shortest path.
+        """
+        compiled_graph = self._snapshot.compiled_graph
+        if self.metrics is None:
+            return ShortestPathTree(compiled_graph, compiled_graph.station_ids[start_station])
+        started = time.perf_counter()
+        search_stats = SearchStats()
+        tree = ShortestPathTree(compiled_graph, compiled_graph.station_ids[start_station], search_stats)
+        self.metrics.record_call("shortest_path_tree", time.perf_counter() - started, search_stats)
+        return tree
+
+    def nearest_sources(self, source_stations, target_stations=None, nearest_only=False, reverse=False):
+        """
+        This method finds the nearest source station of every target station with one search from all the source
+        stations at once, instead of one dijkstra_algorithm call per source station.
+        EXAMPLE: "how far is every station from its nearest interchange?", or with nearest_only,
+        "which of these depots is nearest to Bishan?" (with Bishan as the source and the depots as the targets).
+
+        Args:
+            source_stations (iterable): The stations to search from.
+            target_stations (iterable): The stations to find the nearest source station of. If this is None,
+            every station is a target station.
+            nearest_only (bool): Only find the target station that is nearest to any source station. The search
+            stops as soon as it reaches it, without looking at the rest of the target stations. The target
+            stations must be given (otherwise the nearest one would always be a source station itself).
+            reverse (bool): Find the routes from every target station to its nearest source station instead
+            (e.g. to the nearest depot). As some links have a different weight depending on the direction,
+            this searches the reversed graph.
+
+        Returns:
+            Nearest Routes (dict): The route (Route) from the nearest source station to every target station
+            (or the other way around with reverse), keyed by the target station. The source station is
+            route.start_station (route.target_station with reverse) and the distance is route.weight. A target
+            station that can't be reached is None. With nearest_only, this only has the nearest target station
+            (and is empty if none of them can be reached).
+        """
+        metrics = self.metrics
+        search_stats = None
+        if metrics is not None:
+            started = time.perf_counter()
+            search_stats = SearchStats()
+        snapshot = self._snapshot
+        compiled_graph = snapshot.compiled_graph
+        station_ids = compiled_graph.station_ids
+        source_ids = sorted({station_ids[station] for station in source_stations})
+        if not source_ids:
+            raise ValueError("At least one source station is needed.")
+        if nearest_only and target_stations is None:
+            raise ValueError("nearest_only needs the target stations to choose from.")
+        target_ids = None if target_stations is None else [station_ids[station] for station in target_stations]
+        if target_ids == []:
+            return {}
+        search_graph = snapshot.reverse_compiled_graph if reverse else compiled_graph
+        shortest_distance, predecessor, origin = search_graph.multi_source_paths(
+            source_ids, None if target_ids is None else set(target_ids), nearest_only, search_stats)
+        if target_ids is None:
+            target_ids = range(len(compiled_graph))
+        elif nearest_only:
+            # The search stopped at the nearest target station, which is the last station it settled. Any other
+            # target station that was reached on the way is only tentative, so the nearest is the minimum.
+            reached = [target_id for target_id in target_ids if target_id in shortest_distance]
+            target_ids = [min(reached, key=lambda target_id: (shortest_distance[target_id], target_id))] \
+                if reached else []
+
+        station_names = compiled_graph.station_names
+        nearest_routes = {}
+        for target_id in target_ids:
+            if target_id not in shortest_distance:
+                nearest_routes[station_names[target_id]] = None
+                continue
+            path = trace_path(predecessor, origin[target_id], target_id)
+            if reverse:
+                path.reverse()
+            nearest_routes[station_names[target_id]] = Route(path, shortest_distance[target_id], station_names)
+        if metrics is not None:
+            metrics.record_call("nearest_sources", time.perf_counter() - started, search_stats)
+        return nearest_routes
+
+    def batch_dijkstra_algorithm(self, station_pairs, processes=None, block_size=10000):
+        """
+        This method finds the shortest paths of many (starting station, target station) pairs at once.
+        Instead of running the dijkstra algorithm once for every pair, the pairs are grouped by their
+        starting station, and the dijkstra algorithm is only run once for every starting station
+        (as one run already finds the shortest path to every station).
+
+        The pairs are read in blocks, and only a few blocks are worked on at a time, so that millions of pairs
+        (e.g. read straight from a file) can be given without keeping them all in memory. The pairs are grouped
+        by their starting station inside every block.
+
+        Args:
+            station_pairs (iterable): The (starting station, target station) pairs.
+            processes (int): The number of processes to spread the blocks across (at least 1).
+            If this is None, everything is done inside the current process.
+            block_size (int): The number of pairs in every block (at least 1).
+
+        Returns:
+            Routes (generator): The same result as dijkstra_algorithm for every pair,
+            in the same order as the pairs were given (None if the target station can't be reached).
+        """
+        # The arguments are checked here instead of inside the generator, so that a mistake is raised straight
+        # away (and not when the first route is asked for). A block size of 0 would read no pairs at all.
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1.")
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be at least 1.")
+        return self._batch_dijkstra_routes(station_pairs, processes, block_size)
+
+    def _batch_dijkstra_routes(self, station_pairs, processes, block_size):
+        """
+        This method finds the routes of batch_dijkstra_algorithm, after its arguments were checked.
+
+        Args:
+            station_pairs (iterable): The (starting station, target station) pairs.
+            processes (int): The number of processes to spread the blocks across, or None.
+            block_size (int): The number of pairs in every block.
+
+        Yields:
+            Route (Route): The route of every pair, in the same order as the pairs were given.
+        """
+        snapshot = self._snapshot
+        compiled_graph = snapshot.compiled_graph
+        station_ids = compiled_graph.station_ids
+        pairs = iter(station_pairs)
+        blocks = iter(lambda: [(station_ids[start_station], station_ids[target_station])
+                               for start_station, target_station in islice(pairs, block_size)], [])
+
+        if processes is None:
+            for block in blocks:
+                for route in _block_routes(compiled_graph, block):
+                    yield Route.from_search(compiled_graph, route)
+            return
+
+        # Every process gets the compiled graph once when it starts (as flat arrays, which are quick to send),
+        # and then finds the routes of one block at a time. Only two blocks per process are sent at a time,
+        # so that the blocks waiting to be worked on (and their results) don't pile up in memory.
+        with ProcessPoolExecutor(processes, initializer=_start_batch_process,
+                                 initargs=(compiled_graph_state(compiled_graph),)) as executor:
+            pending_blocks = deque()
+            for block in blocks:
+                pending_blocks.append(executor.submit(_batch_routes, block))
+                if len(pending_blocks) < processes * 2:
+                    continue
+                for route in pending_blocks.popleft().result():
+                    yield Route.from_search(compiled_graph, route)
+            while pending_blocks:
+                for route in pending_blocks.popleft().result():
+                    yield Route.from_search(compiled_graph, route)
 
     def link_stations(self, station_input, station_target):
         """
@@ -146,27 +811,16 @@ class TrainLogic:
         Returns:
             A message whether the linking operation was successfully executed or failed.
         """
-        if station_input != station_target:
-            if station_target not in self.graph[station_input]:
-                start_interchange_station = [weight for weight in self.graph[station_input].values()].count(2) >= 3
-                target_interchange_station = [weight for weight in self.graph[station_target].values()].count(2) >= 3
-                # Check if the station input or the target station is an interchange. As almost all interchange
-                # stations have three or more stations connected, we can easily detect if a station is an
-                # interchange station. Punggol is an exception, it only has two stations neighbouring the
-                # station, so we need to hard-code that into the if condition checking.
-                if (start_interchange_station or target_interchange_station) or (station_input == "Punggol" or station_target == "Punggol"):
-                    # We then find the key, aka. station input inside the mrt graph, and then we add a connection
-                    # between the station input and the target, and set the weight to two (since it's an interchange).
-                    self.graph[station_input][station_target] = 2
-                    self.graph[station_target][station_input] = 2
+        with self._edit_lock:
+            graph = self._snapshot.graph
+            if station_input != station_target:
+                if station_target not in graph[station_input]:
+                    # The weight is two if the station input or the target station is an interchange, otherwise one.
+                    self._publish([("link", station_input, station_target,
+                                    link_weight(graph, station_input, station_target))])
                     return f"{station_input.title()} has been linked to {station_target.title()}!"
-                # If the station input nor the station target is an interchange,
-                # we link the stations with a weight of one.
-                self.graph[station_input][station_target] = 1
-                self.graph[station_target][station_input] = 1
-                return f"{station_input.title()} has been linked to {station_target.title()}!"
-            return f"Sorry, {station_target} is already linked to {station_input}!"
-        return "Sorry, you can't link the same station!"
+                return f"Sorry, {station_target} is already linked to {station_input}!"
+            return "Sorry, you can't link the same station!"
 
     def delink_stations(self, station_input, station_target):
         """
@@ -180,20 +834,240 @@ class TrainLogic:
         Returns:
             A message whether the linking operation was successfully executed or failed.
         """
-        if station_input != station_target:
-            if station_target in self.graph[station_input]:
-                # When de-linking we need to make sure that we de-link the connection from both
-                # the station input and the target.
-                del self.graph[station_input][station_target]
-                del self.graph[station_target][station_input]
-                # After de-linking the station, we check if using the dijkstra's algorithm
-                # we still can reach the station. This is a "ghetto" method, but it
-                # ensures that no station is left standalone or unreachable.
-                if not self.dijkstra_algorithm("Toa Payoh", station_target):
-                    # So if we can't reach the station after de-linking it (starting station doesn't matter),
-                    # we re-link the station again and show a message that the station can't be de-linked.
-                    self.link_stations(station_input, station_target)
-                    return f"{station_input.title()} can't be de-linked with {station_target.title()}!"
-                return f"{station_input.title()} has been de-linked with {station_target.title()}!"
-            return "Sorry, you can't de-link a station that isn't linked!"
-        return "Sorry, you can't de-link the same station!"
+        with self._edit_lock:
+            if station_input != station_target:
+                if station_target in self._snapshot.graph[station_input]:
+                    # Before de-linking the station, we check if the link is a bridge, i.e. if removing it
+                    # would split the network. This ensures that no station is left standalone or unreachable,
+                    # without having to remove the link and search the graph to find out.
+                    if self.bridge_index.is_bridge(station_input, station_target):
+                        return f"{station_input.title()} can't be de-linked with {station_target.title()}!"
+                    # When de-linking we need to make sure that we de-link the connection from both
+                    # the station input and the target.
+                    self._publish([("delink", station_input, station_target, None)])
+                    return f"{station_input.title()} has been de-linked with {station_target.title()}!"
+                return "Sorry, you can't de-link a station that isn't linked!"
+            return "Sorry, you can't de-link the same station!"
+
+    def apply_edits(self, operations):
+        """
+        This method links and de-links many stations at once, as a single transaction (e.g. for a disruption plan).
+        Every operation is checked against a working copy of the graph, and the connectivity of the network is
+        checked only once at the end (with union-find over the resulting graph), instead of once per de-link.
+        If every operation is valid and no station is left unreachable, all the changes are published together
+        as one new version of the graph. Otherwise, nothing changes.
+
+        Which stations could reach each other before the changes comes from the component index, so only the
+        resulting graph is searched. Unlike delink_stations, a bridge can be de-linked here, as long as another
+        operation of the same transaction links the two sides of the network back together.
+
+        Args:
+            operations (list): ("link", station input, station target) or ("link", station input, station target,
+            weight) to link two stations, and ("delink", station input, station target) to de-link two stations.
+            If the weight of a link isn't given, it's picked the same way as in link_stations, otherwise it must
+            be a whole number of at least 1.
+
+        Returns:
+            Committed and Message (tuple): True if the changes were made, and a message saying what happened.
+        """
+        with self._edit_lock:
+            graph = self._snapshot.adjacency
+            # The working copy only stores the neighbours of the stations that were changed,
+            # every other station is looked up in the current graph.
+            changed_neighbours = {}
+
+            def neighbours_of(station):
+                return changed_neighbours[station] if station in changed_neighbours else graph[station]
+
+            def changeable(station):
+                if station not in changed_neighbours:
+                    changed_neighbours[station] = dict(graph[station])
+                return changed_neighbours[station]
+
+            edits = []
+            for position, operation in enumerate(operations, 1):
+                if len(operation) not in (3, 4):
+                    return False, f"Sorry, operation {position} must be (type, station, station) or " \
+                                  f"(\"link\", station, station, weight)!"
+                kind, station_input, station_target = operation[:3]
+                if kind not in ("link", "delink"):
+                    return False, f"Sorry, operation {position} has an unknown type {kind!r}!"
+                if kind == "delink" and len(operation) > 3:
+                    return False, f"Sorry, operation {position} can't give a weight to a de-link!"
+                for station in (station_input, station_target):
+                    if station not in graph:
+                        return False, f"Sorry, operation {position} uses the unknown station {station}!"
+                if station_input == station_target:
+                    return False, f"Sorry, operation {position} can't {kind} the same station!"
+                linked = station_target in neighbours_of(station_input)
+                if kind == "link":
+                    if linked:
+                        return False, f"Sorry, operation {position}: {station_target} is already linked to " \
+                                      f"{station_input}!"
+                    weight = operation[3] if len(operation) > 3 else \
+                        link_weight(_WorkingGraph(graph, changed_neighbours), station_input, station_target)
+                    # Every algorithm (and every lower bound) relies on the weights being positive whole numbers.
+                    if type(weight) is not int or weight < 1:
+                        return False, f"Sorry, operation {position} has the weight {weight!r}, which must be " \
+                                      f"a whole number of at least 1!"
+                    changeable(station_input)[station_target] = weight
+                    changeable(station_target)[station_input] = weight
+                else:
+                    if not linked:
+                        return False, f"Sorry, operation {position} can't de-link a station that isn't linked!"
+                    weight = None
+                    del changeable(station_input)[station_target]
+                    del changeable(station_target)[station_input]
+                edits.append((kind, station_input, station_target, weight))
+
+            # A single union-find pass over the resulting graph checks the whole transaction. Linking stations
+            # can only join parts of the network, so nothing is left unreachable as long as the two stations of
+            # every de-link can still reach each other (if they could before). Comparing the number of parts
+            # isn't enough, as a transaction could split one part and join two others.
+            resulting_groups = connected_groups(_WorkingGraph(graph, changed_neighbours))
+            component_index = self.component_index
+            for kind, station_input, station_target, _ in edits:
+                if kind == "delink" and component_index.are_connected(station_input, station_target) and \
+                        not resulting_groups.connected(station_input, station_target):
+                    return False, "Sorry, these changes would leave some stations unreachable, " \
+                                  "so nothing was changed!"
+            if edits:
+                self._publish(edits)
+            return True, f"{len(edits)} change(s) have been made!"
+
+
+def link_weight(graph, station_input, station_target):
+    """
+    This function picks the weight of a new link between two stations.
+
+    Args:
+        graph (dict): The weighted graph.
+        station_input (str): One station of the new link.
+        station_target (str): The other station of the new link.
+
+    Returns:
+        Weight (int): Two if the station input or the target station is an interchange, otherwise one.
+    """
+    start_interchange_station = [weight for weight in graph[station_input].values()].count(2) >= 3
+    target_interchange_station = [weight for weight in graph[station_target].values()].count(2) >= 3
+    # Check if the station input or the target station is an interchange. As almost all interchange
+    # stations have three or more stations connected, we can easily detect if a station is an
+    # interchange station. Punggol is an exception, it only has two stations neighbouring the
+    # station, so we need to hard-code that into the if condition checking.
+    if (start_interchange_station or target_interchange_station) or (station_input == "Punggol" or station_target == "Punggol"):
+        return 2
+    return 1
+
+
+class _WorkingGraph(Mapping):
+    """A read-only graph made of changed stations on top of an unchanged graph (used by apply_edits)."""
+
+    def __init__(self, graph, changed_neighbours):
+        self._graph = graph
+        self._changed_neighbours = changed_neighbours
+
+    def __getitem__(self, station):
+        changed_neighbours = self._changed_neighbours
+        return changed_neighbours[station] if station in changed_neighbours else self._graph[station]
+
+    def __iter__(self):
+        return iter(self._graph)
+
+    def __len__(self):
+        return len(self._graph)
+
+
+def route_still_shortest(snapshot, cache_key, route):
+    """
+    This function checks (using the all-pairs table of a snapshot) whether a cached route is still the shortest route.
+
+    Args:
+        snapshot (GraphSnapshot): The snapshot to check the route against.
+        cache_key (tuple): The key of the route, which is (start station, target station, graph version).
+        route (tuple): The station ids on the route and the weight of the route, or None if it's unreachable.
+
+    Returns:
+        Still Shortest (bool): True if the route can still be used.
+    """
+    start_station, target_station, _ = cache_key
+    station_ids = snapshot.station_ids
+    distance = snapshot.all_pairs_table.distance(station_ids[start_station], station_ids[target_station])
+    return distance == (None if route is None else route[1])
+
+
+def compiled_graph_state(compiled_graph):
+    """
+    This function turns a compiled graph into flat arrays that can be sent to another process.
+    The arrays of a memory-mapped snapshot are copied, as a memoryview can't be sent.
+
+    Args:
+        compiled_graph (CompiledGraph): The compiled graph.
+
+    Returns:
+        State (tuple): The station names, and the offsets, neighbours and weights arrays.
+    """
+    buffers = []
+    for buffer in (compiled_graph.offsets, compiled_graph.neighbours, compiled_graph.weights):
+        if not isinstance(buffer, array):
+            copied_buffer = array('q')
+            copied_buffer.frombytes(buffer.cast('B'))
+            buffer = copied_buffer
+        buffers.append(buffer)
+    return (compiled_graph.station_names, *buffers)
+
+
+def _block_routes(compiled_graph, block):
+    """
+    This function finds the routes of a block of pairs, running the dijkstra algorithm once for every
+    starting station of the block.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to search in.
+        block (list): The (starting station id, target station id) pairs.
+
+    Returns:
+        Routes (list): The station ids and the weight of every route (or None if a target station can't be reached),
+        in the same order as the pairs.
+    """
+    # The shortest paths of a starting station are only kept until its last pair in the block has been found.
+    remaining_pairs = {}
+    for start_id, _ in block:
+        remaining_pairs[start_id] = remaining_pairs.get(start_id, 0) + 1
+    shortest_path_trees = {}
+    routes = []
+    for start_id, target_id in block:
+        if start_id not in shortest_path_trees:
+            shortest_path_trees[start_id] = ShortestPathTree(compiled_graph, start_id)
+        routes.append(shortest_path_trees[start_id].route(target_id))
+        remaining_pairs[start_id] -= 1
+        if not remaining_pairs[start_id]:
+            del shortest_path_trees[start_id]
+    return routes
+
+
+# The compiled graph of a batch process, set once when the process starts (see batch_dijkstra_algorithm).
+_batch_graph = None
+
+
+def _start_batch_process(graph_state):
+    """
+    This function rebuilds the compiled graph once when a batch process starts.
+
+    Args:
+        graph_state (tuple): The station names, and the offsets, neighbours and weights arrays of the graph.
+    """
+    global _batch_graph
+    _batch_graph = CompiledGraph.from_buffers(*graph_state)
+
+
+def _batch_routes(block):
+    """
+    This function finds the routes of a block of pairs inside a batch process.
+
+    Args:
+        block (list): The (starting station id, target station id) pairs.
+
+    Returns:
+        Routes (list): The station ids and the weight of every route, or None if a target station can't be reached.
+    """
+    return _block_routes(_batch_graph, block)
@@ -1,4 +1,9 @@
 """This python script is the executable part of the SMRT program in which users can interact with"""
+import argparse
+import csv
+import json
+import sys
+from collections import deque
 from logic import TrainLogic
 Trains = TrainLogic()
 
@@ -15,6 +20,7 @@ def main():
         print("D - De-link Stations")
         print("T - Traverse SSM Map")
         print("M - See MRT Stations")
+        print("P - Performance Metrics")
         print("E - Exit Program")
         user_choice = input("Choose: ").lower().strip()
         if user_choice == "s":
@@ -27,6 +33,8 @@ def main():
             delink_stations()
         elif user_choice == "t":
             traverse_mrt()
+        elif user_choice == "p":
+            performance_metrics()
         elif user_choice == "e":
             print("Bye! See you!")
             break
@@ -80,8 +88,9 @@ def shortest_path_to_station():
         if station_input in Trains.graph and station_target in Trains.graph:
             shortest_path = Trains.dijkstra_algorithm(station_input, station_target)
             print(f"\nRoute to {station_target}:")
-            print(*shortest_path[0], sep='\n')
-            print(f"{shortest_path[1]}\n")
+            # The route is only turned into text here, when it's shown.
+            print(*shortest_path.path_lines(), sep='\n')
+            print(f"{shortest_path.weight_line()}\n")
             break
         else:
             print("Sorry, your choice is not valid.")
@@ -95,11 +104,224 @@ def traverse_mrt():
     while True:
         station_input = input("Choose a starting station: ").title().strip()
         if station_input in Trains.graph:
-            traversal_path = Trains.dfs_algorithm(station_input)
-            print(*traversal_path, sep='\n')
+            # Print every station as soon as it's visited, instead of waiting for the whole traversal.
+            for traversal_path in Trains.traversal_path(station_input):
+                print(traversal_path)
             break
         print("Sorry, that choice is invalid.")
 
 
+def performance_metrics():
+    """
+    This function turns on the collection of performance metrics, or shows the metrics that were collected
+    (and lets the user reset them, turn them off, or profile a single route query with cProfile).
+    """
+    if Trains.metrics is None:
+        Trains.enable_metrics()
+        print("Performance metrics are now being collected. Choose P again to see them.")
+        return
+    print(*Trains.metrics.format_report(), sep='\n')
+    user_choice = input("R - Reset Metrics, O - Turn Off Metrics, C - Profile a Route, "
+                        "anything else to go back: ").lower().strip()
+    if user_choice == "r":
+        Trains.metrics.reset()
+        print("The metrics have been reset.")
+    elif user_choice == "o":
+        Trains.disable_metrics()
+        print("Performance metrics are no longer being collected.")
+    elif user_choice == "c":
+        station_input = input("Choose a station: ").title().strip()
+        station_target = input("Where would you like to go: ").title().strip()
+        if station_input in Trains.graph and station_target in Trains.graph:
+            _, profile = Trains.profile("dijkstra_algorithm", station_input, station_target)
+            print(profile)
+        else:
+            print("Sorry, your choice is not valid.")
+
+
+def read_station_pairs(pairs_file, input_format):
+    """
+    This function reads (starting station, target station) pairs one line at a time, so that a file of
+    millions of pairs is never read into memory all at once.
+
+    Args:
+        pairs_file (file): The file to read, either CSV (two columns, with an optional "origin,destination"
+        header) or JSON Lines (an object with "origin" and "destination", or a list of the two stations).
+        input_format (str): "csv" or "jsonl".
+
+    Yields:
+        Pair (tuple): The line number, the starting station and the target station of every pair, or the line
+        number, None and an error message if the line can't be read.
+    """
+    if input_format == "jsonl":
+        rows = enumerate(pairs_file, 1)
+    else:
+        rows = enumerate(csv.reader(pairs_file), 1)
+    for line_number, row in rows:
+        try:
+            if input_format == "jsonl":
+                if not row.strip():
+                    continue
+                row = json.loads(row)
+                # Only a list of the two stations or an object is a pair (e.g. "AB" isn't the stations A and B).
+                if isinstance(row, dict):
+                    row = [row["origin"], row["destination"]]
+                elif not isinstance(row, list):
+                    raise TypeError("a pair must be a list or an object")
+            elif not row or line_number == 1 and [column.strip().lower() for column in row] == ["origin", "destination"]:
+                continue
+            origin, destination = (station.strip() for station in row)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            yield line_number, None, f"line {line_number} isn't an origin and destination pair"
+            continue
+        yield line_number, origin, destination
+
+
+def write_batch_results(trains, station_pairs, output_file, output_format, processes, block_size):
+    """
+    This function finds the route of every pair and writes the results straight away (in the same order
+    as the pairs), so that only the pairs that are being worked on are ever kept in memory.
+
+    Args:
+        trains (TrainLogic): The train logic to find the routes with.
+        station_pairs (iterable): The pairs from read_station_pairs.
+        output_file (file): The file to write the results to.
+        output_format (str): "jsonl" or "csv".
+        processes (int): The number of processes to use, or None to use only this process.
+        block_size (int): The number of pairs that are worked on at a time (by each process).
+
+    Returns:
+        Counts (tuple): The number of pairs that were written, how many of them have no route (the target station
+        can't be reached), and how many of them have an error (a line that can't be read or an unknown station).
+    """
+    if output_format == "csv":
+        writer = csv.writer(output_file)
+        writer.writerow(["origin", "destination", "weight", "hops", "stations", "error"])
+
+    def write(origin, destination, route=None, error=None):
+        if output_format == "csv":
+            if route is None:
+                writer.writerow([origin, destination, "", "", "", error])
+            else:
+                writer.writerow([origin, destination, route.weight, route.hops, " > ".join(route.stations), ""])
+        elif route is None:
+            output_file.write(json.dumps({"origin": origin, "destination": destination, "error": error}) + "\n")
+        else:
+            output_file.write(json.dumps({"origin": origin, "destination": destination, "weight": route.weight,
+                                          "hops": route.hops, "stations": route.stations}) + "\n")
+
+    # The pairs that were read but haven't been written yet. The pairs that can't be searched (e.g. because of
+    # an unknown station) wait here too if a pair that is being searched comes before them, so that every result
+    # is written in the same order as the pairs.
+    pending_pairs = deque()
+    # The station ids of the compiled graph are used instead of trains.graph, as a network loaded from a snapshot
+    # file would have to build its whole dictionary graph first.
+    station_ids = trains.compiled_graph.station_ids
+    written = unreachable = errors = 0
+
+    def searchable_pairs():
+        nonlocal written, errors
+        for line_number, origin, destination in station_pairs:
+            if origin is None:
+                # The pair couldn't be read, so its error message was given instead of the target station.
+                error, destination = destination, None
+            elif origin not in station_ids or destination not in station_ids:
+                error = f"unknown station {origin if origin not in station_ids else destination}"
+            else:
+                error = None
+            if error is None:
+                pending_pairs.append((origin, destination, error))
+                yield origin, destination
+            elif pending_pairs:
+                pending_pairs.append((origin, destination, error))
+            else:
+                # Nothing is being searched before this pair, so it's written straight away (this way, a long run
+                # of pairs that can't be searched is never kept in memory).
+                write(origin, destination, error=error)
+                written += 1
+                errors += 1
+
+    for route in trains.batch_dijkstra_algorithm(searchable_pairs(), processes, block_size):
+        origin, destination, _ = pending_pairs.popleft()
+        write(origin, destination, route, error=None if route is not None else "unreachable")
+        written += 1
+        unreachable += route is None
+        # The pairs that couldn't be searched right after this one don't have to wait anymore.
+        while pending_pairs and pending_pairs[0][2] is not None:
+            origin, destination, error = pending_pairs.popleft()
+            write(origin, destination, error=error)
+            written += 1
+            errors += 1
+    while pending_pairs:
+        origin, destination, error = pending_pairs.popleft()
+        write(origin, destination, error=error)
+        written += 1
+        errors += 1
+    return written, unreachable, errors
+
+
+def positive_integer(text):
+    """
+    This function reads a command-line argument that must be a whole number of at least 1.
+
+    Args:
+        text (str): The argument as it was typed.
+
+    Returns:
+        Number (int): The number.
+    """
+    try:
+        number = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} isn't a whole number") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{text} must be at least 1")
+    return number
+
+
+def run_batch(argv=None):
+    """
+    This function runs the program without the menu, finding the route of every pair of a file (or stdin)
+    and streaming the results as JSON Lines or CSV, e.g.
+    python main.py --pairs pairs.csv --output routes.jsonl --processes 4
+
+    Args:
+        argv (list): The command-line arguments (sys.argv[1:] if this is None).
+    """
+    parser = argparse.ArgumentParser(description="Find the shortest route of every origin/destination pair.")
+    parser.add_argument("--pairs", default="-", help="the file of pairs to read (- for stdin)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"),
+                        help="the format of the pairs (by default, jsonl for .jsonl files and csv otherwise)")
+    parser.add_argument("--output", default="-", help="the file to write the results to (- for stdout)")
+    parser.add_argument("--format", choices=("jsonl", "csv"),
+                        help="the format of the results (by default, csv for .csv files and jsonl otherwise)")
+    parser.add_argument("--network", help="a network file or snapshot to use instead of the SMRT Map")
+    parser.add_argument("--processes", type=positive_integer,
+                        help="the number of processes to spread the pairs across")
+    parser.add_argument("--block-size", type=positive_integer, default=10000,
+                        help="the number of pairs worked on at a time")
+    arguments = parser.parse_args(argv)
+    input_format = arguments.input_format or ("jsonl" if arguments.pairs.endswith(".jsonl") else "csv")
+    output_format = arguments.format or ("csv" if arguments.output.endswith(".csv") else "jsonl")
+    trains = TrainLogic.from_file(arguments.network) if arguments.network else Trains
+
+    pairs_file = sys.stdin if arguments.pairs == "-" else open(arguments.pairs, newline="")
+    output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w", newline="")
+    try:
+        written, unreachable, errors = write_batch_results(trains, read_station_pairs(pairs_file, input_format),
+                                                           output_file, output_format, arguments.processes,
+                                                           arguments.block_size)
+    finally:
+        if pairs_file is not sys.stdin:
+            pairs_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f"{written} routes written ({unreachable} unreachable, {errors} with an error).", file=sys.stderr)
+
+
 if __name__ == "__main__":
-    main()
+    # With command-line arguments, the program runs in batch mode instead of showing the menu.
+    if len(sys.argv) > 1:
+        run_batch()
+    else:
+        main()
@@ -0,0 +1,239 @@
+"""This script stores the classes that collect performance metrics about the algorithms (when they're turned on)."""
+import cProfile
+import io
+import math
+import pstats
+import threading
+
+
+class SearchStats:
+    """
+    The SearchStats class counts the work that a single search did. A search only fills this in if it's given one,
+    and the counts are worked out once at the end of the search, so a search that isn't measured does no extra work.
+
+    Attributes:
+        settled (int): The number of stations whose shortest distance was made final.
+        scanned (int): The number of links that were looked at.
+        relaxed (int): The number of links that gave a station a shorter distance.
+        heap_pushes (int): The number of entries pushed into the priority queue.
+        heap_pops (int): The number of entries popped from the priority queue.
+        reconstruction_seconds (float): How long it took to trace the route back.
+    """
+    __slots__ = ("settled", "scanned", "relaxed", "heap_pushes", "heap_pops", "reconstruction_seconds")
+
+    def __init__(self):
+        self.settled = 0
+        self.scanned = 0
+        self.relaxed = 0
+        self.heap_pushes = 0
+        self.heap_pops = 0
+        self.reconstruction_seconds = 0.0
+
+    def add(self, settled, scanned, relaxed, heap_pushes, heap_pops):
+        """
+        This method adds the counts of a search (a search with two sides adds the counts of both sides).
+
+        Args:
+            settled (int): The number of settled stations.
+            scanned (int): The number of links that were looked at.
+            relaxed (int): The number of links that gave a station a shorter distance.
+            heap_pushes (int): The number of entries pushed into the priority queue.
+            heap_pops (int): The number of entries popped from the priority queue.
+        """
+        self.settled += settled
+        self.scanned += scanned
+        self.relaxed += relaxed
+        self.heap_pushes += heap_pushes
+        self.heap_pops += heap_pops
+
+
+class Histogram:
+    """
+    The Histogram class summarises many values (e.g. latencies) without keeping every value. The values are
+    counted in buckets that double in size (..., 0.5, 1, 2, 4, ...), so the percentiles are estimates that
+    are at most twice the real value, and the memory used stays the same however many values are recorded.
+
+    Attributes:
+        count (int): The number of recorded values.
+        total (float): The sum of the recorded values.
+        minimum (float): The lowest recorded value.
+        maximum (float): The highest recorded value.
+        buckets (dict): The number of values in every bucket, keyed by the exponent of the top of the bucket.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.buckets = {}
+
+    def record(self, value):
+        """
+        This method adds a value to the histogram.
+
+        Args:
+            value (float): The value to add (values below zero are counted as zero).
+        """
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        # math.frexp splits the value into mantissa * 2 ** exponent (with 0.5 <= mantissa < 1),
+        # so the value is always below 2 ** exponent. Zero (and below) goes into its own bucket.
+        exponent = math.frexp(value)[1] if value > 0 else None
+        self.buckets[exponent] = self.buckets.get(exponent, 0) + 1
+
+    def percentile(self, ratio):
+        """
+        This method estimates a percentile of the recorded values.
+
+        Args:
+            ratio (float): The percentile as a ratio, e.g. 0.99 for the 99th percentile.
+
+        Returns:
+            Percentile (float): The top of the bucket that holds the percentile (capped at the highest value),
+            or None if nothing was recorded.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(ratio * self.count))
+        seen = self.buckets.get(None, 0)
+        if seen >= rank:
+            return 0
+        for exponent in sorted(exponent for exponent in self.buckets if exponent is not None):
+            seen += self.buckets[exponent]
+            if seen >= rank:
+                return min(2.0 ** exponent, self.maximum)
+        return self.maximum
+
+    def summary(self):
+        """
+        This method summarises the recorded values.
+
+        Returns:
+            Summary (dict): The count, mean, minimum, p50, p90, p99 and maximum of the values.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.minimum,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.maximum,
+        }
+
+
+class MetricsRegistry:
+    """
+    The MetricsRegistry class holds the counters and histograms of every instrumented operation inside
+    the program (e.g. "dijkstra_algorithm.wall_ms"). It can be used by many threads at the same time.
+
+    Attributes:
+        counters (dict): The count of every counted event, keyed by name.
+        histograms (dict): The histogram of every measured value, keyed by name.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1):
+        """
+        This method adds to a counter.
+
+        Args:
+            name (str): The name of the counter.
+            amount (int): How much to add.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name, value):
+        """
+        This method adds a value to a histogram.
+
+        Args:
+            name (str): The name of the histogram.
+            value (float): The value to add.
+        """
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].record(value)
+
+    def record_call(self, operation, wall_seconds, search_stats=None):
+        """
+        This method records one call of an instrumented operation.
+
+        Args:
+            operation (str): The name of the operation, e.g. "dijkstra_algorithm".
+            wall_seconds (float): How long the call took.
+            search_stats (SearchStats): The work done by the search of the call, if it ran one.
+        """
+        self.increment(f"{operation}.calls")
+        self.record(f"{operation}.wall_ms", wall_seconds * 1000)
+        if search_stats is not None:
+            for field in ("settled", "scanned", "relaxed", "heap_pushes", "heap_pops"):
+                self.record(f"{operation}.{field}", getattr(search_stats, field))
+            self.record(f"{operation}.reconstruction_ms", search_stats.reconstruction_seconds * 1000)
+
+    def report(self):
+        """
+        This method gives back everything that was recorded.
+
+        Returns:
+            Report (dict): The counters, and the summary of every histogram.
+        """
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+            }
+
+    def format_report(self):
+        """
+        This method turns everything that was recorded into lines of text that can be shown to the user.
+
+        Returns:
+            Lines (list): One line for every counter and every histogram.
+        """
+        report = self.report()
+        if not report["counters"] and not report["histograms"]:
+            return ["No metrics have been recorded yet."]
+        lines = [f"{name}: {count}" for name, count in report["counters"].items()]
+        for name, summary in report["histograms"].items():
+            lines.append(f"{name}: mean {summary['mean']:.3f}, p50 {summary['p50']:.3f}, "
+                         f"p99 {summary['p99']:.3f}, max {summary['max']:.3f} ({summary['count']} calls)")
+        return lines
+
+    def reset(self):
+        """This method forgets everything that was recorded."""
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+
+def profile_call(function, *arguments, sort_by="cumulative", limit=20):
+    """
+    This function runs a single call under cProfile, to see which functions the time was spent in.
+
+    Args:
+        function (function): The function to call.
+        *arguments: The arguments to call the function with.
+        sort_by (str): How to sort the profile (any pstats sort key, e.g. "cumulative" or "tottime").
+        limit (int): The number of functions to show.
+
+    Returns:
+        Result and Profile (tuple): What the function gave back, and the profile as text.
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *arguments)
+    # A generator only runs when it's looped over, so it's looped over inside the profiler.
+    if hasattr(result, "__next__"):
+        result = profiler.runcall(list, result)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats(sort_by).print_stats(limit)
+    return result, output.getvalue()
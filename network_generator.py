@@ -0,0 +1,62 @@
+"""This script generates big, random train networks that look like the SMRT Map, so that the program can be tested at scale."""
+import random
+
+
+def generate_network(station_count, line_count=None, interchange_ratio=0.05, seed=0):
+    """
+    This function generates a random train network in the same format as mrt_train_graph.
+
+    The stations are split into train lines, where every line is a chain of stations. Every line is connected
+    to an earlier line through an interchange (so that every station can be reached), and then some extra
+    interchanges are added between random lines. Just like the SMRT Map, every link of an interchange station
+    has a weight of 2, and every other link has a weight of 1.
+
+    Args:
+        station_count (int): The number of stations in the network (at least 2).
+        line_count (int): The number of train lines. If this is None, it's based on the number of stations.
+        interchange_ratio (float): The number of extra interchanges to add, as a ratio of the number of stations.
+        seed (int): The seed of the random number generator, so that the same network can be generated again.
+
+    Returns:
+        graph (dict): The weighted graph of the generated network.
+    """
+    randomizer = random.Random(seed)
+    if line_count is None:
+        line_count = max(2, int(station_count ** 0.5) // 2)
+    line_count = max(1, min(line_count, station_count // 2))
+    graph = {}
+    lines = []
+    # Split the stations between the lines as evenly as possible.
+    for line_number in range(line_count):
+        line_length = station_count // line_count + (line_number < station_count % line_count)
+        line = [f"Line {line_number + 1} Station {station_number + 1}" for station_number in range(line_length)]
+        for station in line:
+            graph[station] = {}
+        for station, next_station in zip(line, line[1:]):
+            graph[station][next_station] = 1
+            graph[next_station][station] = 1
+        lines.append(line)
+
+    interchange_stations = set()
+
+    def add_interchange(first_line, second_line):
+        first_station = randomizer.choice(lines[first_line])
+        second_station = randomizer.choice(lines[second_line])
+        graph[first_station][second_station] = 1
+        graph[second_station][first_station] = 1
+        interchange_stations.update((first_station, second_station))
+
+    # Connect every line to one of the lines before it, so that the network is connected.
+    for line_number in range(1, line_count):
+        add_interchange(line_number, randomizer.randrange(line_number))
+    if line_count > 1:
+        for _ in range(int(station_count * interchange_ratio)):
+            first_line, second_line = randomizer.sample(range(line_count), 2)
+            add_interchange(first_line, second_line)
+
+    # Every link of an interchange station has a weight of 2.
+    for station in interchange_stations:
+        for neighbour in graph[station]:
+            graph[station][neighbour] = 2
+            graph[neighbour][station] = 2
+    return graph
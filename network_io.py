@@ -0,0 +1,258 @@
+"""This script stores the functions that load train networks from files, and save them as fast-loading snapshots."""
+import csv
+import json
+import mmap
+import os
+import struct
+from array import array
+from compiled_graph import CompiledGraph
+
+# Every snapshot file starts with these bytes, so that other files are not mistaken for a snapshot.
+SNAPSHOT_MAGIC = b"SMRTCSR1"
+# The header is the magic bytes, followed by the number of stations, the number of links,
+# and the size of the station names in bytes.
+SNAPSHOT_HEADER = struct.Struct("=8sqqq")
+
+
+def load_network(path):
+    """
+    This function loads a train network from a file, based on the file extension:
+    - .csv: An edge list with the columns source, target, weight (a header row is optional).
+    - .jsonl: An edge list with one {"source": ..., "target": ..., "weight": ...} object per line.
+    - .json: A dictionary of dictionaries, in the same format as mrt_train_graph.
+
+    The edge lists are read one line at a time, so the whole file is never in memory at once.
+    Every link in a file goes one way. If the other way isn't in the file, it's added with the same weight.
+    Every weight must be a whole number of at least 1, otherwise a ValueError says where the mistake is.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        graph (dict): The weighted graph of the network.
+    """
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as network_file:
+            network = json.load(network_file)
+        if not isinstance(network, dict) or not all(isinstance(neighbours, dict) for neighbours in network.values()):
+            raise ValueError(f"{path} must be a dictionary of dictionaries, like mrt_train_graph.")
+        return _edge_list_to_graph(_read_json_edges(network, path), network)
+    if path.endswith(".jsonl"):
+        return _edge_list_to_graph(_read_jsonl_edges(path))
+    return _edge_list_to_graph(_read_csv_edges(path))
+
+
+def _read_csv_edges(path):
+    """
+    This function reads the links of a CSV edge list one row at a time.
+
+    Args:
+        path (str): The path of the CSV file.
+
+    Yields:
+        Link (tuple): (source station, target station, weight) for every row.
+    """
+    with open(path, newline="", encoding="utf-8") as network_file:
+        reader = csv.reader(network_file)
+        first_row = True
+        for row in reader:
+            if not row or row[0].lstrip().startswith("#"):
+                continue
+            if len(row) < 3:
+                raise ValueError(f"{path}, line {reader.line_num}: a link needs a source, a target and a weight.")
+            source_station, target_station, weight = (column.strip() for column in row[:3])
+            # Only the first row can be the header row, and only if it's exactly the header that save_network
+            # writes. Any other first row is a link (and a weight that can't be read is a mistake).
+            if first_row and [source_station.lower(), target_station.lower(), weight.lower()] == \
+                    ["source", "target", "weight"]:
+                first_row = False
+                continue
+            first_row = False
+            yield source_station, target_station, _read_weight(weight, f"{path}, line {reader.line_num}")
+
+
+def _read_jsonl_edges(path):
+    """
+    This function reads the links of a JSON Lines edge list one line at a time.
+
+    Args:
+        path (str): The path of the JSON Lines file.
+
+    Yields:
+        Link (tuple): (source station, target station, weight) for every line.
+    """
+    with open(path, encoding="utf-8") as network_file:
+        for line_number, line in enumerate(network_file, 1):
+            if line.strip():
+                try:
+                    link = json.loads(line)
+                    source_station, target_station, weight = link["source"], link["target"], link["weight"]
+                except json.JSONDecodeError as error:
+                    raise ValueError(f"{path}, line {line_number}: the line isn't valid JSON ({error}).") from error
+                except (KeyError, TypeError) as error:
+                    raise ValueError(f"{path}, line {line_number}: a link needs a source, a target and a "
+                                     f"weight.") from error
+                yield source_station, target_station, _read_weight(weight, f"{path}, line {line_number}")
+
+
+def _read_json_edges(network, path):
+    """
+    This function reads the links of a network that was loaded from a JSON file.
+
+    Args:
+        network (dict): The dictionary of dictionaries of the JSON file.
+        path (str): The path of the JSON file (for the error messages).
+
+    Yields:
+        Link (tuple): (source station, target station, weight) for every link.
+    """
+    for source_station, neighbours in network.items():
+        for target_station, weight in neighbours.items():
+            yield source_station, target_station, _read_weight(weight, f"{path}, {source_station} -> {target_station}")
+
+
+def _read_weight(weight, location):
+    """
+    This function reads the weight of a link, which must be a whole number of at least 1
+    (the route algorithms don't work with weights of 0 or less).
+
+    Args:
+        weight (str or int): The weight as it's written in the file.
+        location (str): The path of the file and where the link is inside it (for the error message).
+
+    Returns:
+        Weight (int): The weight.
+    """
+    written_weight = weight
+    if isinstance(weight, str) and weight.strip().isascii():
+        # A weight in a CSV file is text, which is read the same way as the numbers of a JSON file.
+        text = weight.strip()
+        if text.lstrip("+-").isdigit():
+            weight = int(text)
+        else:
+            try:
+                weight = float(text)
+            except ValueError:
+                pass
+    if isinstance(weight, int) and not isinstance(weight, bool):
+        value = weight
+    elif isinstance(weight, float) and weight.is_integer():
+        # JSON writers sometimes write whole numbers as e.g. 2.0.
+        value = int(weight)
+    else:
+        raise ValueError(f"{location}: the weight {written_weight!r} isn't a whole number.")
+    if value < 1:
+        raise ValueError(f"{location}: the weight {written_weight!r} must be at least 1.")
+    return value
+
+
+def _edge_list_to_graph(links, stations=()):
+    """
+    This function builds a weighted graph from links, making sure that every link goes both ways.
+
+    Args:
+        links (iterable): (source station, target station, weight) for every link.
+        stations (iterable): Stations to add first, so that the stations without any links are kept too.
+
+    Returns:
+        graph (dict): The weighted graph.
+    """
+    graph = {station: {} for station in stations}
+    for source_station, target_station, weight in links:
+        graph.setdefault(source_station, {})[target_station] = weight
+        graph.setdefault(target_station, {})
+    for station in graph:
+        for neighbour, weight in graph[station].items():
+            graph[neighbour].setdefault(station, weight)
+    return graph
+
+
+def save_network(graph, path):
+    """
+    This function saves a train network as a CSV edge list (which can be loaded again with load_network).
+
+    Args:
+        graph (dict): The weighted graph of the network.
+        path (str): The path of the CSV file.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as network_file:
+        writer = csv.writer(network_file)
+        writer.writerow(("source", "target", "weight"))
+        for station, neighbours in graph.items():
+            for neighbour, weight in neighbours.items():
+                writer.writerow((station, neighbour, weight))
+
+
+def save_snapshot(compiled_graph, path):
+    """
+    This function saves a compiled graph as a binary snapshot. The snapshot contains the adjacency arrays
+    exactly as they are stored in memory, so loading it doesn't need any parsing.
+
+    The layout is: header, offsets, neighbours, weights, name offsets (all 8-byte integers), station names (UTF-8).
+
+    Args:
+        compiled_graph (CompiledGraph): The compiled graph to save.
+        path (str): The path of the snapshot file.
+    """
+    encoded_names = [station.encode("utf-8") for station in compiled_graph.station_names]
+    name_offsets = array('q', [0])
+    for encoded_name in encoded_names:
+        name_offsets.append(name_offsets[-1] + len(encoded_name))
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(compiled_graph),
+                                                 len(compiled_graph.neighbours), name_offsets[-1]))
+        for buffer in (compiled_graph.offsets, compiled_graph.neighbours, compiled_graph.weights, name_offsets):
+            snapshot_file.write(array('q', buffer).tobytes())
+        snapshot_file.write(b"".join(encoded_names))
+
+
+def load_snapshot(path):
+    """
+    This function loads a binary snapshot by memory-mapping it. The adjacency arrays are used straight
+    from the mapped file (the operating system only reads the parts that are actually used), so loading
+    a snapshot is almost instant, even for very big networks.
+
+    Args:
+        path (str): The path of the snapshot file.
+
+    Returns:
+        Compiled Graph (CompiledGraph): The compiled graph, backed by the memory-mapped file.
+    """
+    with open(path, "rb") as snapshot_file:
+        header = snapshot_file.read(SNAPSHOT_HEADER.size)
+        if len(header) < SNAPSHOT_HEADER.size or not header.startswith(SNAPSHOT_MAGIC):
+            raise ValueError(f"{path} is not a train network snapshot.")
+        _, station_count, link_count, names_size = SNAPSHOT_HEADER.unpack(header)
+        # A snapshot that was cut short (or has a broken header) would otherwise give arrays that are too short,
+        # and the routes would fail much later with a confusing error.
+        expected_size = SNAPSHOT_HEADER.size + 8 * (2 * (station_count + 1) + 2 * link_count) + names_size
+        file_size = os.fstat(snapshot_file.fileno()).st_size
+        if min(station_count, link_count, names_size) < 0 or file_size != expected_size:
+            raise ValueError(f"{path} should be {expected_size} bytes long, but it's {file_size} bytes long.")
+        mapping = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    position = SNAPSHOT_HEADER.size
+    buffers = []
+    for length in (station_count + 1, link_count, link_count, station_count + 1):
+        buffers.append(view[position:position + length * 8].cast('q'))
+        position += length * 8
+    offsets, neighbours, weights, name_offsets = buffers
+    names = view[position:position + names_size]
+    station_names = [str(names[name_offsets[station_id]:name_offsets[station_id + 1]], "utf-8")
+                     for station_id in range(station_count)]
+    # The memoryviews keep the mapping open for as long as the compiled graph is used.
+    return CompiledGraph.from_buffers(station_names, offsets, neighbours, weights)
+
+
+def is_snapshot(path):
+    """
+    This function checks whether a file is a binary snapshot.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        Is Snapshot (bool): True if the file starts with the snapshot magic bytes.
+    """
+    with open(path, "rb") as network_file:
+        return network_file.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
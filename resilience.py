@@ -0,0 +1,275 @@
+"""This script analyses how resilient the train network is, i.e. which stations and links matter the most."""
+import argparse
+import heapq
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from compiled_graph import CompiledGraph
+from logic import TrainLogic, compiled_graph_state
+
+# The compiled graph of an analysis process, set once when the process starts (see analyse_resilience).
+_analysis_graph = None
+
+
+def analyse_resilience(trains, processes=None, chunk_size=16):
+    """
+    This function finds how important every station and link of the network is, using every station as a
+    starting station:
+    - The betweenness of a station (or link) is the number of shortest routes between two other stations that
+      go through it. When there are several shortest routes between two stations, every route counts as a part
+      (e.g. half each for two routes). This is found with Brandes' algorithm, which only needs one dijkstra
+      search per starting station instead of one per pair of stations.
+    - The removal cost of a link is how much longer the shortest routes get (added up over every pair of
+      stations) if the link is de-linked, and how many pairs can't reach each other anymore. Removing a link only
+      changes the routes of a starting station if the link is on one of its shortest routes, so only those links
+      are searched again for every starting station.
+
+    The starting stations are split into chunks, and the chunks are spread across a pool of processes.
+
+    Args:
+        trains (TrainLogic): The train logic whose latest graph is analysed.
+        processes (int): The number of processes to use. If this is None, everything is done in this process.
+        chunk_size (int): The number of starting stations in every chunk.
+
+    Returns:
+        Report (dict): The betweenness of every station and link, and the removal cost of every link,
+        each sorted from the most important to the least important.
+    """
+    started = time.perf_counter()
+    compiled_graph = trains.snapshot.compiled_graph
+    station_count = len(compiled_graph)
+    chunks = [range(start_id, min(start_id + chunk_size, station_count))
+              for start_id in range(0, station_count, chunk_size)]
+    station_betweenness = [0.0] * station_count
+    link_betweenness = {}
+    removal_costs = {}
+
+    def add(partial_result):
+        partial_station_betweenness, partial_link_betweenness, partial_removal_costs = partial_result
+        for station_id, betweenness in enumerate(partial_station_betweenness):
+            station_betweenness[station_id] += betweenness
+        for link, betweenness in partial_link_betweenness.items():
+            link_betweenness[link] = link_betweenness.get(link, 0.0) + betweenness
+        for link, (increase, affected, disconnected) in partial_removal_costs.items():
+            total_increase, total_affected, total_disconnected = removal_costs.get(link, (0, 0, 0))
+            removal_costs[link] = (total_increase + increase, total_affected + affected,
+                                   total_disconnected + disconnected)
+
+    if processes is None:
+        for chunk in chunks:
+            add(_analyse_sources(compiled_graph, chunk))
+    else:
+        with ProcessPoolExecutor(processes, initializer=_start_analysis_process,
+                                 initargs=(compiled_graph_state(compiled_graph),)) as executor:
+            for partial_result in executor.map(_analyse_chunk, chunks):
+                add(partial_result)
+
+    station_names = compiled_graph.station_names
+    links = {tuple(sorted((station_names[station_id], station_names[neighbour])))
+             for station_id in range(station_count) for neighbour, _ in compiled_graph.neighbours_of(station_id)}
+    link_ids = {link: tuple(sorted((compiled_graph.station_ids[link[0]], compiled_graph.station_ids[link[1]])))
+                for link in links}
+    return {
+        "stations": station_count,
+        "links": len(links),
+        "seconds": time.perf_counter() - started,
+        "station_betweenness": sorted(
+            ({"station": station_names[station_id], "betweenness": betweenness}
+             for station_id, betweenness in enumerate(station_betweenness)),
+            key=lambda row: (-row["betweenness"], row["station"])),
+        "link_betweenness": sorted(
+            ({"stations": list(link), "betweenness": link_betweenness.get(link_ids[link], 0.0)} for link in links),
+            key=lambda row: (-row["betweenness"], row["stations"])),
+        "link_removal": sorted(
+            ({"stations": list(link), "distance_increase": cost[0], "pairs_affected": cost[1],
+              "pairs_disconnected": cost[2]}
+             for link, cost in ((link, removal_costs.get(link_ids[link], (0, 0, 0))) for link in links)),
+            key=lambda row: (-row["pairs_disconnected"], -row["distance_increase"], row["stations"])),
+    }
+
+
+def write_report(report, path, top=None):
+    """
+    This function saves a resilience report as JSON.
+
+    Args:
+        report (dict): The report from analyse_resilience.
+        path (str): The path of the JSON file.
+        top (int): Only save the most important stations and links of every ranking. If this is None,
+        everything is saved.
+    """
+    if top is not None:
+        report = {name: rows[:top] if isinstance(rows, list) else rows for name, rows in report.items()}
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+def _start_analysis_process(graph_state):
+    """
+    This function rebuilds the compiled graph once when an analysis process starts.
+
+    Args:
+        graph_state (tuple): The station names, and the offsets, neighbours and weights arrays of the graph.
+    """
+    global _analysis_graph
+    _analysis_graph = CompiledGraph.from_buffers(*graph_state)
+
+
+def _analyse_chunk(start_ids):
+    """
+    This function analyses a chunk of starting stations inside an analysis process.
+
+    Args:
+        start_ids (range): The ids of the starting stations.
+
+    Returns:
+        Partial Result (tuple): The same as _analyse_sources.
+    """
+    return _analyse_sources(_analysis_graph, start_ids)
+
+
+def _analyse_sources(compiled_graph, start_ids):
+    """
+    This function adds up the betweenness and removal costs of a chunk of starting stations.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph.
+        start_ids (range): The ids of the starting stations.
+
+    Returns:
+        Partial Result (tuple): The betweenness of every station id (list), the betweenness of every link
+        (keyed by the sorted station ids of the link), and the (distance increase, affected pairs,
+        disconnected pairs) of every link that is on a shortest route of one of the starting stations.
+    """
+    station_betweenness = [0.0] * len(compiled_graph)
+    link_betweenness = {}
+    removal_costs = {}
+    for start_id in start_ids:
+        settled_order, shortest_distance, path_count, predecessors = _count_shortest_paths(compiled_graph, start_id)
+        # Brandes' algorithm: go through the stations from the furthest to the nearest, and pass the share of
+        # routes (dependency) of every station back to the stations that come before it on a shortest route.
+        dependency = dict.fromkeys(settled_order, 0.0)
+        for station_id in reversed(settled_order):
+            for predecessor_id in predecessors[station_id]:
+                share = path_count[predecessor_id] / path_count[station_id] * (1 + dependency[station_id])
+                link = (predecessor_id, station_id) if predecessor_id < station_id else (station_id, predecessor_id)
+                link_betweenness[link] = link_betweenness.get(link, 0.0) + share
+                dependency[predecessor_id] += share
+            if station_id != start_id:
+                station_betweenness[station_id] += dependency[station_id]
+
+        # Only the links on a shortest route (in either direction) can change the routes of this starting station.
+        shortest_route_links = {(predecessor_id, station_id) if predecessor_id < station_id
+                                else (station_id, predecessor_id)
+                                for station_id in settled_order for predecessor_id in predecessors[station_id]}
+        for link in shortest_route_links:
+            new_distance = _distances_without_link(compiled_graph, start_id, *link)
+            increase = affected = disconnected = 0
+            for station_id, weight in shortest_distance.items():
+                if station_id not in new_distance:
+                    disconnected += 1
+                elif new_distance[station_id] > weight:
+                    increase += new_distance[station_id] - weight
+                    affected += 1
+            if affected or disconnected:
+                total_increase, total_affected, total_disconnected = removal_costs.get(link, (0, 0, 0))
+                removal_costs[link] = (total_increase + increase, total_affected + affected,
+                                       total_disconnected + disconnected)
+    return station_betweenness, link_betweenness, removal_costs
+
+
+def _count_shortest_paths(compiled_graph, start_id):
+    """
+    This function runs the dijkstra algorithm from a starting station, and also counts how many shortest routes
+    there are to every station, and remembers every station that comes before it on one of them.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph.
+        start_id (int): The id of the starting station.
+
+    Returns:
+        Shortest Paths (tuple): The settled stations (from the nearest to the furthest), the minimum weight to
+        every station, the number of shortest routes to every station, and the stations that come before every
+        station on its shortest routes.
+    """
+    shortest_distance = {start_id: 0}
+    path_count = {start_id: 1}
+    predecessors = {start_id: []}
+    settled_order = []
+    settled_stations = set()
+    priority_queue = [(0, start_id)]
+    while priority_queue:
+        current_weight, minimum_node = heapq.heappop(priority_queue)
+        if minimum_node in settled_stations:
+            continue
+        settled_stations.add(minimum_node)
+        settled_order.append(minimum_node)
+        for child_nodes, weight in compiled_graph.neighbours_of(minimum_node):
+            new_weight = current_weight + weight
+            old_weight = shortest_distance.get(child_nodes)
+            if old_weight is None or new_weight < old_weight:
+                shortest_distance[child_nodes] = new_weight
+                path_count[child_nodes] = path_count[minimum_node]
+                predecessors[child_nodes] = [minimum_node]
+                heapq.heappush(priority_queue, (new_weight, child_nodes))
+            elif new_weight == old_weight and child_nodes not in settled_stations:
+                # Another shortest route of the same weight.
+                path_count[child_nodes] += path_count[minimum_node]
+                predecessors[child_nodes].append(minimum_node)
+    return settled_order, shortest_distance, path_count, predecessors
+
+
+def _distances_without_link(compiled_graph, start_id, first_id, second_id):
+    """
+    This function runs the dijkstra algorithm from a starting station as if a link was de-linked
+    (in both directions), without changing the graph.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph.
+        start_id (int): The id of the starting station.
+        first_id (int): The id of one station of the link.
+        second_id (int): The id of the other station of the link.
+
+    Returns:
+        Shortest Distance (dict): The minimum weight to every station that can still be reached.
+    """
+    infinity = float('inf')
+    shortest_distance = {start_id: 0}
+    settled_stations = set()
+    priority_queue = [(0, start_id)]
+    while priority_queue:
+        current_weight, minimum_node = heapq.heappop(priority_queue)
+        if minimum_node in settled_stations:
+            continue
+        settled_stations.add(minimum_node)
+        for child_nodes, weight in compiled_graph.neighbours_of(minimum_node):
+            if minimum_node == first_id and child_nodes == second_id or \
+                    minimum_node == second_id and child_nodes == first_id:
+                continue
+            if current_weight + weight < shortest_distance.get(child_nodes, infinity):
+                shortest_distance[child_nodes] = current_weight + weight
+                heapq.heappush(priority_queue, (current_weight + weight, child_nodes))
+    return shortest_distance
+
+
+def main():
+    """This function runs the resilience analysis from the command line and saves the report."""
+    parser = argparse.ArgumentParser(description="Rank the stations and links of the network by importance.")
+    parser.add_argument("--network", help="a network file or snapshot to use instead of the SMRT Map")
+    parser.add_argument("--processes", type=int, help="the number of processes to spread the stations across")
+    parser.add_argument("--chunk-size", type=int, default=16, help="the number of starting stations per task")
+    parser.add_argument("--top", type=int, help="only save the most important stations and links of every ranking")
+    parser.add_argument("--output", default="resilience_report.json", help="the file to save the report to")
+    arguments = parser.parse_args()
+    trains = TrainLogic.from_file(arguments.network) if arguments.network else TrainLogic()
+    report = analyse_resilience(trains, arguments.processes, arguments.chunk_size)
+    write_report(report, arguments.output, arguments.top)
+    print(f"Analysed {report['stations']} stations and {report['links']} links in {report['seconds']:.2f} s.")
+    for row in report["link_removal"][:5]:
+        print(f"    {row['stations'][0]} <-> {row['stations'][1]}: {row['pairs_disconnected']} pairs cut off, "
+              f"routes {row['distance_increase']} longer in total")
+    print(f"Report saved to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
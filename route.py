@@ -0,0 +1,111 @@
+"""This script stores the route class, which is the result of finding the shortest route between two stations."""
+
+
+class Route:
+    """
+    The Route class holds a shortest route as station ids and a weight, so that programs that find many routes
+    don't have to build (or parse) any text. The text that the program shows is only built when it's asked for.
+
+    Attributes:
+        station_ids (list): The ids of the stations on the route, in order.
+        weight (int): The weight of the route.
+        station_names (list): The name of every station id of the graph that the route was found in
+        (this is shared with the compiled graph, not copied).
+    """
+    __slots__ = ("station_ids", "weight", "station_names")
+
+    def __init__(self, station_ids, weight, station_names):
+        self.station_ids = station_ids
+        self.weight = weight
+        self.station_names = station_names
+
+    @classmethod
+    def from_search(cls, compiled_graph, route):
+        """
+        This method makes a route from the result of a search.
+
+        Args:
+            compiled_graph (CompiledGraph): The graph that the route was found in.
+            route (tuple): The ids of the stations on the route (in order) and the weight of the route,
+            or None if the target station can't be reached.
+
+        Returns:
+            Route (Route): The route, or None if the route is None.
+        """
+        if route is None:
+            return None
+        station_ids, weight = route
+        return cls(station_ids, weight, compiled_graph.station_names)
+
+    @property
+    def hops(self):
+        """The number of links travelled on the route."""
+        return len(self.station_ids) - 1
+
+    @property
+    def start_station(self):
+        """The name of the first station of the route."""
+        return self.station_names[self.station_ids[0]]
+
+    @property
+    def target_station(self):
+        """The name of the last station of the route."""
+        return self.station_names[self.station_ids[-1]]
+
+    @property
+    def stations(self):
+        """
+        The names of the stations on the route.
+
+        Returns:
+            Stations (list): The name of every station on the route, in order.
+        """
+        station_names = self.station_names
+        return [station_names[station_id] for station_id in self.station_ids]
+
+    def path_lines(self):
+        """
+        This method gives back the route one line at a time, in the format that the program shows.
+
+        Yields:
+            Line (str): "Start: station" for the first station, and "--> station" for every other station.
+        """
+        station_names = self.station_names
+        yield f"Start: {station_names[self.station_ids[0]]}"
+        for station_id in self.station_ids[1:]:
+            yield f"--> {station_names[station_id]}"
+
+    def weight_line(self):
+        """
+        This method gives back the weight of the route in the format that the program shows.
+
+        Returns:
+            Weight Line (str): "Weight of Path: weight".
+        """
+        return f"Weight of Path: {self.weight}"
+
+    def format(self):
+        """
+        This method formats the route the way dijkstra_algorithm used to give it back.
+
+        Returns:
+            2D List of Shortest Path and Weight (list): The shortest path list (path) and the weight to get there.
+        """
+        return [list(self.path_lines()), self.weight_line()]
+
+    def __getitem__(self, index):
+        # Programs that were written for the old 2D list result (route[0] for the path, route[1] for the weight)
+        # still work, the text is just built when it's asked for.
+        return self.format()[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, Route):
+            return NotImplemented
+        return self.station_ids == other.station_ids and self.weight == other.weight and \
+            (self.station_names is other.station_names or self.stations == other.stations)
+
+    def __hash__(self):
+        return hash((tuple(self.station_ids), self.weight))
+
+    def __repr__(self):
+        return f"Route({' -> '.join(self.stations)}, weight={self.weight})"
@@ -0,0 +1,107 @@
+"""This script stores the route cache class that remembers the most recently found routes."""
+import threading
+from collections import OrderedDict
+
+
+class RouteCache:
+    """
+    The RouteCache class is a bounded LRU (Least Recently Used) cache of routes.
+    When the cache is full, the route that hasn't been used for the longest time is evicted.
+    The cache can be used by many threads at the same time.
+
+    Attributes:
+        capacity (int): The maximum number of routes that the cache can hold. A capacity of 0 disables the cache.
+        hits (int): How many times a route was found inside the cache.
+        misses (int): How many times a route was not found inside the cache.
+        evictions (int): How many routes were evicted because the cache was full.
+    """
+
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # An OrderedDict remembers the order in which the routes were used,
+        # where the least recently used route is at the start.
+        self._routes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._routes)
+
+    def __contains__(self, key):
+        return key in self._routes
+
+    def get(self, key):
+        """
+        This method finds a route inside the cache.
+
+        Args:
+            key (tuple): The key of the route, which is (start station, target station, graph version).
+
+        Returns:
+            Found and Route (tuple): Whether the route was found, and the route itself.
+        """
+        with self._lock:
+            try:
+                route = self._routes[key]
+            except KeyError:
+                self.misses += 1
+                return False, None
+            # Move the route to the end as it's now the most recently used route.
+            self._routes.move_to_end(key)
+            self.hits += 1
+            return True, route
+
+    def put(self, key, route):
+        """
+        This method stores a route inside the cache, evicting the least recently used route if the cache is full.
+
+        Args:
+            key (tuple): The key of the route, which is (start station, target station, graph version).
+            route (tuple): The route to store.
+        """
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._routes[key] = route
+            self._routes.move_to_end(key)
+            while len(self._routes) > self.capacity:
+                self._routes.popitem(last=False)
+                self.evictions += 1
+
+    def carry_over(self, old_version, new_version, keep):
+        """
+        This method moves the routes that are still valid after the graph changed to the new graph version,
+        so that they can still be used. The rest of the routes of the old graph version are removed.
+
+        Args:
+            old_version (int): The graph version before the change.
+            new_version (int): The graph version after the change.
+            keep (function): Takes the key and the route, and returns True if the route is still valid.
+        """
+        with self._lock:
+            for key in [key for key in self._routes if key[2] == old_version]:
+                route = self._routes.pop(key)
+                if keep(key, route):
+                    self._routes[(key[0], key[1], new_version)] = route
+
+    def clear(self):
+        """This method removes every route from the cache."""
+        with self._lock:
+            self._routes.clear()
+
+    def stats(self):
+        """
+        This method shows how well the cache is doing.
+
+        Returns:
+            Stats (dict): The capacity, current size, and the hit, miss and eviction counters of the cache.
+        """
+        return {
+            "capacity": self.capacity,
+            "size": len(self._routes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,242 @@
+"""This script stores the other ways (strategies) of finding the shortest route between two stations."""
+import heapq
+import time
+from compiled_graph import trace_path
+
+# The strategies that TrainLogic.find_route can use.
+ROUTE_STRATEGIES = ("dijkstra", "bidirectional", "alt", "ch")
+
+
+def dijkstra_search(compiled_graph, start_id, target_id, search_stats=None):
+    """
+    This function finds the shortest route using the normal (one-way) dijkstra algorithm.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to search in.
+        start_id (int): The id of the starting station.
+        target_id (int): The id of the target station.
+        search_stats (SearchStats): Filled in with the work done by the search, if it's given.
+
+    Returns:
+        Route and Settled Count (tuple): The station ids and weight of the route (or None if the target station
+        can't be reached), and the number of stations that were settled.
+    """
+    settled_stations = set()
+    shortest_distance, predecessor = compiled_graph.shortest_paths(start_id, target_id, settled_stations, search_stats)
+    if target_id not in shortest_distance:
+        return None, len(settled_stations)
+    started = time.perf_counter()
+    path = trace_path(predecessor, start_id, target_id)
+    if search_stats is not None:
+        search_stats.reconstruction_seconds += time.perf_counter() - started
+    return (path, shortest_distance[target_id]), len(settled_stations)
+
+
+def bidirectional_search(compiled_graph, reverse_graph, start_id, target_id, search_stats=None):
+    """
+    This function finds the shortest route by running two dijkstra searches at the same time, one forwards
+    from the starting station and one backwards from the target station (on the reversed graph).
+    Every time a search reaches a station the other search has already reached, we have found a route, and we
+    remember the shortest one. Once the lowest weights of both heaps add up to at least the weight of the
+    shortest route found so far, no shorter route can exist, so the search stops.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to search in.
+        reverse_graph (CompiledGraph): The same graph with every link reversed.
+        start_id (int): The id of the starting station.
+        target_id (int): The id of the target station.
+        search_stats (SearchStats): Filled in with the work done by the search, if it's given.
+
+    Returns:
+        Route and Settled Count (tuple): The station ids and weight of the route (or None if the target station
+        can't be reached), and the number of stations that were settled by both searches.
+    """
+    if start_id == target_id:
+        if search_stats is not None:
+            search_stats.add(1, 0, 0, 1, 1)
+        return ([start_id], 0), 1
+    infinity = float('inf')
+    # Index 0 is the forward search, and index 1 is the backward search.
+    graphs = (compiled_graph, reverse_graph)
+    shortest_distance = ({start_id: 0}, {target_id: 0})
+    predecessor = ({}, {})
+    settled_stations = (set(), set())
+    priority_queues = ([(0, start_id)], [(0, target_id)])
+    best_weight = infinity
+    meeting_station = None
+    heap_pushes = 2
+
+    while priority_queues[0] and priority_queues[1]:
+        if priority_queues[0][0][0] + priority_queues[1][0][0] >= best_weight:
+            break
+        # Always move the search that has the smaller heap forwards, so that both searches stay balanced.
+        side = 0 if len(priority_queues[0]) <= len(priority_queues[1]) else 1
+        current_weight, minimum_node = heapq.heappop(priority_queues[side])
+        if minimum_node in settled_stations[side]:
+            continue
+        settled_stations[side].add(minimum_node)
+        for child_nodes, weight in graphs[side].neighbours_of(minimum_node):
+            new_weight = current_weight + weight
+            if new_weight < shortest_distance[side].get(child_nodes, infinity):
+                shortest_distance[side][child_nodes] = new_weight
+                predecessor[side][child_nodes] = minimum_node
+                heapq.heappush(priority_queues[side], (new_weight, child_nodes))
+                heap_pushes += 1
+            # Check if the other search has already reached this station, which means we've found a route.
+            other_weight = shortest_distance[1 - side].get(child_nodes)
+            if other_weight is not None and shortest_distance[side][child_nodes] + other_weight < best_weight:
+                best_weight = shortest_distance[side][child_nodes] + other_weight
+                meeting_station = child_nodes
+
+    settled_count = len(settled_stations[0]) + len(settled_stations[1])
+    if search_stats is not None:
+        scanned = sum(graphs[side].offsets[station_id + 1] - graphs[side].offsets[station_id]
+                      for side in (0, 1) for station_id in settled_stations[side])
+        search_stats.add(settled_count, scanned, heap_pushes - 2, heap_pushes,
+                         heap_pushes - len(priority_queues[0]) - len(priority_queues[1]))
+    if meeting_station is None:
+        return None, settled_count
+    started = time.perf_counter()
+    # The forward half of the route is traced back from the meeting station to the starting station,
+    # and the backward half is traced from the meeting station to the target station.
+    path = trace_path(predecessor[0], start_id, meeting_station)
+    backward_path = trace_path(predecessor[1], target_id, meeting_station)
+    backward_path.reverse()
+    path.extend(backward_path[1:])
+    if search_stats is not None:
+        search_stats.reconstruction_seconds += time.perf_counter() - started
+    return (path, best_weight), settled_count
+
+
+class Landmarks:
+    """
+    The Landmarks class stores a few chosen stations (landmarks), and the minimum weight from every landmark
+    to every station and from every station to every landmark. Thanks to the triangle inequality, these can
+    be used to find a lower bound of the weight between any two stations, which is what the A* search (ALT)
+    uses to look at fewer stations.
+
+    Attributes:
+        landmark_ids (list): The ids of the chosen landmarks.
+        distances_from (list): For every landmark, the minimum weight from the landmark to every station.
+        distances_to (list): For every landmark, the minimum weight from every station to the landmark.
+    """
+
+    def __init__(self, compiled_graph, reverse_graph, landmark_count, landmark_ids=None):
+        if landmark_ids is not None:
+            # Keep the landmarks that were already picked (e.g. before the graph was changed).
+            self.landmark_ids = list(landmark_ids)
+        else:
+            self.landmark_ids = self._pick_landmarks(compiled_graph, landmark_count)
+        self.distances_from = [compiled_graph.shortest_paths(landmark_id)[0] for landmark_id in self.landmark_ids]
+        self.distances_to = [reverse_graph.shortest_paths(landmark_id)[0] for landmark_id in self.landmark_ids]
+
+    @staticmethod
+    def _pick_landmarks(compiled_graph, landmark_count):
+        """
+        This method picks the landmarks one at a time, where every new landmark is the station that is the furthest
+        away from the landmarks that were already picked (this spreads the landmarks around the edges of the
+        network, which gives the best lower bounds).
+
+        Args:
+            compiled_graph (CompiledGraph): The graph.
+            landmark_count (int): The number of landmarks to pick.
+
+        Returns:
+            Landmark Ids (list): The ids of the picked landmarks.
+        """
+        landmark_ids = []
+        nearest_landmark_distance = {}
+        next_landmark = 0
+        for _ in range(min(landmark_count, len(compiled_graph))):
+            shortest_distance, _ = compiled_graph.shortest_paths(next_landmark)
+            for station_id, weight in shortest_distance.items():
+                nearest_landmark_distance[station_id] = min(weight, nearest_landmark_distance.get(station_id, weight))
+            landmark_ids.append(next_landmark)
+            next_landmark = max(nearest_landmark_distance, key=nearest_landmark_distance.get)
+            if next_landmark in landmark_ids:
+                break
+        return landmark_ids
+
+    def lower_bound(self, station_id, target_id):
+        """
+        This method finds a lower bound of the weight from a station to a target station.
+        For every landmark L, d(station, target) >= d(L, target) - d(L, station)
+        and d(station, target) >= d(station, L) - d(target, L).
+
+        Args:
+            station_id (int): The id of the station.
+            target_id (int): The id of the target station.
+
+        Returns:
+            Lower Bound (int): A weight that the shortest route is guaranteed to be at least.
+        """
+        bound = 0
+        for distance_from, distance_to in zip(self.distances_from, self.distances_to):
+            if station_id in distance_from and target_id in distance_from:
+                bound = max(bound, distance_from[target_id] - distance_from[station_id])
+            if station_id in distance_to and target_id in distance_to:
+                bound = max(bound, distance_to[station_id] - distance_to[target_id])
+        return bound
+
+
+def alt_search(compiled_graph, landmarks, start_id, target_id, search_stats=None):
+    """
+    This function finds the shortest route using A* search, where the estimate of the remaining weight
+    is the lower bound given by the landmarks (this is called ALT: A*, Landmarks, Triangle inequality).
+    Stations are settled in the order of (weight so far + lower bound to the target), so stations
+    that lead away from the target are settled later (or never).
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to search in.
+        landmarks (Landmarks): The landmarks of the graph.
+        start_id (int): The id of the starting station.
+        target_id (int): The id of the target station.
+        search_stats (SearchStats): Filled in with the work done by the search, if it's given.
+
+    Returns:
+        Route and Settled Count (tuple): The station ids and weight of the route (or None if the target station
+        can't be reached), and the number of stations that were settled.
+    """
+    infinity = float('inf')
+    shortest_distance = {start_id: 0}
+    predecessor = {}
+    settled_stations = set()
+    # The lower bounds are remembered, as they are needed every time a station is pushed into the heap.
+    lower_bounds = {}
+    priority_queue = [(landmarks.lower_bound(start_id, target_id), start_id)]
+    heap_pushes = 1
+
+    def add_search_stats():
+        offsets = compiled_graph.offsets
+        scanned = sum(offsets[station_id + 1] - offsets[station_id] for station_id in settled_stations
+                      if station_id != target_id)
+        search_stats.add(len(settled_stations), scanned, heap_pushes - 1, heap_pushes,
+                         heap_pushes - len(priority_queue))
+
+    while priority_queue:
+        _, minimum_node = heapq.heappop(priority_queue)
+        if minimum_node in settled_stations:
+            continue
+        settled_stations.add(minimum_node)
+        if minimum_node == target_id:
+            if search_stats is None:
+                return (trace_path(predecessor, start_id, target_id), shortest_distance[target_id]), \
+                    len(settled_stations)
+            add_search_stats()
+            started = time.perf_counter()
+            path = trace_path(predecessor, start_id, target_id)
+            search_stats.reconstruction_seconds += time.perf_counter() - started
+            return (path, shortest_distance[target_id]), len(settled_stations)
+        current_weight = shortest_distance[minimum_node]
+        for child_nodes, weight in compiled_graph.neighbours_of(minimum_node):
+            if child_nodes not in settled_stations and \
+                    current_weight + weight < shortest_distance.get(child_nodes, infinity):
+                shortest_distance[child_nodes] = current_weight + weight
+                predecessor[child_nodes] = minimum_node
+                if child_nodes not in lower_bounds:
+                    lower_bounds[child_nodes] = landmarks.lower_bound(child_nodes, target_id)
+                heapq.heappush(priority_queue, (current_weight + weight + lower_bounds[child_nodes], child_nodes))
+                heap_pushes += 1
+    if search_stats is not None:
+        add_search_stats()
+    return None, len(settled_stations)
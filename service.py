@@ -0,0 +1,417 @@
+"""This script stores the route query service, which lets other programs use one shared TrainLogic over HTTP."""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+from logic import TrainLogic
+from route_strategies import ROUTE_STRATEGIES
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+# The biggest request body (in bytes) that is read, so that a client can't make the service run out of memory.
+MAX_BODY_SIZE = 64 * 1024
+# The most alternative routes that can be asked for at once, as every extra route needs more searches.
+MAX_ALTERNATIVES = 20
+
+
+class RequestError(Exception):
+    """This exception is raised when a request can't be answered, and holds the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class RouteService:
+    """
+    The RouteService class answers JSON-over-HTTP requests using one shared TrainLogic, which is loaded once
+    when the service starts. The requests are read by an asyncio event loop, and the searches are run on a pool
+    of threads, so that the event loop can keep reading other requests while a search is running (the searches
+    run on the snapshot that was published when they started, so they can run at the same time as an edit).
+
+    When the same route is asked for by many clients at the same time (e.g. a popular origin and destination),
+    only one search is run, and every request waits for that search (this is called request coalescing).
+
+    Endpoints:
+        GET /route?from=A&to=B[&strategy=dijkstra]: The shortest route from A to B.
+        GET /alternatives?from=A&to=B[&k=3][&max_detour=1.5]: The k (up to 20) shortest routes from A to B.
+        GET /traversal?from=A[&mode=dfs][&max_depth=N][&max_count=N]: The stations that can be reached from A.
+        GET /neighbours?station=A: The neighbouring stations of A and the weight to get there.
+        GET /stations: The name of every station.
+        POST /link and POST /delink with {"from": A, "to": B}: Link or de-link two stations.
+        GET /health: The number of stations, the graph version, and how many searches were coalesced.
+
+    Attributes:
+        trains (TrainLogic): The train logic that every request uses.
+        executor (ThreadPoolExecutor): The threads that the searches run on.
+        coalesced_requests (int): The number of route requests that waited for a search of another request.
+    """
+
+    def __init__(self, trains, workers=None):
+        self.trains = trains
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="smrt-service")
+        self.coalesced_requests = 0
+        # The searches that are running, keyed by what they're searching for (including the graph version,
+        # so that a request that comes in after an edit never waits for a search on the old graph).
+        self._running_searches = {}
+        self._routes = {
+            ("GET", "/route"): self.route,
+            ("GET", "/alternatives"): self.alternatives,
+            ("GET", "/traversal"): self.traversal,
+            ("GET", "/neighbours"): self.neighbours,
+            ("GET", "/stations"): self.stations,
+            ("POST", "/link"): self.link,
+            ("POST", "/delink"): self.delink,
+            ("GET", "/health"): self.health,
+        }
+
+    async def handle_connection(self, reader, writer):
+        """
+        This method answers every request of a connection, one at a time, until the client closes it.
+
+        Args:
+            reader (asyncio.StreamReader): The stream to read the requests from.
+            writer (asyncio.StreamWriter): The stream to write the responses to.
+        """
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except RequestError as error:
+                    self._write_response(writer, error.status, {"error": str(error)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                try:
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except RequestError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        """
+        This method sends a request to the method of its endpoint.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET".
+            target (str): The path and query of the request, e.g. "/route?from=A&to=B".
+            body (bytes): The body of the request.
+
+        Returns:
+            Payload (dict): What to answer with (as JSON).
+        """
+        url = urlsplit(target)
+        handler = self._routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self._routes):
+                raise RequestError(405, f"{method} can't be used on {url.path}")
+            raise RequestError(404, f"There is no endpoint {url.path}")
+        parameters = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise RequestError(400, "The body must be a JSON object")
+            # A list of pairs (or a single number) would otherwise be read as parameters, or fail with a 500.
+            if not isinstance(payload, dict):
+                raise RequestError(400, "The body must be a JSON object")
+            parameters.update(payload)
+        return await handler(parameters)
+
+    async def route(self, parameters):
+        start_station = self._station(parameters, "from")
+        target_station = self._station(parameters, "to")
+        strategy = parameters.get("strategy", "dijkstra")
+        if strategy not in ROUTE_STRATEGIES:
+            raise RequestError(400, f"Unknown strategy {strategy!r}, choose one of {', '.join(ROUTE_STRATEGIES)}")
+        if strategy == "dijkstra":
+            # dijkstra_algorithm also uses the route cache (and the all-pairs table, if it's turned on).
+            search = (self.trains.dijkstra_algorithm, start_station, target_station)
+        else:
+            search = (lambda: self.trains.find_route(start_station, target_station, strategy)[0],)
+        route = await self._coalesce(("route", start_station, target_station, strategy), *search)
+        if route is None:
+            raise RequestError(404, f"{target_station} can't be reached from {start_station}")
+        return route_payload(route)
+
+    async def alternatives(self, parameters):
+        start_station = self._station(parameters, "from")
+        target_station = self._station(parameters, "to")
+        k = self._number(parameters, "k", int, 3)
+        if not 1 <= k <= MAX_ALTERNATIVES:
+            raise RequestError(400, f"'k' must be from 1 to {MAX_ALTERNATIVES}")
+        max_detour = self._number(parameters, "max_detour", float, None)
+        try:
+            routes = await self._coalesce(("alternatives", start_station, target_station, k, max_detour),
+                                          self.trains.alternative_routes, start_station, target_station, k,
+                                          max_detour)
+        except ValueError as error:
+            raise RequestError(400, str(error))
+        return {"routes": [route_payload(route) for route in routes]}
+
+    async def traversal(self, parameters):
+        start_station = self._station(parameters, "from")
+        mode = parameters.get("mode", "dfs")
+        if mode not in ("dfs", "bfs"):
+            raise RequestError(400, f"Unknown mode {mode!r}, choose dfs or bfs")
+        max_depth = self._number(parameters, "max_depth", int, None)
+        max_count = self._number(parameters, "max_count", int, None)
+        if max_depth is not None and max_depth < 0:
+            raise RequestError(400, "'max_depth' must be at least 0")
+        if max_count is not None and max_count < 1:
+            raise RequestError(400, "'max_count' must be at least 1")
+
+        def traverse():
+            return list(self.trains.traverse(start_station, mode, max_depth, max_count))
+
+        stations = await self._coalesce(("traversal", start_station, mode, max_depth, max_count), traverse)
+        return {"from": start_station, "mode": mode, "stations": stations}
+
+    async def neighbours(self, parameters):
+        # This is only a dictionary lookup, so it doesn't need to run on a thread.
+        station = self._station(parameters, "station")
+        compiled_graph = self.trains.compiled_graph
+        station_names = compiled_graph.station_names
+        neighbours = compiled_graph.neighbours_of(compiled_graph.station_ids[station])
+        return {"station": station,
+                "neighbours": {station_names[neighbour]: weight for neighbour, weight in neighbours}}
+
+    async def stations(self, parameters):
+        return {"stations": list(self.trains.compiled_graph.station_names)}
+
+    async def link(self, parameters):
+        start_station = self._station(parameters, "from")
+        target_station = self._station(parameters, "to")
+        message = await self._run(self.trains.link_stations, start_station, target_station)
+        return {"message": message, "graph_version": self.trains.graph_version}
+
+    async def delink(self, parameters):
+        start_station = self._station(parameters, "from")
+        target_station = self._station(parameters, "to")
+        message = await self._run(self.trains.delink_stations, start_station, target_station)
+        return {"message": message, "graph_version": self.trains.graph_version}
+
+    async def health(self, parameters):
+        return {
+            "stations": len(self.trains.compiled_graph),
+            "graph_version": self.trains.graph_version,
+            "running_searches": len(self._running_searches),
+            "coalesced_requests": self.coalesced_requests,
+            "route_cache": self.trains.route_cache.stats(),
+        }
+
+    async def _run(self, function, *arguments):
+        """
+        This method runs a function on the thread pool, so that the event loop isn't blocked while it runs.
+
+        Args:
+            function (function): The function to run.
+            *arguments: The arguments to give to the function.
+
+        Returns:
+            Result: What the function gave back.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *arguments)
+
+    async def _coalesce(self, key, function, *arguments):
+        """
+        This method runs a search on the thread pool, unless the same search is already running,
+        in which case it waits for that search instead.
+
+        Args:
+            key (tuple): What the search is searching for.
+            function (function): The function that runs the search.
+            *arguments: The arguments to give to the function.
+
+        Returns:
+            Result: What the search gave back.
+        """
+        key = (*key, self.trains.graph_version)
+        running_search = self._running_searches.get(key)
+        if running_search is not None:
+            self.coalesced_requests += 1
+            # shield() makes sure that a client that goes away doesn't cancel the search for everyone else.
+            return await asyncio.shield(running_search)
+        running_search = asyncio.ensure_future(self._run(function, *arguments))
+        self._running_searches[key] = running_search
+        running_search.add_done_callback(lambda _: self._running_searches.pop(key, None))
+        return await asyncio.shield(running_search)
+
+    def _station(self, parameters, name):
+        """
+        This method reads a station from the parameters of a request.
+
+        Args:
+            parameters (dict): The parameters of the request.
+            name (str): The name of the parameter.
+
+        Returns:
+            Station (str): The station.
+        """
+        station = parameters.get(name)
+        if not isinstance(station, str) or not station:
+            raise RequestError(400, f"The {name!r} station is missing")
+        # The compiled graph is used instead of trains.graph, as a network loaded from a snapshot file would
+        # have to build its whole dictionary graph first.
+        if station not in self.trains.compiled_graph:
+            raise RequestError(404, f"There is no station {station!r}")
+        return station
+
+    @staticmethod
+    def _number(parameters, name, number_type, default):
+        """
+        This method reads a number from the parameters of a request.
+
+        Args:
+            parameters (dict): The parameters of the request.
+            name (str): The name of the parameter.
+            number_type (type): int or float.
+            default: What to give back if the parameter isn't given.
+
+        Returns:
+            Number (int or float): The number.
+        """
+        if parameters.get(name) is None:
+            return default
+        try:
+            return number_type(parameters[name])
+        except (TypeError, ValueError):
+            raise RequestError(400, f"{name!r} must be a number")
+
+    @staticmethod
+    async def _read_request(reader):
+        """
+        This method reads one HTTP request.
+
+        Args:
+            reader (asyncio.StreamReader): The stream to read the request from.
+
+        Returns:
+            Request (tuple): The method, target, headers (with lowercase names) and body of the request,
+            or None if the client closed the connection.
+        """
+        request_line = await RouteService._read_line(reader)
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            return None
+        headers = {}
+        while True:
+            line = await RouteService._read_line(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        content_length = headers.get("content-length") or "0"
+        # int() would also accept "-5", " 5" or "1_000", so only plain digits are allowed.
+        if not (content_length.isascii() and content_length.isdigit()):
+            raise RequestError(400, f"The Content-Length {content_length!r} isn't a valid size")
+        body_size = int(content_length)
+        if body_size > MAX_BODY_SIZE:
+            raise RequestError(413, f"The body can't be bigger than {MAX_BODY_SIZE} bytes")
+        body = await reader.readexactly(body_size) if body_size else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    async def _read_line(reader):
+        """
+        This method reads one line of the request line or headers of an HTTP request.
+
+        Args:
+            reader (asyncio.StreamReader): The stream to read the line from.
+
+        Returns:
+            Line (bytes): The line, including the line ending.
+        """
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # readline gives up on lines that are longer than the limit of the stream.
+            raise RequestError(400, "A line of the request is too long")
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        """
+        This method writes one HTTP response with a JSON body.
+
+        Args:
+            writer (asyncio.StreamWriter): The stream to write the response to.
+            status (int): The HTTP status.
+            payload (dict): The body, which is sent as JSON.
+            keep_alive (bool): Whether the connection stays open for more requests.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+
+
+def route_payload(route):
+    """
+    This function turns a route into what the service answers with.
+
+    Args:
+        route (Route): The route.
+
+    Returns:
+        Payload (dict): The stations, weight and number of hops of the route.
+    """
+    return {"from": route.start_station, "to": route.target_station, "weight": route.weight, "hops": route.hops,
+            "stations": route.stations}
+
+
+async def serve(trains, host="127.0.0.1", port=8080, workers=None):
+    """
+    This function runs the service until it's stopped.
+
+    Args:
+        trains (TrainLogic): The train logic that every request uses.
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        workers (int): The number of threads the searches run on (the ThreadPoolExecutor default if None).
+    """
+    service = RouteService(trains, workers)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving {len(trains.compiled_graph)} stations on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """This function starts the service from the command line."""
+    parser = argparse.ArgumentParser(description="Serve route queries over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="the port to listen on")
+    parser.add_argument("--network", help="a network file or snapshot to use instead of the SMRT Map")
+    parser.add_argument("--workers", type=int, help="the number of threads the searches run on")
+    parser.add_argument("--all-pairs", action="store_true", help="precompute the routes between every pair")
+    arguments = parser.parse_args()
+    if arguments.network:
+        trains = TrainLogic.from_file(arguments.network, all_pairs=arguments.all_pairs)
+    else:
+        trains = TrainLogic(all_pairs=arguments.all_pairs)
+    try:
+        asyncio.run(serve(trains, arguments.host, arguments.port, arguments.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
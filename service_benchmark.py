@@ -0,0 +1,137 @@
+"""This script load-tests the route query service (service.py) on localhost."""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlencode
+from benchmark import percentiles
+
+
+async def request(reader, writer, method, path, body=None):
+    """
+    This function sends one HTTP request on an open connection and reads the response.
+
+    Args:
+        reader (asyncio.StreamReader): The stream to read the response from.
+        writer (asyncio.StreamWriter): The stream to write the request to.
+        method (str): The HTTP method, e.g. "GET".
+        path (str): The path and query of the request.
+        body (dict): The JSON body of the request, if there is one.
+
+    Returns:
+        Status and Payload (tuple): The HTTP status, and the JSON body of the response.
+    """
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n"
+                 .encode("latin-1") + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    content_length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            content_length = int(value)
+    return status, json.loads(await reader.readexactly(content_length))
+
+
+async def client(host, port, paths, latencies, statuses):
+    """
+    This function sends requests one after another on one connection (like a single user would).
+
+    Args:
+        host (str): The address of the service.
+        port (int): The port of the service.
+        paths (list): The paths of the requests to send.
+        latencies (list): The latency of every request is added to this list (in seconds).
+        statuses (dict): The number of responses of every HTTP status is counted in this dictionary.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, "GET", path)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_benchmark(host, port, connections, requests_per_connection, hot_ratio, seed):
+    """
+    This function runs many clients at the same time, and measures the latency of every request.
+
+    Args:
+        host (str): The address of the service.
+        port (int): The port of the service.
+        connections (int): The number of clients that send requests at the same time.
+        requests_per_connection (int): The number of requests every client sends.
+        hot_ratio (float): The share of requests that ask for the same few routes (which the service coalesces).
+        seed (int): The seed used to pick the stations.
+
+    Returns:
+        Results (dict): The throughput, the latency percentiles, the HTTP statuses, and the health of the service.
+    """
+    randomizer = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    _, payload = await request(reader, writer, "GET", "/stations")
+    writer.close()
+    stations = payload["stations"]
+    # A few routes are asked for by many clients at the same time, which is what request coalescing is for.
+    hot_pairs = [randomizer.sample(stations, 2) for _ in range(5)]
+
+    def pick_path():
+        start_station, target_station = randomizer.choice(hot_pairs) if randomizer.random() < hot_ratio \
+            else randomizer.sample(stations, 2)
+        return "/route?" + urlencode({"from": start_station, "to": target_station})
+
+    latencies = []
+    statuses = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, [pick_path() for _ in range(requests_per_connection)],
+                                  latencies, statuses) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    reader, writer = await asyncio.open_connection(host, port)
+    _, health = await request(reader, writer, "GET", "/health")
+    writer.close()
+    return {
+        "connections": connections,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "latency": percentiles(latencies),
+        "statuses": statuses,
+        "service": health,
+    }
+
+
+def main():
+    """This function runs the load test and prints (and optionally saves) the results."""
+    parser = argparse.ArgumentParser(description="Load-test the route query service.")
+    parser.add_argument("--host", default="127.0.0.1", help="the address of the service")
+    parser.add_argument("--port", type=int, default=8080, help="the port of the service")
+    parser.add_argument("--connections", type=int, default=50, help="the number of clients at the same time")
+    parser.add_argument("--requests", type=int, default=100, help="the number of requests of every client")
+    parser.add_argument("--hot-ratio", type=float, default=0.5,
+                        help="the share of requests that ask for the same few routes")
+    parser.add_argument("--seed", type=int, default=0, help="the seed used to pick the stations")
+    parser.add_argument("--output", help="a file to save the results to as JSON")
+    arguments = parser.parse_args()
+    results = asyncio.run(run_benchmark(arguments.host, arguments.port, arguments.connections, arguments.requests,
+                                        arguments.hot_ratio, arguments.seed))
+    latency = results["latency"]
+    print(f"{results['requests']} requests in {results['seconds']:.2f} s "
+          f"({results['requests_per_second']:.0f} requests per second)")
+    print(f"Latency: p50 {latency['p50_ms']:.2f} ms, p90 {latency['p90_ms']:.2f} ms, "
+          f"p99 {latency['p99_ms']:.2f} ms, max {latency['max_ms']:.2f} ms")
+    print(f"Statuses: {results['statuses']}, coalesced requests: {results['service']['coalesced_requests']}")
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
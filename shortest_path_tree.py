@@ -0,0 +1,109 @@
+"""This script stores the shortest path tree class that holds the shortest paths from one station to every station."""
+from compiled_graph import trace_path
+
+
+class ShortestPathTree:
+    """
+    The ShortestPathTree class holds the result of running the dijkstra algorithm from one starting station
+    to every other station, i.e. the minimum weight to reach every station, and the station that comes before
+    every station on its shortest path. The path to a target station is only traced back when it's asked for.
+
+    Attributes:
+        compiled_graph (CompiledGraph): The graph that the tree was found in.
+        start_id (int): The id of the starting station.
+        shortest_distance (dict): The minimum weight to reach every reachable station, keyed by station id.
+        predecessor (dict): The station id that comes before every station id on its shortest path.
+    """
+
+    def __init__(self, compiled_graph, start_id, search_stats=None):
+        self.compiled_graph = compiled_graph
+        self.start_id = start_id
+        self.shortest_distance, self.predecessor = compiled_graph.shortest_paths(start_id, search_stats=search_stats)
+
+    def __contains__(self, station):
+        return self.compiled_graph.station_ids.get(station) in self.shortest_distance
+
+    @property
+    def start_station(self):
+        """The name of the starting station."""
+        return self.compiled_graph.station_names[self.start_id]
+
+    @property
+    def distances(self):
+        """
+        The minimum weight to reach every reachable station.
+
+        Returns:
+            Distances (dict): The minimum weight, keyed by station name.
+        """
+        station_names = self.compiled_graph.station_names
+        return {station_names[station_id]: weight for station_id, weight in self.shortest_distance.items()}
+
+    @property
+    def predecessors(self):
+        """
+        The station that comes before every reachable station on its shortest path.
+
+        Returns:
+            Predecessors (dict): The name of the station that comes before, keyed by station name.
+        """
+        station_names = self.compiled_graph.station_names
+        return {station_names[station_id]: station_names[previous_id]
+                for station_id, previous_id in self.predecessor.items()}
+
+    def distance_to(self, target_station):
+        """
+        This method finds the minimum weight to reach a target station.
+
+        Args:
+            target_station (str): The station to go to.
+
+        Returns:
+            Distance (int): The minimum weight, or None if the target station can't be reached.
+        """
+        return self.shortest_distance.get(self.compiled_graph.station_ids[target_station])
+
+    def path_to(self, target_station):
+        """
+        This method traces back the shortest path to a target station.
+
+        Args:
+            target_station (str): The station to go to.
+
+        Returns:
+            Path (list): The names of the stations on the path (in order), or None if the target station can't
+            be reached.
+        """
+        route = self.route(self.compiled_graph.station_ids[target_station])
+        if route is None:
+            return None
+        return [self.compiled_graph.station_names[station_id] for station_id in route[0]]
+
+    def route(self, target_id):
+        """
+        This method traces back the shortest route to a target station.
+
+        Args:
+            target_id (int): The id of the station to go to.
+
+        Returns:
+            Station Ids and Weight (tuple): The ids of the stations on the route (in order) and the
+            weight of the route, or None if the target station can't be reached.
+        """
+        if target_id not in self.shortest_distance:
+            return None
+        return trace_path(self.predecessor, self.start_id, target_id), self.shortest_distance[target_id]
+
+    def stations_within(self, max_weight):
+        """
+        This method finds every station that can be reached within a maximum weight.
+
+        Args:
+            max_weight (int): The maximum weight.
+
+        Returns:
+            Stations (list): (station, weight) pairs, from the nearest station to the furthest station.
+        """
+        station_names = self.compiled_graph.station_names
+        return sorted(((station_names[station_id], weight) for station_id, weight in self.shortest_distance.items()
+                       if weight <= max_weight), key=lambda station: station[1])
@@ -0,0 +1,219 @@
+"""This script stores the graph snapshot class, which is an unchangeable version of the train graph."""
+from collections.abc import Mapping
+from types import MappingProxyType
+from all_pairs import AllPairsTable
+from compiled_graph import CompiledGraph
+from contraction import ContractionHierarchy
+from route_strategies import Landmarks
+
+
+class FrozenGraph(Mapping):
+    """
+    The FrozenGraph class is a read-only view of a weighted graph. It can be used just like the graph
+    dictionary (graph[station], station in graph, graph.keys(), ...), but it can't be changed.
+    """
+    __slots__ = ("_adjacency",)
+
+    def __init__(self, adjacency):
+        self._adjacency = adjacency
+
+    def __getitem__(self, station):
+        return MappingProxyType(self._adjacency[station])
+
+    def __contains__(self, station):
+        return station in self._adjacency
+
+    def __iter__(self):
+        return iter(self._adjacency)
+
+    def __len__(self):
+        return len(self._adjacency)
+
+
+class GraphSnapshot:
+    """
+    The GraphSnapshot class is one version of the train graph, together with everything that the algorithms
+    build from it (the compiled graph, the landmarks, the contraction hierarchy and the all-pairs table).
+    A snapshot is never changed after it's published: linking or de-linking stations makes a new snapshot
+    (which copies only the stations that changed), so a route query that started on a snapshot always sees
+    the same graph, even if stations are linked or de-linked by another thread at the same time.
+
+    The things built from the graph are built the first time they're needed. If two threads build the same
+    thing at the same time, they build the same result, so no locking is needed.
+
+    Attributes:
+        version (int): The version of the graph, which goes up every time the graph changes.
+        adjacency (dict): The weighted graph (this must not be changed, use graph for a read-only view).
+        graph (FrozenGraph): A read-only view of the weighted graph.
+        compiled_graph (CompiledGraph): The integer-indexed version of the graph.
+        reverse_compiled_graph (CompiledGraph): The compiled graph with every link reversed.
+        landmarks (Landmarks): The landmarks used by the "alt" route strategy.
+        contraction_hierarchy (ContractionHierarchy): The contraction hierarchy used by the "ch" route strategy.
+        all_pairs_table (AllPairsTable): The precomputed shortest routes between every pair of stations.
+        component_table (tuple): The component number of every station and the stations inside every component
+        (shared with the component index, see ComponentIndex.shared_table), or None if the component index wasn't
+        built for this snapshot.
+    """
+
+    def __init__(self, version, adjacency=None, compiled_graph=None, landmark_count=4, landmark_ids=None,
+                 station_ids=None):
+        # A snapshot can either be made from a weighted graph, or from a compiled graph (e.g. a memory-mapped
+        # snapshot file), in which case the weighted graph is only built when something needs it.
+        self.version = version
+        self.landmark_count = landmark_count
+        self._adjacency = adjacency
+        self._compiled_graph = compiled_graph
+        # The station ids never change when stations are linked or de-linked, so they're passed on from the
+        # previous snapshot (if it knew them), and the graph doesn't have to be compiled just to look them up.
+        self._station_ids = station_ids
+        self._reverse_compiled_graph = None
+        # The landmarks of the previous snapshot are kept (if there are any), so that they're only picked once.
+        self._landmark_ids = landmark_ids
+        self._landmarks = None
+        self._contraction_hierarchy = None
+        self._all_pairs_table = None
+        self.component_table = None
+
+    @property
+    def adjacency(self):
+        if self._adjacency is None:
+            self._adjacency = self._compiled_graph.to_graph()
+        return self._adjacency
+
+    @property
+    def graph(self):
+        return FrozenGraph(self.adjacency)
+
+    @property
+    def compiled_graph(self):
+        if self._compiled_graph is None:
+            self._compiled_graph = CompiledGraph(self._adjacency)
+        return self._compiled_graph
+
+    @property
+    def station_ids(self):
+        """The id of every station, which is the same in every snapshot and in the compiled graph."""
+        if self._station_ids is None:
+            if self._compiled_graph is not None:
+                self._station_ids = self._compiled_graph.station_ids
+            else:
+                # The compiled graph gives the ids in the order of the graph, so they can be found without it.
+                self._station_ids = {station: station_id for station_id, station in enumerate(self._adjacency)}
+        return self._station_ids
+
+    @property
+    def reverse_compiled_graph(self):
+        if self._reverse_compiled_graph is None:
+            self._reverse_compiled_graph = self.compiled_graph.reversed()
+        return self._reverse_compiled_graph
+
+    @property
+    def landmarks(self):
+        if self._landmarks is None:
+            self._landmarks = Landmarks(self.compiled_graph, self.reverse_compiled_graph, self.landmark_count,
+                                        self._landmark_ids)
+        return self._landmarks
+
+    @property
+    def landmark_ids(self):
+        """The ids of the landmarks of this snapshot, or of the previous snapshot if they haven't been needed yet."""
+        return self._landmark_ids if self._landmarks is None else self._landmarks.landmark_ids
+
+    @property
+    def contraction_hierarchy(self):
+        if self._contraction_hierarchy is None:
+            self._contraction_hierarchy = ContractionHierarchy(self.compiled_graph)
+        return self._contraction_hierarchy
+
+    @property
+    def all_pairs_table(self):
+        if self._all_pairs_table is None:
+            self._all_pairs_table = AllPairsTable(self.compiled_graph)
+        return self._all_pairs_table
+
+    @all_pairs_table.setter
+    def all_pairs_table(self, table):
+        self._all_pairs_table = table
+
+    @property
+    def has_all_pairs_table(self):
+        """Whether the all-pairs table of this snapshot has been built."""
+        return self._all_pairs_table is not None
+
+    def component_size(self, station):
+        """
+        This method counts the stations that can be reached from a station, if the component sizes are known.
+
+        Args:
+            station (str): The station.
+
+        Returns:
+            Size (int): The number of stations in the same part of the network, or None if it isn't known.
+        """
+        if self.component_table is None:
+            return None
+        component_of, members = self.component_table
+        return len(members[component_of[station]])
+
+    def are_connected(self, station_input, station_target):
+        """
+        This method checks whether a station can be reached from another station, using the component table.
+
+        Args:
+            station_input (str): One station.
+            station_target (str): The other station.
+
+        Returns:
+            Connected (bool): True if there is a route between the two stations.
+        """
+        component_of = self.component_table[0]
+        return component_of[station_input] == component_of[station_target]
+
+    def reachable_stations(self, station):
+        """
+        This method finds every station that can be reached from a station, using the component table.
+
+        Args:
+            station (str): The station.
+
+        Returns:
+            Stations (frozenset): The stations that can be reached (including the station itself).
+        """
+        component_of, members = self.component_table
+        return frozenset(members[component_of[station]])
+
+    def changed(self, operations, after_each=None):
+        """
+        This method makes the next snapshot, with stations linked or de-linked. Only the outer dictionary
+        and the neighbours of the changed stations are copied, every other station is shared with this snapshot.
+
+        Args:
+            operations (list): ("link", station input, station target, weight) or
+            ("delink", station input, station target, None) for every change, in order.
+            after_each (function): Called with (operation, adjacency) after every change, where adjacency
+            is the graph so far (this lets indexes be repaired one change at a time).
+
+        Returns:
+            Snapshot (GraphSnapshot): The next snapshot.
+        """
+        adjacency = dict(self.adjacency)
+        copied_stations = set()
+        for operation in operations:
+            kind, station_input, station_target, weight = operation
+            for station in (station_input, station_target):
+                if station not in copied_stations:
+                    adjacency[station] = dict(adjacency[station])
+                    copied_stations.add(station)
+            if kind == "link":
+                adjacency[station_input][station_target] = weight
+                adjacency[station_target][station_input] = weight
+            else:
+                del adjacency[station_input][station_target]
+                del adjacency[station_target][station_input]
+            if after_each is not None:
+                after_each(operation, adjacency)
+        station_ids = self._station_ids
+        if station_ids is None and self._compiled_graph is not None:
+            station_ids = self._compiled_graph.station_ids
+        return GraphSnapshot(self.version + 1, adjacency, landmark_count=self.landmark_count,
+                             landmark_ids=self.landmark_ids, station_ids=station_ids)
@@ -0,0 +1,58 @@
+"""This script tests that apply_edits makes every change of a transaction, or none of them."""
+import random
+import unittest
+from components import connected_groups
+from logic import TrainLogic
+from test_support import random_graph, same_partition
+
+
+class ApplyEditsTest(unittest.TestCase):
+
+    def test_apply_edits_refuses_to_split_a_part_while_joining_others(self):
+        trains = TrainLogic({"A": {"B": 1}, "B": {"A": 1}, "C": {}, "D": {}})
+        committed, _ = trains.apply_edits([("delink", "A", "B"), ("link", "C", "D")])
+        self.assertFalse(committed)
+        self.assertIn("B", trains.graph["A"])
+        committed, _ = trains.apply_edits([("delink", "A", "B"), ("link", "A", "C"), ("link", "C", "B")])
+        self.assertTrue(committed)
+        self.assertTrue(trains.are_connected("A", "B"))
+
+    def test_mistakes_change_nothing(self):
+        trains = TrainLogic({"A": {"B": 1}, "B": {"A": 1, "C": 1}, "C": {"B": 1}, "D": {}})
+        for operations in ([("link", "A", "C", 0)], [("link", "A", "C", 1.5)], [("link", "A", "C", True)],
+                           [("link", "A", "C", 2), ("link", "C", "A")], [("delink", "A", "C")],
+                           [("delink", "A", "B", 1)], [("link", "A", "Z")], [("link", "A", "A")],
+                           [("move", "A", "C")], [("link", "A")], [("delink", "B", "C")]):
+            committed, _ = trains.apply_edits(operations)
+            self.assertFalse(committed, operations)
+        self.assertEqual(trains.graph_version, 0)
+        committed, _ = trains.apply_edits([("link", "A", "C", 4), ("delink", "A", "B"), ("link", "C", "D")])
+        self.assertTrue(committed)
+        self.assertEqual(trains.graph_version, 1)
+        self.assertEqual(trains.graph["C"], {"B": 1, "A": 4, "D": 1})
+
+    def test_random_transactions_never_leave_stations_unreachable(self):
+        randomizer = random.Random(15)
+        for trial in range(40):
+            trains = TrainLogic(random_graph(randomizer, 12, randomizer.randint(5, 20)))
+            stations = list(trains.graph)
+            before = connected_groups(trains.graph)
+            operations = []
+            for _ in range(randomizer.randint(1, 5)):
+                station_input, station_target = randomizer.sample(stations, 2)
+                operations.append(("delink" if station_target in trains.graph[station_input] else "link",
+                                   station_input, station_target))
+            committed, _ = trains.apply_edits(operations)
+            after = connected_groups(trains.graph)
+            # Stations that could reach each other still can (and nothing changed if the transaction was refused).
+            for station_input in stations:
+                for station_target in stations:
+                    if before.connected(station_input, station_target):
+                        self.assertTrue(after.connected(station_input, station_target), (trial, operations))
+            self.assertEqual(trains.graph_version, int(committed))
+            self.assertTrue(same_partition(trains.component_index.component_of,
+                                           {station: after.find(station) for station in stations}), trial)
+
+
+if __name__ == "__main__":
+    unittest.main()
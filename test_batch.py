@@ -0,0 +1,60 @@
+"""This script tests the batch mode, which finds the routes of many pairs of stations at once."""
+import contextlib
+import io
+import random
+import unittest
+from logic import TrainLogic
+from main import read_station_pairs, run_batch, write_batch_results
+from test_support import random_graph
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_batch_routes_match_dijkstra(self):
+        randomizer = random.Random(20)
+        trains = TrainLogic(random_graph(randomizer, 40, 35), route_cache_size=0)
+        stations = list(trains.graph)
+        pairs = [tuple(randomizer.sample(stations, 2)) for _ in range(200)]
+        for block_size in (1, 7, 1000):
+            for (start_station, target_station), route in zip(pairs, trains.batch_dijkstra_algorithm(pairs,
+                                                                                                   None, block_size)):
+                expected = trains.dijkstra_algorithm(start_station, target_station)
+                self.assertEqual(None if route is None else route.stations,
+                                 None if expected is None else expected.stations)
+
+    def test_block_size_and_processes_must_be_at_least_one(self):
+        trains = TrainLogic({"A": {"B": 1}, "B": {"A": 1}})
+        # The mistake is raised straight away, not when the first route is asked for.
+        with self.assertRaises(ValueError):
+            trains.batch_dijkstra_algorithm([("A", "B")], block_size=0)
+        with self.assertRaises(ValueError):
+            trains.batch_dijkstra_algorithm([("A", "B")], processes=-1)
+        for argument in ("--block-size", "--processes"):
+            for value in ("0", "-2", "many"):
+                with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                    run_batch(["--pairs", "pairs.csv", argument, value])
+
+    def test_only_lists_and_objects_are_pairs(self):
+        lines = ['["A", "B"]\n', '{"origin": "B", "destination": "C"}\n', '"AB"\n', '3\n', '["A", "B", "C"]\n',
+                 '{"origin": "A"}\n', 'not json\n', '\n']
+        pairs = list(read_station_pairs(io.StringIO("".join(lines)), "jsonl"))
+        self.assertEqual(pairs[:2], [(1, "A", "B"), (2, "B", "C")])
+        self.assertEqual([(line_number, origin) for line_number, origin, _ in pairs[2:]],
+                         [(3, None), (4, None), (5, None), (6, None), (7, None)])
+
+    def test_results_keep_the_order_of_the_pairs(self):
+        trains = TrainLogic({"A": {"B": 1}, "B": {"A": 1, "C": 2}, "C": {"B": 2}, "D": {}})
+        pairs = read_station_pairs(io.StringIO("origin,destination\nA,C\nA,X\nbroken\nA,D\nC,A\n"), "csv")
+        output_file = io.StringIO()
+        counts = write_batch_results(trains, pairs, output_file, "csv", None, 2)
+        self.assertEqual(counts, (5, 1, 2))
+        rows = output_file.getvalue().splitlines()
+        self.assertEqual([row.split(",")[:2] for row in rows[1:]],
+                         [["A", "C"], ["A", "X"], ["", ""], ["A", "D"], ["C", "A"]])
+        self.assertEqual(rows[1], "A,C,3,2,A > B > C,")
+        self.assertTrue(rows[2].endswith("unknown station X"))
+        self.assertTrue(rows[4].endswith("unreachable"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""This script tests that the bridge index that is repaired after every change matches the one built from scratch."""
+import random
+import unittest
+from bridges import BridgeIndex
+from test_support import random_graph, same_partition
+
+
+class BridgeIndexTest(unittest.TestCase):
+
+    def test_bridge_index_matches_rebuild(self):
+        randomizer = random.Random(1)
+        for trial in range(100):
+            graph = random_graph(randomizer, randomizer.randint(2, 20), randomizer.randint(0, 30))
+            stations = list(graph)
+            index = BridgeIndex(graph)
+            for step in range(30):
+                station_input, station_target = randomizer.sample(stations, 2)
+                if station_target in graph[station_input]:
+                    del graph[station_input][station_target]
+                    del graph[station_target][station_input]
+                    index.link_removed(station_input, station_target)
+                else:
+                    graph[station_input][station_target] = 1
+                    graph[station_target][station_input] = 1
+                    index.link_added(station_input, station_target)
+                rebuilt = BridgeIndex(graph)
+                self.assertEqual(index.bridges, rebuilt.bridges, (trial, step))
+                self.assertTrue(same_partition(index.component_of, rebuilt.component_of), (trial, step))
+                for component, neighbours in index.bridge_tree.items():
+                    for neighbour_component, bridge in neighbours.items():
+                        self.assertEqual({index.component_of[station] for station in bridge},
+                                         {component, neighbour_component}, (trial, step))
+
+    def test_removing_a_ring_link_splits_every_block(self):
+        # A ring of triangles, where every triangle is linked to the next one by one link.
+        graph = {}
+        for triangle in range(6):
+            stations = [f"{triangle}{corner}" for corner in "abc"]
+            for station in stations:
+                graph.setdefault(station, {})
+            for station_input, station_target in zip(stations, stations[1:] + stations[:1]):
+                graph[station_input][station_target] = graph[station_target][station_input] = 1
+            next_station = f"{(triangle + 1) % 6}a"
+            graph.setdefault(next_station, {})
+            graph[f"{triangle}c"][next_station] = graph[next_station][f"{triangle}c"] = 1
+        index = BridgeIndex(graph)
+        self.assertEqual(index.bridges, set())
+        del graph["5c"]["0a"]
+        del graph["0a"]["5c"]
+        index.link_removed("5c", "0a")
+        self.assertEqual(index.bridges, BridgeIndex(graph).bridges)
+        self.assertEqual(len(index.bridges), 5)
+        self.assertEqual(len(set(index.component_of.values())), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
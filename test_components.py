@@ -0,0 +1,87 @@
+"""This script tests the component index, and the reachability questions that the snapshots answer with it."""
+import random
+import threading
+import unittest
+from bridges import BridgeIndex
+from components import ComponentIndex
+from logic import TrainLogic
+from test_support import random_graph, same_partition
+
+
+class ComponentIndexTest(unittest.TestCase):
+
+    def test_component_index_matches_rebuild(self):
+        randomizer = random.Random(2)
+        for trial in range(100):
+            graph = random_graph(randomizer, randomizer.randint(2, 20), randomizer.randint(0, 25))
+            stations = list(graph)
+            index = ComponentIndex(graph)
+            bridges = BridgeIndex(graph)
+            for step in range(30):
+                station_input, station_target = randomizer.sample(stations, 2)
+                if station_target in graph[station_input]:
+                    was_bridge = bridges.is_bridge(station_input, station_target)
+                    del graph[station_input][station_target]
+                    del graph[station_target][station_input]
+                    bridges.link_removed(station_input, station_target)
+                    # Half of the time the index has to find out by itself whether the link was a bridge.
+                    index.link_removed(station_input, station_target, was_bridge if step % 2 else None)
+                else:
+                    graph[station_input][station_target] = 1
+                    graph[station_target][station_input] = 1
+                    bridges.link_added(station_input, station_target)
+                    index.link_added(station_input, station_target)
+                rebuilt = ComponentIndex(graph)
+                self.assertTrue(same_partition(index.component_of, rebuilt.component_of), (trial, step))
+                self.assertEqual(index.component_count, rebuilt.component_count)
+                for station in stations:
+                    self.assertEqual(index.reachable_stations(station), rebuilt.reachable_stations(station))
+
+    def test_snapshots_keep_their_components_after_later_edits(self):
+        randomizer = random.Random(5)
+        for trial in range(20):
+            graph = random_graph(randomizer, 20, 16)
+            stations = list(graph)
+            trains = TrainLogic(graph)
+            trains.are_connected(stations[0], stations[1])
+            snapshots = [trains.snapshot]
+            for step in range(25):
+                station_input, station_target = randomizer.sample(stations, 2)
+                if station_target in trains.graph[station_input]:
+                    trains.delink_stations(station_input, station_target)
+                else:
+                    trains.link_stations(station_input, station_target)
+                snapshots.append(trains.snapshot)
+            # Every snapshot (including the old ones) still answers for its own graph.
+            for snapshot in snapshots:
+                rebuilt = ComponentIndex(snapshot.adjacency)
+                for station in stations:
+                    self.assertEqual(snapshot.reachable_stations(station), rebuilt.reachable_stations(station))
+                    self.assertEqual(snapshot.component_size(station), rebuilt.component_size(station))
+                    self.assertEqual(snapshot.are_connected(stations[0], station),
+                                     rebuilt.are_connected(stations[0], station), trial)
+
+    def test_reachability_and_traversals_dont_wait_for_edits(self):
+        trains = TrainLogic()
+        trains.are_connected("Bishan", "Bedok")
+        with trains._edit_lock:
+            # The lock is held (as if a slow edit was running), so these would block forever if they needed it.
+            results = []
+            reader = threading.Thread(target=lambda: results.extend([
+                trains.are_connected("Bishan", "Bedok"), len(trains.reachable_stations("Bishan")),
+                len(list(trains.traverse("Bishan", max_count=5)))]))
+            reader.start()
+            reader.join(5)
+            self.assertFalse(reader.is_alive())
+        self.assertEqual(results, [True, len(trains.graph), 5])
+
+    def test_links_inside_a_component_copy_nothing(self):
+        trains = TrainLogic()
+        trains.are_connected("Bishan", "Bedok")
+        component_of = trains.snapshot.component_table[0]
+        trains.link_stations("Bishan", "Bedok")
+        self.assertIs(trains.snapshot.component_table[0], component_of)
+
+
+if __name__ == "__main__":
+    unittest.main()
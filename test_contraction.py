@@ -0,0 +1,47 @@
+"""This script tests that the contraction hierarchy (and the other route strategies) find the shortest routes."""
+import itertools
+import random
+import unittest
+from compiled_graph import CompiledGraph
+from contraction import ContractionHierarchy
+from logic import TrainLogic
+from route_strategies import ROUTE_STRATEGIES
+from test_support import random_graph
+
+
+class ContractionHierarchyTest(unittest.TestCase):
+
+    def test_contraction_hierarchy_matches_dijkstra(self):
+        randomizer = random.Random(3)
+        for trial in range(30):
+            compiled_graph = CompiledGraph(random_graph(randomizer, randomizer.randint(2, 30),
+                                                        randomizer.randint(0, 60), 5))
+            hierarchy = ContractionHierarchy(compiled_graph)
+            for start_id, target_id in itertools.permutations(range(len(compiled_graph)), 2):
+                expected = compiled_graph.route(start_id, target_id)
+                route, _ = hierarchy.route(start_id, target_id)
+                if expected is None:
+                    self.assertIsNone(route)
+                else:
+                    self.assertEqual(route[1], expected[1], (trial, start_id, target_id))
+
+    def test_every_strategy_matches_dijkstra_after_edits(self):
+        randomizer = random.Random(10)
+        trains = TrainLogic(random_graph(randomizer, 30, 45, 5), route_cache_size=0)
+        stations = list(trains.graph)
+        for step in range(10):
+            station_input, station_target = randomizer.sample(stations, 2)
+            if station_target in trains.graph[station_input]:
+                trains.delink_stations(station_input, station_target)
+            else:
+                trains.link_stations(station_input, station_target)
+            for start_station, target_station in (randomizer.sample(stations, 2) for _ in range(30)):
+                expected = trains.dijkstra_algorithm(start_station, target_station)
+                for strategy in ROUTE_STRATEGIES:
+                    route, _ = trains.find_route(start_station, target_station, strategy)
+                    self.assertEqual(None if route is None else route.weight,
+                                     None if expected is None else expected.weight, (step, strategy))
+
+
+if __name__ == "__main__":
+    unittest.main()
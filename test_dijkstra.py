@@ -0,0 +1,76 @@
+"""This script tests that the dijkstra algorithm finds the shortest routes (checked against Floyd-Warshall)."""
+import itertools
+import random
+import unittest
+from logic import TrainLogic
+from test_support import random_graph
+
+
+def all_shortest_weights(graph):
+    """
+    This function finds the weight of the shortest route between every pair of stations with the
+    Floyd-Warshall algorithm, which is slow but simple enough to trust.
+
+    Args:
+        graph (dict): The weighted graph.
+
+    Returns:
+        Weights (dict): The weight of the shortest route of every (starting station, target station) pair
+        that can be reached.
+    """
+    weights = {(station, station): 0 for station in graph}
+    for station, neighbours in graph.items():
+        for neighbour, weight in neighbours.items():
+            weights[station, neighbour] = min(weight, weights.get((station, neighbour), weight))
+    for middle, start, target in itertools.product(graph, repeat=3):
+        if (start, middle) in weights and (middle, target) in weights:
+            weight = weights[start, middle] + weights[middle, target]
+            if weight < weights.get((start, target), weight + 1):
+                weights[start, target] = weight
+    return weights
+
+
+class DijkstraTest(unittest.TestCase):
+
+    def check_routes(self, trains, pairs):
+        expected_weights = all_shortest_weights(trains.graph)
+        for start_station, target_station in pairs:
+            route = trains.dijkstra_algorithm(start_station, target_station)
+            if (start_station, target_station) not in expected_weights:
+                self.assertIsNone(route, (start_station, target_station))
+                continue
+            self.assertEqual(route.weight, expected_weights[start_station, target_station],
+                             (start_station, target_station))
+            self.assertEqual((route.start_station, route.target_station), (start_station, target_station))
+            self.assertEqual(sum(trains.graph[first][second] for first, second
+                                 in zip(route.stations, route.stations[1:])), route.weight)
+
+    def test_random_networks(self):
+        randomizer = random.Random(1)
+        for _ in range(20):
+            graph = random_graph(randomizer, randomizer.randint(2, 15), randomizer.randint(0, 25), 6)
+            # Some links have a different weight in each direction, like on the SMRT Map.
+            for station, neighbours in graph.items():
+                for neighbour in neighbours:
+                    if randomizer.random() < 0.2:
+                        neighbours[neighbour] += 1
+            trains = TrainLogic(graph, route_cache_size=0)
+            self.check_routes(trains, itertools.permutations(graph, 2))
+
+    def test_smrt_map(self):
+        trains = TrainLogic(route_cache_size=0)
+        randomizer = random.Random(2)
+        stations = list(trains.graph)
+        self.check_routes(trains, [randomizer.sample(stations, 2) for _ in range(300)])
+        self.assertEqual(trains.dijkstra_algorithm("Jurong East", "Jurong East").stations, ["Jurong East"])
+
+    def test_ties_are_broken_the_same_way_every_time(self):
+        # A to D is 2 links either way, and B comes before C in the graph.
+        graph = {"A": {"B": 1, "C": 1}, "B": {"A": 1, "D": 1}, "C": {"A": 1, "D": 1}, "D": {"B": 1, "C": 1}}
+        self.assertEqual(TrainLogic(graph).dijkstra_algorithm("A", "D").stations, ["A", "B", "D"])
+        graph = {"A": {"C": 1, "B": 1}, "C": {"A": 1, "D": 1}, "B": {"A": 1, "D": 1}, "D": {"C": 1, "B": 1}}
+        self.assertEqual(TrainLogic(graph).dijkstra_algorithm("A", "D").stations, ["A", "C", "D"])
+
+
+if __name__ == "__main__":
+    unittest.main()
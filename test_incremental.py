@@ -0,0 +1,69 @@
+"""This script tests that the indexes and tables that are repaired after every change match the ones built from scratch."""
+import random
+import unittest
+from all_pairs import AllPairsTable
+from compiled_graph import CompiledGraph
+from logic import TrainLogic
+from test_support import random_graph
+
+
+class IncrementalRepairTest(unittest.TestCase):
+
+    def test_all_pairs_table_and_route_cache_match_fresh_searches(self):
+        randomizer = random.Random(6)
+        for all_pairs in (True, False):
+            trains = TrainLogic(all_pairs=all_pairs)
+            stations = list(trains.graph)
+            for step in range(150):
+                station_input, station_target = randomizer.sample(stations, 2)
+                if station_target in trains.graph[station_input]:
+                    trains.delink_stations(station_input, station_target)
+                else:
+                    trains.link_stations(station_input, station_target)
+                fresh_graph = CompiledGraph(trains.graph)
+                station_ids = fresh_graph.station_ids
+                if all_pairs:
+                    fresh_table = AllPairsTable(fresh_graph)
+                    self.assertEqual(list(trains.all_pairs_table.distances), list(fresh_table.distances), step)
+                # The same few pairs are asked for every time, so that most answers come from the repaired cache.
+                query_randomizer = random.Random(step % 5)
+                for _ in range(20):
+                    start_station, target_station = query_randomizer.sample(stations, 2)
+                    route = trains.dijkstra_algorithm(start_station, target_station)
+                    expected = fresh_graph.route(station_ids[start_station], station_ids[target_station])
+                    if expected is None:
+                        self.assertIsNone(route)
+                        continue
+                    self.assertEqual(route.weight, expected[1], (step, start_station, target_station))
+                    self.assertEqual(route.station_ids[0], station_ids[start_station])
+                    self.assertEqual(route.station_ids[-1], station_ids[target_station])
+                    self.assertEqual(sum(trains.graph[first][second] for first, second
+                                         in zip(route.stations, route.stations[1:])), route.weight)
+
+    def test_route_cache_keeps_routes_of_untouched_components(self):
+        randomizer = random.Random(7)
+        for trial in range(20):
+            graph = random_graph(randomizer, 24, 14)
+            stations = list(graph)
+            trains = TrainLogic(graph)
+            # Once the component index is built, the snapshots know the parts of the network.
+            trains.are_connected(stations[0], stations[1])
+            queries = [randomizer.sample(stations, 2) for _ in range(30)]
+            for step in range(20):
+                station_input, station_target = randomizer.sample(stations, 2)
+                if station_target in trains.graph[station_input]:
+                    trains.delink_stations(station_input, station_target)
+                else:
+                    trains.link_stations(station_input, station_target)
+                fresh_graph = CompiledGraph(trains.graph)
+                station_ids = fresh_graph.station_ids
+                for start_station, target_station in queries:
+                    route = trains.dijkstra_algorithm(start_station, target_station)
+                    expected = fresh_graph.route(station_ids[start_station], station_ids[target_station])
+                    self.assertEqual(None if route is None else route.weight,
+                                     None if expected is None else expected[1], (trial, step))
+            self.assertGreater(trains.route_cache.stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
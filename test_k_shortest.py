@@ -0,0 +1,47 @@
+"""This script tests that the k shortest routes are the same as the ones found by trying every route."""
+import itertools
+import math
+import random
+import unittest
+from compiled_graph import CompiledGraph
+from k_shortest import k_shortest_routes
+from logic import TrainLogic
+from test_support import random_graph
+
+
+class KShortestRoutesTest(unittest.TestCase):
+
+    def test_k_shortest_routes_match_enumeration(self):
+        randomizer = random.Random(4)
+        for trial in range(30):
+            graph = random_graph(randomizer, randomizer.randint(2, 7), randomizer.randint(0, 14))
+            compiled_graph = CompiledGraph(graph)
+            reverse_graph = compiled_graph.reversed()
+            for start_id, target_id in itertools.permutations(range(len(compiled_graph)), 2):
+                # Every loopless route, found by brute force.
+                weights = []
+                stack = [([start_id], 0)]
+                while stack:
+                    path, weight = stack.pop()
+                    if path[-1] == target_id:
+                        weights.append(weight)
+                        continue
+                    for neighbour, link_weight in compiled_graph.neighbours_of(path[-1]):
+                        if neighbour not in path:
+                            stack.append((path + [neighbour], weight + link_weight))
+                weights.sort()
+                routes = k_shortest_routes(compiled_graph, reverse_graph, start_id, target_id, 4)
+                self.assertEqual([weight for _, weight in routes], weights[:4], (trial, start_id, target_id))
+                self.assertEqual(len({tuple(path) for path, _ in routes}), len(routes))
+
+    def test_alternative_routes_check_their_arguments(self):
+        trains = TrainLogic({"A": {"B": 1, "C": 2}, "B": {"A": 1, "C": 2}, "C": {"A": 2, "B": 2}})
+        self.assertEqual([route.weight for route in trains.alternative_routes("A", "C", 3)], [2, 3])
+        self.assertEqual([route.weight for route in trains.alternative_routes("A", "C", 3, 1.2)], [2])
+        for k, max_detour in ((0, None), (3, 0.5), (3, math.nan), (3, math.inf)):
+            with self.assertRaises(ValueError):
+                trains.alternative_routes("A", "C", k, max_detour)
+
+
+if __name__ == "__main__":
+    unittest.main()
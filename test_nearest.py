@@ -0,0 +1,49 @@
+"""This script tests that one search from many source stations gives the same routes as one search per source."""
+import random
+import unittest
+from logic import TrainLogic
+from test_support import random_graph
+
+
+class NearestSourcesTest(unittest.TestCase):
+
+    def test_nearest_sources_match_a_search_per_source(self):
+        randomizer = random.Random(24)
+        for trial in range(40):
+            trains = TrainLogic(random_graph(randomizer, 20, randomizer.randint(5, 30), 5))
+            stations = list(trains.graph)
+            source_stations = randomizer.sample(stations, randomizer.randint(1, 4))
+            target_stations = randomizer.sample(stations, randomizer.randint(1, 6)) if trial % 2 else None
+            reverse = trial % 4 < 2
+            nearest_routes = trains.nearest_sources(source_stations, target_stations, reverse=reverse)
+            self.assertEqual(set(nearest_routes), set(stations if target_stations is None else target_stations))
+            for target_station, route in nearest_routes.items():
+                routes = [trains.dijkstra_algorithm(target_station, source_station) if reverse
+                          else trains.dijkstra_algorithm(source_station, target_station)
+                          for source_station in source_stations]
+                weights = [route.weight for route in routes if route is not None]
+                if not weights:
+                    self.assertIsNone(route, (trial, target_station))
+                    continue
+                self.assertEqual(route.weight, min(weights), (trial, target_station))
+                self.assertIn(route.target_station if reverse else route.start_station, source_stations)
+                self.assertEqual(route.start_station if reverse else route.target_station, target_station)
+            if target_stations is not None:
+                # nearest_only keeps only the nearest of the target stations.
+                nearest = trains.nearest_sources(source_stations, target_stations, nearest_only=True,
+                                                 reverse=reverse)
+                reached = [route.weight for route in nearest_routes.values() if route is not None]
+                self.assertEqual([route.weight for route in nearest.values()], [min(reached)] if reached else [])
+
+    def test_nearest_only_needs_target_stations(self):
+        trains = TrainLogic({"A": {"B": 1}, "B": {"A": 1}})
+        with self.assertRaises(ValueError):
+            trains.nearest_sources(["A"], nearest_only=True)
+        with self.assertRaises(ValueError):
+            trains.nearest_sources([], ["B"])
+        self.assertEqual(trains.nearest_sources(["A"], []), {})
+        self.assertEqual(trains.nearest_sources(["A"], ["B"], nearest_only=True)["B"].weight, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""This script tests that networks and snapshots are loaded correctly, and that broken files are refused."""
+import json
+import os
+import tempfile
+import unittest
+from compiled_graph import CompiledGraph
+from network_io import load_network, load_snapshot, save_network, save_snapshot
+
+
+class NetworkFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as network_file:
+            network_file.write(text)
+        return path
+
+    def test_csv_first_row_is_only_skipped_if_it_is_the_header(self):
+        graph = load_network(self.write("links.csv", "A,B,2.0\nB,C,3\n"))
+        self.assertEqual(graph, {"A": {"B": 2}, "B": {"A": 2, "C": 3}, "C": {"B": 3}})
+        graph = load_network(self.write("header.csv", " Source , TARGET ,weight\nA,B,2\n"))
+        self.assertEqual(graph, {"A": {"B": 2}, "B": {"A": 2}})
+        with self.assertRaisesRegex(ValueError, "line 1"):
+            load_network(self.write("other_header.csv", "from,to,cost\nA,B,2\n"))
+
+    def test_csv_round_trip(self):
+        graph = {"A": {"B": 1, "C": 2}, "B": {"A": 1}, "C": {"A": 2}}
+        path = os.path.join(self.directory.name, "saved.csv")
+        save_network(graph, path)
+        self.assertEqual(load_network(path), graph)
+
+    def test_jsonl_mistakes_say_where_they_are(self):
+        for text in ('{"source": "A", "target": "B", "weight": 1}\n{"source": "B"\n',
+                     '{"source": "A", "target": "B", "weight": 1}\n{"source": "B", "weight": 1}\n',
+                     '{"source": "A", "target": "B", "weight": 1}\n["B", "C", 1]\n',
+                     '{"source": "A", "target": "B", "weight": 1}\n{"source": "B", "target": "C", "weight": 0}\n'):
+            with self.assertRaisesRegex(ValueError, r"links\.jsonl, line 2"):
+                load_network(self.write("links.jsonl", text))
+
+    def test_json_links_are_checked_and_go_both_ways(self):
+        graph = load_network(self.write("graph.json", json.dumps({"A": {"B": 2}, "B": {}, "C": {}})))
+        self.assertEqual(graph, {"A": {"B": 2}, "B": {"A": 2}, "C": {}})
+        for network in ({"A": {"B": -1}, "B": {}}, {"A": {"B": "far"}}, {"A": ["B"]}, ["A", "B"]):
+            with self.assertRaises(ValueError):
+                load_network(self.write("graph.json", json.dumps(network)))
+
+    def test_snapshot_round_trip_and_cut_short(self):
+        compiled_graph = CompiledGraph({"A": {"B": 1}, "B": {"A": 1, "C": 4}, "C": {"B": 4}})
+        path = os.path.join(self.directory.name, "network.snapshot")
+        save_snapshot(compiled_graph, path)
+        loaded = load_snapshot(path)
+        self.assertEqual(loaded.to_graph(), compiled_graph.to_graph())
+        with open(path, "rb") as snapshot_file:
+            data = snapshot_file.read()
+        for broken in (data[:-1], data + b"\0", data[:20]):
+            with open(path, "wb") as snapshot_file:
+                snapshot_file.write(broken)
+            with self.assertRaises(ValueError):
+                load_snapshot(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""This script tests the resilience analysis against a brute-force count of every shortest route."""
+import itertools
+import json
+import os
+import random
+import tempfile
+import unittest
+from logic import TrainLogic
+from resilience import analyse_resilience, write_report
+from test_dijkstra import all_shortest_weights
+
+
+def shortest_routes(graph, start_station, target_station):
+    """
+    This function finds every shortest route between two stations by trying every route that never visits a
+    station twice.
+
+    Args:
+        graph (dict): The weighted graph.
+        start_station (str): The station to start from.
+        target_station (str): The station to go to.
+
+    Returns:
+        Routes (list): The stations of every shortest route.
+    """
+    best_weight = None
+    best_routes = []
+    stack = [([start_station], 0)]
+    while stack:
+        route, weight = stack.pop()
+        if route[-1] == target_station:
+            if best_weight is None or weight < best_weight:
+                best_weight, best_routes = weight, [route]
+            elif weight == best_weight:
+                best_routes.append(route)
+            continue
+        for neighbour, link_weight in graph[route[-1]].items():
+            if neighbour not in route:
+                stack.append((route + [neighbour], weight + link_weight))
+    return best_routes
+
+
+class ResilienceTest(unittest.TestCase):
+
+    def test_report_matches_brute_force(self):
+        for trial in range(12):
+            randomizer = random.Random(trial)
+            stations = [f"S{station_id}" for station_id in range(randomizer.randint(3, 7))]
+            graph = {station: {} for station in stations}
+            for station_input, station_target in itertools.combinations(stations, 2):
+                if randomizer.random() < 0.45:
+                    graph[station_input][station_target] = graph[station_target][station_input] = \
+                        randomizer.randint(1, 3)
+            # Every other trial is spread across two processes.
+            report = analyse_resilience(TrainLogic(graph), None if trial % 2 else 2, chunk_size=3)
+
+            station_betweenness = dict.fromkeys(stations, 0.0)
+            link_betweenness = {}
+            for start_station, target_station in itertools.permutations(stations, 2):
+                routes = shortest_routes(graph, start_station, target_station)
+                for route in routes:
+                    for station in route[1:-1]:
+                        station_betweenness[station] += 1 / len(routes)
+                    for link in zip(route, route[1:]):
+                        link = tuple(sorted(link))
+                        link_betweenness[link] = link_betweenness.get(link, 0.0) + 1 / len(routes)
+            for row in report["station_betweenness"]:
+                self.assertAlmostEqual(row["betweenness"], station_betweenness[row["station"]], msg=trial)
+            for row in report["link_betweenness"]:
+                self.assertAlmostEqual(row["betweenness"], link_betweenness.get(tuple(row["stations"]), 0.0),
+                                       msg=trial)
+
+            weights = all_shortest_weights(graph)
+            for row in report["link_removal"]:
+                station_input, station_target = row["stations"]
+                delinked_graph = {station: dict(neighbours) for station, neighbours in graph.items()}
+                del delinked_graph[station_input][station_target]
+                del delinked_graph[station_target][station_input]
+                delinked_weights = all_shortest_weights(delinked_graph)
+                increase = affected = disconnected = 0
+                for pair, weight in weights.items():
+                    if pair not in delinked_weights:
+                        disconnected += 1
+                    elif delinked_weights[pair] > weight:
+                        increase += delinked_weights[pair] - weight
+                        affected += 1
+                self.assertEqual((row["distance_increase"], row["pairs_affected"], row["pairs_disconnected"]),
+                                 (increase, affected, disconnected), (trial, row))
+
+    def test_write_report_keeps_the_top_rows(self):
+        report = analyse_resilience(TrainLogic({"A": {"B": 1}, "B": {"A": 1, "C": 1}, "C": {"B": 1}}))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.json")
+            write_report(report, path, top=1)
+            with open(path, encoding="utf-8") as report_file:
+                saved = json.load(report_file)
+        self.assertEqual(saved["stations"], 3)
+        self.assertEqual(saved["station_betweenness"], [{"station": "B", "betweenness": 2.0}])
+        self.assertEqual(len(saved["link_removal"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""This script tests the route results, which only build their text when it's asked for."""
+import unittest
+from compiled_graph import CompiledGraph, trace_path
+from logic import TrainLogic
+from route import Route
+
+
+class RouteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trains = TrainLogic({"A": {"B": 1}, "B": {"A": 1, "C": 2}, "C": {"B": 2}, "D": {}})
+
+    def test_route_fields_and_text(self):
+        route = self.trains.dijkstra_algorithm("A", "C")
+        self.assertEqual(route.station_ids, [0, 1, 2])
+        self.assertEqual((route.weight, route.hops), (3, 2))
+        self.assertEqual((route.start_station, route.target_station), ("A", "C"))
+        self.assertEqual(route.stations, ["A", "B", "C"])
+        self.assertEqual(list(route.path_lines()), ["Start: A", "--> B", "--> C"])
+        self.assertEqual(route.weight_line(), "Weight of Path: 3")
+        # The old 2D list result still works.
+        self.assertEqual(route.format(), [["Start: A", "--> B", "--> C"], "Weight of Path: 3"])
+        self.assertEqual(route[1], "Weight of Path: 3")
+        self.assertEqual(repr(route), "Route(A -> B -> C, weight=3)")
+        self.assertIsNone(self.trains.dijkstra_algorithm("A", "D"))
+
+    def test_routes_are_small_and_share_the_station_names(self):
+        route = self.trains.dijkstra_algorithm("A", "C")
+        self.assertFalse(hasattr(route, "__dict__"))
+        with self.assertRaises(AttributeError):
+            route.text = "A > B > C"
+        self.assertIs(route.station_names, self.trains.compiled_graph.station_names)
+
+    def test_equal_routes(self):
+        compiled_graph = CompiledGraph(self.trains.graph)
+        first = Route.from_search(compiled_graph, ([0, 1], 1))
+        second = Route([0, 1], 1, ["A", "B", "C", "D"])
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(first, Route([0, 1], 2, compiled_graph.station_names))
+        self.assertNotEqual(first, Route([0, 1], 1, ["B", "A", "C", "D"]))
+        self.assertIsNone(Route.from_search(compiled_graph, None))
+
+    def test_trace_path(self):
+        predecessor = {1: 0, 2: 1, 3: 2}
+        self.assertEqual(trace_path(predecessor, 0, 3), [0, 1, 2, 3])
+        self.assertEqual(trace_path(predecessor, 2, 2), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
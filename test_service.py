@@ -0,0 +1,49 @@
+"""This script tests that the route query service answers requests, and refuses the ones it can't read."""
+import asyncio
+import json
+import unittest
+from logic import TrainLogic
+from service import MAX_ALTERNATIVES, RequestError, RouteService
+
+
+class RouteServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        graph = {"A": {"B": 1, "C": 3}, "B": {"A": 1, "C": 1}, "C": {"A": 3, "B": 1, "D": 1}, "D": {"C": 1}}
+        self.service = RouteService(TrainLogic(graph))
+
+    def tearDown(self):
+        self.service.executor.shutdown()
+
+    def dispatch(self, method, target, body=b""):
+        return asyncio.run(self.service.dispatch(method, target, body))
+
+    def assertStatus(self, status, method, target, body=b""):
+        with self.assertRaises(RequestError) as context:
+            self.dispatch(method, target, body)
+        self.assertEqual(context.exception.status, status, (method, target, body))
+
+    def test_routes_and_edits(self):
+        self.assertEqual(self.dispatch("GET", "/route?from=A&to=D")["stations"], ["A", "B", "C", "D"])
+        self.assertEqual(len(self.dispatch("GET", "/alternatives?from=A&to=D&k=5")["routes"]), 2)
+        payload = self.dispatch("POST", "/link", json.dumps({"from": "A", "to": "D"}).encode())
+        self.assertEqual(payload["graph_version"], 1)
+        self.assertEqual(self.dispatch("GET", "/route?from=A&to=D")["stations"], ["A", "D"])
+
+    def test_body_must_be_a_json_object(self):
+        for body in (b'[["from", "A"], ["to", "B"]]', b"3", b'"A"', b"null", b"{", b"\xff"):
+            self.assertStatus(400, "POST", "/link", body)
+        self.assertEqual(self.service.trains.graph_version, 0)
+
+    def test_bad_parameters(self):
+        self.assertStatus(404, "GET", "/route?from=A&to=Z")
+        self.assertStatus(400, "GET", "/alternatives?from=A&to=D&k=0")
+        self.assertStatus(400, "GET", f"/alternatives?from=A&to=D&k={MAX_ALTERNATIVES + 1}")
+        self.assertStatus(400, "GET", "/alternatives?from=A&to=D&k=many")
+        self.assertStatus(400, "GET", "/traversal?from=A&max_count=0")
+        self.assertStatus(405, "POST", "/route")
+        self.assertStatus(404, "GET", "/nowhere")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""This script stores the helpers that the tests share."""
+
+
+def random_graph(randomizer, station_count, link_count, max_weight=3):
+    """
+    This function makes a random weighted graph where every link goes both ways with the same weight.
+
+    Args:
+        randomizer (random.Random): Where the random numbers come from.
+        station_count (int): The number of stations.
+        link_count (int): The number of links to try to add (a link that already exists isn't added twice).
+        max_weight (int): The biggest weight of a link.
+
+    Returns:
+        graph (dict): The weighted graph.
+    """
+    graph = {f"S{station_id}": {} for station_id in range(station_count)}
+    stations = list(graph)
+    for _ in range(link_count):
+        station_input, station_target = randomizer.sample(stations, 2)
+        weight = randomizer.randint(1, max_weight)
+        graph[station_input][station_target] = weight
+        graph[station_target][station_input] = weight
+    return graph
+
+
+def same_partition(first_labels, second_labels):
+    """
+    This function checks whether two labellings split the stations into the same groups
+    (the labels themselves can be different).
+
+    Args:
+        first_labels (dict): The label of every station.
+        second_labels (dict): The label of every station.
+
+    Returns:
+        Same (bool): True if two stations share a label in one labelling exactly when they do in the other.
+    """
+    pairs = {}
+    for station, label in first_labels.items():
+        if pairs.setdefault(label, second_labels[station]) != second_labels[station]:
+            return False
+    return len(set(pairs.values())) == len(pairs)
@@ -0,0 +1,47 @@
+"""This script tests the traversals, which visit every station that can be reached from a starting station."""
+import random
+import unittest
+from logic import TrainLogic
+from test_support import random_graph
+
+
+class TraversalTest(unittest.TestCase):
+
+    def setUp(self):
+        # A - B - C - D, and E on its own.
+        self.trains = TrainLogic({"A": {"B": 1}, "B": {"A": 1, "C": 1}, "C": {"B": 1, "D": 1}, "D": {"C": 1},
+                                  "E": {}})
+
+    def test_modes_and_limits(self):
+        self.assertEqual(list(self.trains.traverse("B", "dfs")), ["B", "C", "D", "A"])
+        self.assertEqual(list(self.trains.traverse("B", "bfs")), ["B", "A", "C", "D"])
+        self.assertEqual(list(self.trains.traverse("B", "bfs_levels")), [(0, ["B"]), (1, ["A", "C"]), (2, ["D"])])
+        self.assertEqual(list(self.trains.traverse("B", "bfs", max_depth=1)), ["B", "A", "C"])
+        self.assertEqual(list(self.trains.traverse("B", "dfs", max_count=2)), ["B", "C"])
+        self.assertEqual(list(self.trains.traverse("E", "bfs")), ["E"])
+        self.assertEqual(self.trains.dfs_algorithm("A"), ["Start: A", "--> B", "--> C", "--> D"])
+
+    def test_traversals_visit_every_reachable_station_once(self):
+        randomizer = random.Random(11)
+        for trial in range(30):
+            trains = TrainLogic(random_graph(randomizer, 25, randomizer.randint(0, 30)))
+            start_station = randomizer.choice(list(trains.graph))
+            expected = {start_station} | trains.reachable_stations(start_station)
+            for mode in ("dfs", "bfs"):
+                stations = list(trains.traverse(start_station, mode))
+                self.assertEqual(len(stations), len(set(stations)), (trial, mode))
+                self.assertEqual(set(stations), expected, (trial, mode))
+
+    def test_mistakes_are_raised_straight_away(self):
+        # None of these are looped over, so the mistake has to be raised by the call itself.
+        for arguments in ({"mode": "sideways"}, {"max_depth": -1}, {"max_count": 0}):
+            with self.assertRaises(ValueError):
+                self.trains.traverse("A", **arguments)
+        with self.assertRaises(KeyError):
+            self.trains.traverse("Z")
+        with self.assertRaises(ValueError):
+            self.trains.traversal_path("A", "bfs_levels")
+
+
+if __name__ == "__main__":
+    unittest.main()
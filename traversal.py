@@ -0,0 +1,95 @@
+"""This script stores the traversal functions that visit every station that can be reached from a starting station."""
+
+# The modes that TrainLogic.traverse can use.
+TRAVERSAL_MODES = ("dfs", "bfs", "bfs_levels")
+
+
+def depth_first(compiled_graph, start_id, max_depth=None, max_count=None):
+    """
+    This function visits the stations using DFS (Depth First Search), giving back every station as soon as it's
+    visited so that the caller can start showing the stations straight away.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to traverse.
+        start_id (int): The id of the starting station.
+        max_depth (int): The maximum number of links away from the starting station (along the DFS path)
+        to visit. If this is None, there is no limit.
+        max_count (int): The maximum number of stations to visit. If this is None, there is no limit.
+
+    Yields:
+        Station Id (int): The id of every visited station, in the order that they were visited.
+    """
+    # A set is used for the visited stations, so checking whether a station was visited doesn't get slower
+    # as more stations are visited (unlike checking a list).
+    visited_stations = set()
+    # Start by inserting the starting station into the stack, together with its depth.
+    stations = [(start_id, 0)]
+    while stations:
+        # While the stations stack is not empty,
+        # Pop the last station that is in the stack (LIFO)
+        next_station, depth = stations.pop()
+        if next_station in visited_stations:
+            continue
+        visited_stations.add(next_station)
+        yield next_station
+        if len(visited_stations) == max_count:
+            return
+        if max_depth is not None and depth >= max_depth:
+            continue
+        # Then we visit the adjacent stations and push them into the stack.
+        for neighbour, _ in compiled_graph.neighbours_of(next_station):
+            if neighbour not in visited_stations:
+                stations.append((neighbour, depth + 1))
+
+
+def breadth_first(compiled_graph, start_id, max_depth=None, max_count=None):
+    """
+    This function visits the stations using BFS (Breadth First Search), i.e. the nearest stations
+    (in number of links) are visited first.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to traverse.
+        start_id (int): The id of the starting station.
+        max_depth (int): The maximum number of links away from the starting station to visit.
+        If this is None, there is no limit.
+        max_count (int): The maximum number of stations to visit. If this is None, there is no limit.
+
+    Yields:
+        Station Id (int): The id of every visited station, in the order that they were visited.
+    """
+    for _, level in breadth_first_levels(compiled_graph, start_id, max_depth):
+        for station_id in level:
+            yield station_id
+            max_count = None if max_count is None else max_count - 1
+            if max_count == 0:
+                return
+
+
+def breadth_first_levels(compiled_graph, start_id, max_depth=None):
+    """
+    This function visits the stations using BFS, giving back the stations one level (depth) at a time.
+    Level 0 is the starting station, level 1 are its neighbours, and so on.
+
+    Args:
+        compiled_graph (CompiledGraph): The graph to traverse.
+        start_id (int): The id of the starting station.
+        max_depth (int): The maximum level to visit. If this is None, there is no limit.
+
+    Yields:
+        Depth and Level (tuple): The depth of the level, and the ids of the stations in the level.
+    """
+    visited_stations = {start_id}
+    level = [start_id]
+    depth = 0
+    while level:
+        yield depth, level
+        if depth == max_depth:
+            return
+        next_level = []
+        for station_id in level:
+            for neighbour, _ in compiled_graph.neighbours_of(station_id):
+                if neighbour not in visited_stations:
+                    visited_stations.add(neighbour)
+                    next_level.append(neighbour)
+        level = next_level
+        depth += 1